@@ -1,31 +1,23 @@
 
-import os
-from pathlib import Path
-import fnmatch
-import glob
-import collections
+import pf_control.install_registry as install_registry
+import pf_control.install_scanner as install_scanner
 
-c_pf_application = '*PowerFactory.exe'
-
-def get_pf_locations():
+def get_pf_locations(roots=None, registry=None):
 	"""
-		Finds all of the locations that PowerFactory is installed in to obtain the various version details
+		Finds all of the locations that PowerFactory is installed in to obtain the various version details, the
+		result is cached so that the search is only repeated if an installation has changed
+	:param list roots: (optional) - Directories to search within, defaults to constants.InstallSearch
+	:param install_registry.InstallRegistry registry: (optional) - Registry to cache the result in
 	:return collections.OrderedDict dict_paths:  Ordered Dictonary of {year and version: path}
 	"""
-	dict_paths = collections.OrderedDict()
-
-	# TODO: Add function to confirm where exactly to look
-	src_path = 'C:\\Program Files'
-
-	for root, dirnames, filenames in os.walk(src_path):
-		for _ in fnmatch.filter(filenames, c_pf_application):
-			version_path = root
-			version = os.path.basename(version_path).replace('PowerFactory ', '')
-
-			dict_paths[version] = version_path
-
-
-	return dict_paths
+	scanner = install_scanner.InstallScanner(roots=roots)
+	if registry is None:
+		registry = install_registry.InstallRegistry()
+
+	return registry.lookup(
+		key='scan|{}|{}|{}'.format('|'.join(scanner.roots), scanner.max_depth, scanner.pf_application),
+		roots=scanner.roots, search=scanner.scan
+	)
 
 if __name__ == '__main__':
 	pf_install = get_pf_locations()
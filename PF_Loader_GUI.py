@@ -16,7 +16,9 @@ from PIL import Image, ImageTk
 import webbrowser
 
 import subprocess
-import platform
+
+import pf_control.engine_api as engine_api
+import pf_control.licence_host as licence_host
 
 
 # Reference to local directory used by other packages
@@ -167,20 +169,18 @@ class PowerFactory:
             self.c.select_power_factory_version(pf_version=pf_version)
             self.add_python_paths()
 
-        pf_version_year = [int(s) for s in pf_version.split() if s.isdigit()][0]
-        # Get PowerFactory application
+        # Get PowerFactory application using the entry point supported by this version, which is only detected the
+        # first time the version is used
         global app
         error_code = 0
 
-        if pf_version_year > 2018:
-            try:
-                app = powerfactory.GetApplicationExt()
-            except powerfactory.ExitError as error:
-                error_code = error.code
-        else:
-            app = powerfactory.GetApplication()
-            if app is None:
-                error_code = 1
+        api = engine_api.EngineApi(
+            powerfactory, self.c.target_power_factory, watch=[self.c.dig_path, self.c.dig_python_path]
+        )
+        try:
+            app = api.get_application()
+        except engine_api.EngineStartError as error:
+            error_code = error.code
 
         return error_code
 
@@ -329,9 +329,8 @@ class MainGui:
 
         self.status_bar.configure(text="Checking VPN connection, please wait.")
         self.master.update()
-        response = self.ping(self.c.power_factory_host)
         # and then check the response, if no VPN connection, indicate this in the GUI status output
-        if response == 0:
+        if licence_host.is_reachable(self.c.power_factory_host):
 
             # Open PF in engine mode and get current user
             self.status_bar.configure(text="Setting up PowerFactory licences, please wait for 30 seconds.")
@@ -368,20 +367,6 @@ class MainGui:
         else:
             self.status_bar.configure(text="VPN to licence host (digsilent2) was not found, please check.")
 
-    def ping(self, host):
-        """
-        Returns True if host (str) responds to a ping request.
-        Remember that a host may not respond to a ping (ICMP) request even if the host name is valid.
-        """
-
-        # Option for the number of packets as a function of
-        param = '-n' if platform.system().lower() == 'windows' else '-c'
-
-        # Building the command. Ex: "ping -c 1 google.com"
-        command = ['ping', param, '1', host]
-
-        return subprocess.call(command, shell=True)
-
     def launch_powerfactory(self):
 
         self.power_factory_launch_button = 1
@@ -0,0 +1,8 @@
+"""
+    Benchmarks for pf_control, each module is run from the repository root, e.g.
+        python -m benchmarks.bench_install_scan
+
+    The full suite runs against the fake powerfactory module in benchmarks.fake_powerfactory and writes its results
+    as JSON, which can be compared with a previous run to detect regressions, e.g.
+        python -m benchmarks.suite --output results.json --baseline previous.json
+"""
@@ -0,0 +1,115 @@
+"""
+#######################################################################################################################
+###											Harmonics Benchmark														###
+###		Times the vectorised harmonic impedance analysis of pf_control.harmonics on a synthetic frequency sweep of	###
+###		parallel RLC resonances, compared with looping over each terminal in Python									###
+###																													###
+#######################################################################################################################
+"""
+import argparse
+import time
+
+import numpy as np
+
+import pf_control.harmonics as harmonics
+
+
+def synthetic_sweep(n_frequencies, n_terminals, seed=0, scale=1.0):
+    """
+        Returns the impedance of a parallel RLC circuit at each terminal, each with a single resonance
+    :param int n_frequencies:  Number of frequency points
+    :param int n_terminals:  Number of terminals
+    :param int seed: (optional) - Seed for the random resonant frequencies and Q-factors
+    :param float scale: (optional) - Factor applied to the inductance, used to create different scenarios
+    :return (np.ndarray, np.ndarray, np.ndarray, np.ndarray) (frequencies, impedance, f0, q):  Frequencies, complex
+                                                                impedance of (frequencies x terminals) and the
+                                                                analytical resonant frequency and Q-factor
+    """
+    rng = np.random.default_rng(seed)
+    frequencies = np.linspace(50.0, 5000.0, n_frequencies)
+    f0 = rng.uniform(300.0, 3000.0, n_terminals)
+    q = rng.uniform(2.0, 20.0, n_terminals)
+    r = rng.uniform(10.0, 100.0, n_terminals)
+
+    # For a parallel RLC circuit f0 = 1 / (2 pi sqrt(LC)) and Q = R sqrt(C / L)
+    inductance = r / (2 * np.pi * f0 * q) * scale
+    capacitance = q / (2 * np.pi * f0 * r)
+    w = 2 * np.pi * frequencies[:, np.newaxis]
+    impedance = 1.0 / (1.0 / r + 1.0 / (1j * w * inductance) + 1j * w * capacitance)
+
+    f0 = 1.0 / (2 * np.pi * np.sqrt(inductance * capacitance))
+    q = r * np.sqrt(capacitance / inductance)
+    return frequencies, impedance, f0, q
+
+
+def loop_resonances(frequencies, impedance):
+    """
+        Finds the resonances and Q-factors by looping over each terminal and frequency, as done before the
+        vectorised analysis
+    :param np.ndarray frequencies:
+    :param np.ndarray impedance:
+    :return list resonances:  List of (terminal, frequency, q_factor)
+    """
+    found = list()
+    for t in range(impedance.shape[1]):
+        magnitude = [abs(x) for x in impedance[:, t]]
+        for i in range(1, len(magnitude) - 1):
+            if magnitude[i - 1] < magnitude[i] >= magnitude[i + 1]:
+                level = magnitude[i] * 0.5 ** 0.5
+                lo = next((j for j in range(i, -1, -1) if magnitude[j] < level), None)
+                hi = next((j for j in range(i, len(magnitude)) if magnitude[j] < level), None)
+                q = None
+                if lo is not None and hi is not None:
+                    q = frequencies[i] / (frequencies[hi] - frequencies[lo])
+                found.append((t, frequencies[i], q))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorised harmonic impedance analysis')
+    parser.add_argument('--frequencies', type=int, default=2000, help='Number of frequency points')
+    parser.add_argument('--terminals', type=int, default=10000, help='Number of terminals')
+    parser.add_argument('--scenarios', type=int, default=4, help='Number of scenarios for the loci envelope')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    frequencies, impedance, f0, q = synthetic_sweep(args.frequencies, args.terminals)
+    print('Synthetic sweep of {} frequencies x {} terminals created in {:.2f} s'.format(
+        args.frequencies, args.terminals, time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    resonances = harmonics.find_resonances(frequencies, impedance)
+    t_resonances = time.perf_counter() - t0
+
+    # Accuracy against the analytical values, each terminal has a single resonance
+    if not np.array_equal(resonances.terminal, np.arange(args.terminals)):
+        raise ValueError('Expected a single resonance for each terminal')
+    step = frequencies[1] - frequencies[0]
+    f0_error = np.max(np.abs(resonances.frequency - f0))
+    q_error = np.nanmax(np.abs(resonances.q_factor - q) / q)
+
+    t0 = time.perf_counter()
+    envelope = harmonics.loci_envelope(
+        synthetic_sweep(args.frequencies, args.terminals, scale=1.0 + 0.05 * i)[1].astype(np.complex64)
+        for i in range(args.scenarios))
+    t_envelope = time.perf_counter() - t0
+
+    # Python loop over a subset of the terminals, extrapolated to all of them
+    subset = max(1, args.terminals // 100)
+    t0 = time.perf_counter()
+    loop_resonances(frequencies, impedance[:, :subset])
+    t_loop = (time.perf_counter() - t0) * args.terminals / subset
+
+    print('{:<45}{:>10.3f} s ({} resonances)'.format('find_resonances (peaks + Q-factor)', t_resonances,
+                                                     resonances.frequency.size))
+    print('{:<45}{:>10.3f} s (including creating each scenario)'.format(
+        'loci_envelope ({} scenarios)'.format(args.scenarios), t_envelope))
+    print('{:<45}{:>10.3f} s (extrapolated)'.format('Python loop over terminals', t_loop))
+    print('{:<45}{:>10.1f} x'.format('Speed up (loop vs vectorised)', t_loop / t_resonances))
+    print('{:<45}{:>10.3f} Hz (frequency step {:.3f} Hz)'.format('Maximum resonant frequency error', f0_error, step))
+    print('{:<45}{:>10.2%}'.format('Maximum Q-factor error', q_error))
+    print('{:<45}{:>10.1f} MB'.format('Loci envelope size', sum(x.nbytes for x in envelope) / 1e6))
+
+
+if __name__ == '__main__':
+    main()
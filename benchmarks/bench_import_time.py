@@ -0,0 +1,81 @@
+"""
+#######################################################################################################################
+###											Import Time Benchmark													###
+###		Measures the time taken to import pf_control using python -X importtime and fails if the import exceeds	###
+###		the budget or loads any of the modules which should only be imported when needed							###
+###																													###
+#######################################################################################################################
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Default budget in milliseconds for the cumulative import time of pf_control
+default_budget = 50.0
+
+# Modules which must not be imported by a plain import of pf_control
+forbidden_modules = ('tkinter', 'PIL', 'webbrowser', 'pf_control.gui')
+
+
+def measure(module, repeats):
+    """
+        Function imports a module in a new interpreter a number of times and returns the fastest import
+    :param str module:  Name of module to import
+    :param int repeats:  Number of repeats
+    :return (float, dict) (best, imported):  Best cumulative import time in milliseconds and a dictionary of
+                                                {module: cumulative time in milliseconds} for the fastest run
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = float('inf')
+    best_imported = dict()
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+            cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True
+        )
+
+        # Each line is of the form "import time: self [us] | cumulative | imported package"
+        imported = dict()
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            imported[name.strip()] = int(cumulative) / 1000.0
+
+        if imported[module] < best:
+            best = imported[module]
+            best_imported = imported
+
+    return best, best_imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the import time of pf_control')
+    parser.add_argument('--budget', type=float, default=default_budget, help='Import budget in milliseconds')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of times the import is repeated')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to report')
+    args = parser.parse_args()
+
+    best, imported = measure('pf_control', args.repeats)
+
+    print('Slowest imports (cumulative):')
+    for name, t in sorted(imported.items(), key=lambda x: -x[1])[:args.top]:
+        print('\t{:<40}{:>10.2f} ms'.format(name, t))
+    print('{:<48}{:>10.2f} ms (budget {:.2f} ms)'.format('import pf_control', best, args.budget))
+
+    failures = list()
+    loaded = [x for x in forbidden_modules if x in imported]
+    if loaded:
+        failures.append('the following modules should not be imported: {}'.format(', '.join(loaded)))
+    if best > args.budget:
+        failures.append('import time {:.2f} ms exceeds the budget of {:.2f} ms'.format(best, args.budget))
+
+    if failures:
+        print('FAILED - {}'.format('; '.join(failures)))
+        sys.exit(1)
+    print('PASSED')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+#######################################################################################################################
+###											Install Scan Benchmark													###
+###		Builds a synthetic Program Files tree and compares the time taken by the original os.walk search with		###
+###		the bounded, pruned scanner in pf_control.install_scanner													###
+###																													###
+#######################################################################################################################
+"""
+import argparse
+import collections
+import fnmatch
+import os
+import shutil
+import tempfile
+import time
+
+import pf_control.install_scanner as install_scanner
+
+# Names used for the synthetic vendor directories, a proportion match the pruning rules
+vendor_names = ('Microsoft Office', 'Windows Kits', 'Common Files', 'NVIDIA Corporation', 'Vendor', 'Tools', 'Apps')
+
+
+def build_tree(root, total_directories=50000, fan_out=8, versions=('2019', '2020', '2021')):
+    """
+        Function builds a synthetic Program Files tree containing a number of PowerFactory installations
+    :param str root:  Directory to build the tree within
+    :param int total_directories:  Approximate number of directories to create
+    :param int fan_out:  Number of sub directories created in each directory
+    :param tuple versions:  PowerFactory versions to install
+    :return int created:  Number of directories created
+    """
+    # Add the PowerFactory installations, each with some sub directories of their own
+    for version in versions:
+        install = os.path.join(root, 'DIgSILENT', 'PowerFactory {}'.format(version))
+        for sub in ('Python', os.path.join('Python', '3.8'), 'Help', 'Workspace'):
+            os.makedirs(os.path.join(install, sub), exist_ok=True)
+        open(os.path.join(install, 'PowerFactory.exe'), 'w').close()
+
+    # Fill the rest of the tree with vendor directories in a breadth first manner
+    created = 0
+    frontier = [
+        os.path.join(root, '{} {}'.format(vendor_names[i % len(vendor_names)], i)) for i in range(2 * fan_out)
+    ]
+    while frontier and created < total_directories:
+        next_frontier = list()
+        for pth in frontier:
+            if created >= total_directories:
+                break
+            os.makedirs(pth)
+            created += 1
+            next_frontier.extend(os.path.join(pth, 'sub{}'.format(i)) for i in range(fan_out))
+        frontier = next_frontier
+
+    return created
+
+
+def legacy_search(src_path, pf_application='*PowerFactory.exe'):
+    """
+        Original implementation of Development.get_pf_locations which walks the entire tree
+    :param str src_path:  Directory to search within
+    :param str pf_application:  Pattern for the PowerFactory executable
+    :return collections.OrderedDict dict_paths:  Ordered Dictonary of {year and version: path}
+    """
+    dict_paths = collections.OrderedDict()
+    for root, dirnames, filenames in os.walk(src_path):
+        for _ in fnmatch.filter(filenames, pf_application):
+            version = os.path.basename(root).replace('PowerFactory ', '')
+            dict_paths[version] = root
+    return dict_paths
+
+
+def time_function(func, repeats):
+    """
+        Returns the best time of a number of repeats
+    :param func func:  Function to time
+    :param int repeats:  Number of repeats
+    :return (float, object) (best, result):  Best time in seconds and the result of the function
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the PowerFactory install scanner')
+    parser.add_argument('--directories', type=int, default=50000, help='Number of synthetic directories')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of times each search is repeated')
+    parser.add_argument('--workers', type=int, default=None, help='Number of scanner threads')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='pf_scan_bench_')
+    try:
+        t0 = time.perf_counter()
+        created = build_tree(root, total_directories=args.directories)
+        print('Built synthetic tree of {} directories in {:.2f} s'.format(created, time.perf_counter() - t0))
+
+        t_legacy, legacy = time_function(lambda: legacy_search(root), args.repeats)
+        scanner = install_scanner.InstallScanner(roots=[root], max_workers=args.workers)
+        t_scanner, scanned = time_function(scanner.scan, args.repeats)
+
+        if sorted(legacy.items()) != sorted(scanned.items()):
+            raise ValueError('Scanner result {} does not match legacy result {}'.format(scanned, legacy))
+
+        print('Installations found: {}'.format(', '.join(scanned.keys())))
+        print('{:<25}{:>10.4f} s'.format('os.walk (legacy)', t_legacy))
+        print('{:<25}{:>10.4f} s'.format('InstallScanner', t_scanner))
+        print('{:<25}{:>10.1f} x'.format('Speed up', t_legacy / t_scanner))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+#######################################################################################################################
+###											Results Benchmark														###
+###		Compares reading results directly from an ElmRes with pf_control.results against exporting them to a CSV	###
+###		file with ComRes and parsing the file, using a fake ElmRes													###
+###																													###
+#######################################################################################################################
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import pf_control.results as results
+
+
+class FakeObject:
+    """ Stand in for a PowerFactory object """
+    def __init__(self, name):
+        self.loc_name = name
+
+
+class FakeElmRes:
+    """
+        Stand in for an ElmRes holding a (rows x columns) array of results, the values are returned as Python lists
+        in the same way as the PowerFactory API
+    """
+
+    def __init__(self, n_rows, n_objects, variables):
+        """
+        :param int n_rows:  Number of rows (time steps / frequencies)
+        :param int n_objects:  Number of monitored objects
+        :param tuple variables:  Variables monitored for each object
+        """
+        rng = np.random.default_rng(0)
+        self.objects = [FakeObject('Terminal {}'.format(i)) for i in range(n_objects)]
+        self.variables = tuple(variables)
+        self.index = np.arange(n_rows, dtype=float)
+        self.data = rng.random((n_rows, n_objects * len(variables)))
+
+    def Load(self):
+        return 0
+
+    def Release(self):
+        return 0
+
+    def GetNumberOfRows(self):
+        return self.data.shape[0]
+
+    def GetNumberOfColumns(self):
+        return self.data.shape[1]
+
+    def GetObject(self, column):
+        return self.objects[column // len(self.variables)]
+
+    def GetVariable(self, column):
+        return self.variables[column % len(self.variables)]
+
+    def GetValue(self, row, column):
+        return [0, float(self.index[row] if column < 0 else self.data[row, column])]
+
+
+
+class FakeElmResColumns(FakeElmRes):
+    """ Stand in for an ElmRes from an engine which supports reading a whole column at once """
+
+    def GetColumnValues(self, column):
+        return [0, (self.index if column < 0 else self.data[:, column]).tolist()]
+
+
+def export_csv(elmres, pth):
+    """
+        Writes the results in the same layout as a ComRes export with ciopt_head = 1 (object and variable rows)
+    :param FakeElmRes elmres:
+    :param str pth:  File to write
+    :return None:
+    """
+    with open(pth, 'w', newline='') as f:
+        writer = csv.writer(f)
+        n_columns = elmres.GetNumberOfColumns()
+        writer.writerow(['All calculations'] + [elmres.GetObject(i).loc_name for i in range(n_columns)])
+        writer.writerow(['b:tnow'] + [elmres.GetVariable(i) for i in range(n_columns)])
+        for row in range(elmres.GetNumberOfRows()):
+            writer.writerow([elmres.GetValue(row, -1)[1]] + [elmres.GetValue(row, i)[1] for i in range(n_columns)])
+    return None
+
+
+def parse_csv(pth):
+    """
+        Parses an exported CSV file
+    :param str pth:
+    :return (np.ndarray, np.ndarray) (index, values):
+    """
+    data = np.loadtxt(pth, delimiter=',', skiprows=2)
+    return data[:, 0], data[:, 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reading results directly from an ElmRes')
+    parser.add_argument('--rows', type=int, default=2000, help='Number of rows (time steps / frequencies)')
+    parser.add_argument('--objects', type=int, default=500, help='Number of monitored objects')
+    args = parser.parse_args()
+
+    variables = ('m:u', 'm:phiu', 'm:fehz')
+    elmres = FakeElmResColumns(args.rows, args.objects, variables)
+    print('Results of {} rows x {} columns'.format(args.rows, elmres.GetNumberOfColumns()))
+
+    pth = os.path.join(tempfile.mkdtemp(prefix='pf_results_bench_'), 'results.csv')
+    try:
+        t0 = time.perf_counter()
+        export_csv(elmres, pth)
+        t_export = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index_csv, values_csv = parse_csv(pth)
+        t_parse = time.perf_counter() - t0
+        size = os.path.getsize(pth)
+    finally:
+        os.remove(pth)
+        os.rmdir(os.path.dirname(pth))
+
+    t0 = time.perf_counter()
+    index, values, _ = results.ResultsReader(elmres).read()
+    t_direct = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _, values_u, _ = results.ResultsReader(elmres).read(variables='m:u')
+    t_selected = time.perf_counter() - t0
+
+    # Reading each value individually for engines without GetColumnValues
+    slow = FakeElmRes(args.rows, max(1, args.objects // 10), variables)
+    t0 = time.perf_counter()
+    results.ResultsReader(slow).read()
+    t_slow = (time.perf_counter() - t0) * elmres.GetNumberOfColumns() / slow.GetNumberOfColumns()
+
+    if not (np.allclose(values, values_csv) and np.allclose(index, index_csv)):
+        raise ValueError('Results read directly do not match the exported results')
+
+    print('{:<45}{:>10.3f} s ({:.1f} MB written)'.format('ComRes CSV export', t_export, size / 1e6))
+    print('{:<45}{:>10.3f} s'.format('Parse CSV', t_parse))
+    print('{:<45}{:>10.3f} s'.format('ResultsReader (all columns)', t_direct))
+    print('{:<45}{:>10.3f} s ({} columns)'.format('ResultsReader (m:u only)', t_selected, values_u.shape[1]))
+    print('{:<45}{:>10.3f} s (extrapolated)'.format('ResultsReader using GetValue (all columns)', t_slow))
+    print('{:<45}{:>10.1f} x'.format('Speed up (export + parse vs direct)', (t_export + t_parse) / t_direct))
+
+
+if __name__ == '__main__':
+    main()
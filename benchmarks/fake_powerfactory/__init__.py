@@ -0,0 +1,17 @@
+"""
+    Pure Python fake of the powerfactory module used by the benchmarks, either imported directly as
+    benchmarks.fake_powerfactory.powerfactory or made importable as powerfactory with install()
+"""
+import os
+import sys
+
+
+def install():
+    """
+        Adds the fake to the Python search path so that import powerfactory imports it
+    :return str pth:  Directory added to the search path
+    """
+    pth = os.path.dirname(os.path.abspath(__file__))
+    if pth not in sys.path:
+        sys.path.insert(0, pth)
+    return pth
@@ -0,0 +1,411 @@
+"""
+#######################################################################################################################
+###											Fake powerfactory														###
+###		Pure Python stand in for the powerfactory module so that pf_control can be benchmarked without a licensed	###
+###		PowerFactory installation.  The size of the project and the latency of each API call are configurable		###
+###		with configure() so that the engine bound parts of a run can be simulated									###
+###																													###
+#######################################################################################################################
+"""
+import fnmatch
+import math
+import time
+
+
+class Config:
+    """
+        Size of the simulated project and the latency (seconds) of the API calls
+    """
+    def __init__(self):
+        self.terminals = 1000
+        self.lines = 1000
+        self.generators = 20
+        self.study_cases = 8
+        self.scenarios = 4
+        # Characteristics library folders, fan_out folders at each of depth levels each containing an R and L
+        self.library_depth = 3
+        self.library_fan_out = 4
+        self.monitored_terminals = 100
+        self.result_rows = 1000
+        # Whether ElmRes supports reading a whole column with GetColumnValues
+        self.column_values = True
+
+        self.latency = {
+            'start': 0.0,
+            'GetContents': 0.0,
+            'GetCalcRelevantObjects': 0.0,
+            'GetValue': 0.0,
+            'ComLdf': 0.01,
+            'ComInc': 0.01,
+            'ComSim': 0.05,
+            'ComHLdf': 0.01,
+            'ComFsweep': 0.05,
+            'ComSnapshot': 0.001,
+            'ComRes': 0.0,
+        }
+
+
+config = Config()
+
+
+def configure(**kwargs):
+    """
+        Changes the configuration, latency is merged with the existing latencies
+    :param kwargs:  Attributes of Config
+    :return Config config:
+    """
+    for key, value in kwargs.items():
+        if key == 'latency':
+            config.latency.update(value)
+        elif hasattr(config, key):
+            setattr(config, key, value)
+        else:
+            raise AttributeError('Unknown configuration <{}>'.format(key))
+    return config
+
+
+def reset():
+    """
+        Restores the default configuration
+    :return Config config:
+    """
+    config.__init__()
+    return config
+
+
+def _delay(name):
+    latency = config.latency.get(name, 0.0)
+    if latency:
+        time.sleep(latency)
+
+
+def _split_filter(obj_filter):
+    """
+        Splits a filter of the form 'name.class' into its name and class patterns
+    :param str obj_filter:
+    :return (str, str) (name, pf_class):
+    """
+    if not obj_filter:
+        return '*', '*'
+    name, sep, pf_class = obj_filter.rpartition('.')
+    if not sep:
+        return obj_filter, '*'
+    return name or '*', pf_class or '*'
+
+
+class DataObject:
+    """ Stand in for a PowerFactory object """
+
+    def __init__(self, app, name, pf_class, parent=None, **attributes):
+        self._app = app
+        self._class = pf_class
+        self._parent = parent
+        self._children = list()
+        self.loc_name = name
+        self.outserv = 0
+        for key, value in attributes.items():
+            setattr(self, key, value)
+        if parent is not None:
+            parent._children.append(self)
+
+    def __repr__(self):
+        return '{}.{}'.format(self.loc_name, self._class)
+
+    def GetClassName(self):
+        return self._class
+
+    def GetParent(self):
+        return self._parent
+
+    def GetFullName(self):
+        parts = list()
+        obj = self
+        while obj is not None:
+            parts.append('{}.{}'.format(obj.loc_name, obj._class))
+            obj = obj._parent
+        return '\\' + '\\'.join(reversed(parts))
+
+    def GetContents(self, obj_filter='*', recursive=0):
+        _delay('GetContents')
+        name, pf_class = _split_filter(obj_filter)
+        found = list()
+        stack = list(reversed(self._children))
+        while stack:
+            child = stack.pop()
+            if fnmatch.fnmatchcase(child.loc_name, name) and fnmatch.fnmatchcase(child._class, pf_class):
+                found.append(child)
+            if recursive:
+                stack.extend(reversed(child._children))
+        return found
+
+    def CreateObject(self, pf_class, name=None):
+        return _create(self._app, name or pf_class, pf_class, self)
+
+    def Delete(self):
+        if self._parent is not None:
+            self._parent._children.remove(self)
+            self._parent = None
+        return 0
+
+    def GetAttribute(self, name):
+        return getattr(self, name)
+
+    def SetAttribute(self, name, value):
+        setattr(self, name, value)
+        return 0
+
+    def Activate(self):
+        return self._app._activate(self)
+
+    def Deactivate(self):
+        return self._app._deactivate(self)
+
+
+class Command(DataObject):
+    """ Stand in for the calculation commands (ComLdf, ComSim, etc.) """
+
+    def Execute(self):
+        _delay(self._class)
+        if self._class in ('ComSim', 'ComFsweep'):
+            # Results are recorded in the results file of the study case
+            name = 'Freq.Sweep' if self._class == 'ComFsweep' else 'Results'
+            elmres = getattr(self, 'p_resvar', None) or self._app.GetFromStudyCase('{}.ElmRes'.format(name))
+            elmres._record(step=1.0 if self._class == 'ComFsweep' else 0.01)
+        elif self._class == 'ComRes':
+            self._export()
+        return 0
+
+    def _export(self):
+        """
+            Writes the results file in the same layout as a ComRes export with the header included
+        :return None:
+        """
+        elmres = self.pResult
+        delimiter = ',' if getattr(self, 'iopt_exp', 6) == 6 else '\t'
+        n_columns = elmres.GetNumberOfColumns()
+        with open(self.f_name, 'w') as f:
+            f.write(delimiter.join(['All calculations'] + [
+                elmres.GetObject(i).loc_name for i in range(n_columns)]) + '\n')
+            f.write(delimiter.join(['b:tnow in s'] + [elmres.GetVariable(i) for i in range(n_columns)]) + '\n')
+            for row in range(elmres.GetNumberOfRows()):
+                f.write(delimiter.join(repr(elmres._value(row, i)) for i in range(-1, n_columns)) + '\n')
+        return None
+
+
+class ElmRes(DataObject):
+    """ Stand in for a results file """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._columns = list()
+        self._rows = 0
+        self._step = 0.01
+
+    def AddVars(self, obj, *variables):
+        monitors = [x for x in self._children if x._class == 'IntMon' and x.obj_id is obj]
+        if monitors:
+            monitors[0].vars = list(monitors[0].vars) + [x for x in variables if x not in monitors[0].vars]
+        else:
+            _create(self._app, obj.loc_name, 'IntMon', self, obj_id=obj, vars=list(variables))
+        return 0
+
+    def _record(self, step):
+        self._columns = [
+            (mon.obj_id, var) for mon in self._children if mon._class == 'IntMon' for var in mon.vars
+        ]
+        self._rows = config.result_rows
+        self._step = step
+
+    def _value(self, row, column):
+        if column < 0:
+            return row * self._step
+        return math.sin(0.01 * row + column)
+
+    def Load(self):
+        return 0
+
+    def Release(self):
+        return 0
+
+    def GetNumberOfRows(self):
+        return self._rows
+
+    def GetNumberOfColumns(self):
+        return len(self._columns)
+
+    def GetObject(self, column):
+        return self._columns[column][0]
+
+    def GetVariable(self, column):
+        return self._columns[column][1]
+
+    def GetValue(self, row, column):
+        _delay('GetValue')
+        return [0, self._value(row, column)]
+
+    def __getattr__(self, name):
+        # GetColumnValues is only available if configured, as for older engines
+        if name == 'GetColumnValues' and config.column_values:
+            return self._column_values
+        raise AttributeError(name)
+
+    def _column_values(self, column):
+        return [0, [self._value(row, column) for row in range(self._rows)]]
+
+
+_classes = {'ElmRes': ElmRes}
+
+
+def _create(app, name, pf_class, parent, **attributes):
+    cls = _classes.get(pf_class, Command if pf_class.startswith('Com') else DataObject)
+    return cls(app, name, pf_class, parent, **attributes)
+
+
+class Application:
+    """ Stand in for the PowerFactory application """
+
+    def __init__(self):
+        _delay('start')
+        self._user = DataObject(self, 'benchmark', 'IntUser')
+        for attribute in ('harm', 'contingency', 'qdynsim', 'script', 'stab', 'smallsig', 'netred', 'paramid', 'prot',
+                          'arcflash', 'tececo', 'check_adv'):
+            setattr(self._user, attribute, 0)
+        self._projects = {'Benchmark': self._build_project('Benchmark')}
+        self._project = None
+        self._study_case = None
+        self._scenario = None
+
+    def _build_project(self, name):
+        project = DataObject(self, name, 'IntPrj')
+
+        network = DataObject(self, 'Network Model', 'IntPrjfolder', project)
+        data = DataObject(self, 'Network Data', 'IntPrjfolder', network)
+        grid = DataObject(self, 'Grid', 'ElmNet', data)
+        for i in range(config.terminals):
+            DataObject(self, 'Terminal {}'.format(i), 'ElmTerm', grid, uknom=[0.4, 11.0, 33.0, 132.0][i % 4])
+        for i in range(config.lines):
+            DataObject(self, 'Line {}'.format(i), 'ElmLne', grid)
+        for i in range(config.generators):
+            DataObject(self, 'Gen {}'.format(i), 'ElmSym', grid)
+
+        library = DataObject(self, 'Library', 'IntPrjfolder', project)
+        operational = DataObject(self, 'Operational Library', 'IntPrjfolder', library)
+        characteristics = DataObject(self, 'Characteristics', 'IntPrjfolder', operational)
+        frontier = [characteristics]
+        for _ in range(config.library_depth):
+            next_frontier = list()
+            for folder in frontier:
+                for i in range(config.library_fan_out):
+                    sub = DataObject(self, 'Folder {}'.format(i), 'IntPrjfolder', folder)
+                    DataObject(self, 'R', 'ChaVec', sub, vector=[0.1] * 10)
+                    DataObject(self, 'L', 'ChaVec', sub, vector=[1.0] * 10)
+                    next_frontier.append(sub)
+            frontier = next_frontier
+
+        # Each study case monitors the generators in the simulation results and the first terminals in the sweep
+        generators = grid.GetContents('*.ElmSym')
+        terminals = grid.GetContents('*.ElmTerm')[:config.monitored_terminals]
+        study = DataObject(self, 'Study Cases', 'IntPrjfolder', project)
+        for i in range(config.study_cases):
+            case = DataObject(self, 'Study Case {}'.format(i), 'IntCase', study)
+            DataObject(self, 'Events', 'IntEvt', case)
+            results = ElmRes(self, 'Results', 'ElmRes', case)
+            for obj in generators:
+                results.AddVars(obj, 'm:P:bus1', 'm:Q:bus1', 's:speed')
+            sweep = ElmRes(self, 'Freq.Sweep', 'ElmRes', case)
+            for obj in terminals:
+                sweep.AddVars(obj, 'm:Z', 'm:phiz')
+
+        scenarios = DataObject(self, 'Operation Scenarios', 'IntPrjfolder', project)
+        for i in range(config.scenarios):
+            DataObject(self, 'Scenario {}'.format(i), 'IntScenario', scenarios)
+
+        project._folders = {'netdat': data, 'lib': library, 'chars': characteristics, 'study': study,
+                            'scen': scenarios}
+        project._grid = grid
+        return project
+
+    def _activate(self, obj):
+        if obj._class == 'IntCase':
+            self._study_case = obj
+        elif obj._class == 'IntScenario':
+            self._scenario = obj
+        return 0
+
+    def _deactivate(self, obj):
+        if obj is self._study_case:
+            self._study_case = None
+        elif obj is self._scenario:
+            self._scenario = None
+        return 0
+
+    def GetCurrentUser(self):
+        return self._user
+
+    def ActivateProject(self, name):
+        project = self._projects.get(name.split('\\')[-1].split('.')[0])
+        if project is None:
+            return 1
+        self._project = project
+        self._study_case = None
+        self._scenario = None
+        return 0
+
+    def GetActiveProject(self):
+        return self._project
+
+    def GetProjectFolder(self, folder_type):
+        return None if self._project is None else self._project._folders.get(folder_type)
+
+    def GetActiveStudyCase(self):
+        return self._study_case
+
+    def GetActiveScenario(self):
+        return self._scenario
+
+    def GetActiveNetworkVariations(self):
+        return list()
+
+    def GetFromStudyCase(self, name):
+        if self._study_case is None:
+            return None
+        obj_name, pf_class = _split_filter(name)
+        if pf_class == '*':
+            obj_name, pf_class = '*', name
+        found = self._study_case.GetContents('{}.{}'.format(obj_name, pf_class))
+        if found:
+            return found[0]
+        return _create(self, pf_class if obj_name == '*' else obj_name, pf_class, self._study_case)
+
+    def GetCalcRelevantObjects(self, obj_filter='*.*'):
+        _delay('GetCalcRelevantObjects')
+        if self._project is None:
+            return list()
+        return self._project._grid.GetContents(obj_filter)
+
+    def PrintPlain(self, message):
+        return None
+
+    def Show(self):
+        return None
+
+    def Hide(self):
+        return None
+
+
+def GetApplication():
+    return Application()
+
+
+def GetApplicationExt(username=None, password=None, commandLineArguments=None):
+    return Application()
+
+
+def engine_factory(**kwargs):
+    """
+        Engine factory for pf_control.session.EnginePool which configures the fake engine in the worker process
+    :param kwargs:  Configuration passed to configure
+    :return Application app:
+    """
+    configure(**kwargs)
+    return GetApplication()
@@ -0,0 +1,371 @@
+"""
+#######################################################################################################################
+###											Benchmark Suite															###
+###		Runs the benchmarks for install discovery, import time, project navigation, result extraction and batch	###
+###		orchestration against the fake powerfactory module so they can be run on any platform, writing the			###
+###		results as JSON so that regressions can be tracked between releases											###
+###																													###
+#######################################################################################################################
+"""
+import argparse
+import collections
+import datetime
+import functools
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchmarks.bench_import_time as import_time
+import benchmarks.bench_install_scan as install_scan
+from benchmarks.fake_powerfactory import powerfactory
+import pf_control.batch as batch
+import pf_control.constants as constants
+import pf_control.export_reader as export_reader
+import pf_control.install_registry as install_registry
+import pf_control.install_scanner as install_scanner
+import pf_control.project as project
+import pf_control.results as results
+import pf_control.session as session
+
+# Name of the project created by the fake powerfactory module
+project_name = 'Benchmark'
+
+# Metrics ending with this suffix are times where lower is better and are compared against the baseline
+time_suffix = '_s'
+
+# Default fractional increase in a time over the baseline which is reported as a regression
+default_tolerance = 0.25
+
+
+def bench_install_discovery(args):
+    """
+        Times the search for PowerFactory installations in a synthetic Program Files tree, with the original os.walk
+        search, the bounded scanner and a lookup from the install registry
+    :param argparse.Namespace args:
+    :return dict metrics:
+    """
+    root = tempfile.mkdtemp(prefix='pf_suite_scan_')
+    # Registry is kept outside the tree since writing it would change the modified time of the root
+    cache_dir = tempfile.mkdtemp(prefix='pf_suite_registry_')
+    try:
+        created = install_scan.build_tree(root, total_directories=args.directories)
+        t_legacy, legacy = install_scan.time_function(
+            lambda: install_scan.legacy_search(root), args.repeats)
+        scanner = install_scanner.InstallScanner(roots=[root])
+        t_scanner, scanned = install_scan.time_function(scanner.scan, args.repeats)
+        if sorted(legacy.items()) != sorted(scanned.items()):
+            raise ValueError('Scanner result {} does not match legacy result {}'.format(scanned, legacy))
+
+        # First lookup populates the registry, subsequent lookups are served from it
+        registry = install_registry.InstallRegistry(cache_file=os.path.join(cache_dir, 'registry.json'))
+        registry.lookup('benchmark', [root], scanner.scan)
+        t_registry, _ = install_scan.time_function(
+            lambda: registry.lookup('benchmark', [root], scanner.scan), args.repeats)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return collections.OrderedDict((
+        ('directories', created),
+        ('installations', len(scanned)),
+        ('legacy_search_s', t_legacy),
+        ('scanner_s', t_scanner),
+        ('registry_lookup_s', t_registry),
+    ))
+
+
+def bench_import_time(args):
+    """
+        Measures the cumulative time taken to import pf_control
+    :param argparse.Namespace args:
+    :return dict metrics:
+    """
+    best, imported = import_time.measure('pf_control', args.repeats)
+    return collections.OrderedDict((
+        ('import_pf_control_s', best / 1000.0),
+        ('forbidden_modules_imported', [x for x in import_time.forbidden_modules if x in imported]),
+    ))
+
+
+def characteristic_paths(app):
+    """
+        Returns the path of every characteristic in the library of the fake project
+    :param object app:  Fake PowerFactory application
+    :return list paths:
+    """
+    paths = list()
+    stack = [(app.GetProjectFolder('chars'), 'Library/Operational Library/Characteristics')]
+    while stack:
+        folder, pth = stack.pop()
+        for child in folder.GetContents():
+            child_pth = '{}/{}'.format(pth, child.loc_name)
+            if child.GetClassName() == 'ChaVec':
+                paths.append('{}.ChaVec'.format(child_pth))
+            else:
+                stack.append((child, child_pth))
+    return paths
+
+
+def naive_resolve(root, path):
+    """
+        Resolves a path by listing the contents of each folder along it, as done before the project index
+    :param object root:  Active project
+    :param str path:  Slash separated path
+    :return object obj:
+    """
+    obj = root
+    for part in path.split('/'):
+        obj = obj.GetContents(part)[0]
+    return obj
+
+
+def bench_project_navigation(args):
+    """
+        Times resolving the path of every characteristic in the library by listing each folder along the path
+        compared with the project index
+    :param argparse.Namespace args:
+    :return dict metrics:
+    """
+    powerfactory.reset()
+    powerfactory.configure(library_depth=args.library_depth, library_fan_out=args.library_fan_out)
+    app = powerfactory.GetApplication()
+    app.ActivateProject(project_name)
+    paths = characteristic_paths(app)
+    # Latency only applied once the paths have been listed so that it is only included in the timings
+    powerfactory.configure(latency={'GetContents': args.api_latency})
+    root = app.GetActiveProject()
+
+    t_naive, naive = install_scan.time_function(lambda: [naive_resolve(root, x) for x in paths], args.repeats)
+
+    def indexed():
+        index = project.ProjectIndex.from_app(app)
+        return index, [index.resolve(x) for x in paths]
+    t_index, (index, resolved) = install_scan.time_function(indexed, args.repeats)
+    if naive != resolved:
+        raise ValueError('Project index resolved different objects to the naive search')
+
+    # Resolving the paths again once the index is populated
+    t_warm, _ = install_scan.time_function(lambda: [index.resolve(x) for x in paths], args.repeats)
+
+    return collections.OrderedDict((
+        ('paths', len(paths)),
+        ('get_contents_latency', args.api_latency),
+        ('naive_s', t_naive),
+        ('index_cold_s', t_index),
+        ('index_warm_s', t_warm),
+        ('folders_listed', index.folders_listed),
+    ))
+
+
+def bench_result_extraction(args):
+    """
+        Times reading a results file with the results API (GetColumnValues and GetValue) compared with exporting it
+        with ComRes and parsing the export
+    :param argparse.Namespace args:
+    :return dict metrics:
+    """
+    powerfactory.reset()
+    powerfactory.configure(generators=args.generators, result_rows=args.rows, latency={'ComSim': 0.0})
+    app = powerfactory.GetApplication()
+    batch.activate_study_case(app, project_name, 'Study Case 0')
+    app.GetFromStudyCase('ComSim').Execute()
+    elmres = app.GetFromStudyCase('Results.ElmRes')
+
+    def read(column_values):
+        powerfactory.configure(column_values=column_values)
+        reader = results.ResultsReader(elmres)
+        try:
+            return reader.read()
+        finally:
+            reader.release()
+    t_columns, (index, values, columns) = install_scan.time_function(lambda: read(True), args.repeats)
+    t_values, _ = install_scan.time_function(lambda: read(False), args.repeats)
+    powerfactory.configure(column_values=True)
+
+    out_dir = tempfile.mkdtemp(prefix='pf_suite_export_')
+    try:
+        comres = app.GetFromStudyCase('ComRes')
+        comres.pResult = elmres
+        comres.iopt_exp = 6
+        comres.f_name = os.path.join(out_dir, 'results.csv')
+
+        def export():
+            comres.Execute()
+            return export_reader.ExportReader(comres.f_name).read()
+        t_export, (_, exported, _) = install_scan.time_function(export, args.repeats)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    if exported.shape != values.shape:
+        raise ValueError('Exported results have shape {} but results API returned {}'.format(
+            exported.shape, values.shape))
+
+    return collections.OrderedDict((
+        ('rows', values.shape[0]),
+        ('columns', values.shape[1]),
+        ('get_column_values_s', t_columns),
+        ('get_value_s', t_values),
+        ('comres_export_s', t_export),
+    ))
+
+
+def bench_batch_orchestration(args):
+    """
+        Times running every study case of the fake project on an EnginePool with StudyCaseBatchRunner compared with
+        running them one after another in this process
+    :param argparse.Namespace args:
+    :return dict metrics:
+    """
+    factory_kwargs = dict(
+        study_cases=args.study_cases, generators=args.generators, result_rows=args.rows,
+        latency={'start': args.start_latency, 'ComLdf': args.load_flow_latency, 'ComSim': args.simulation_latency}
+    )
+    commands = ('ComLdf', 'ComSim')
+    collect = functools.partial(results.collect_results, result_name='Results.ElmRes')
+
+    powerfactory.reset()
+    app = powerfactory.engine_factory(**factory_kwargs)
+    study_cases = batch.list_study_cases(app, project_name)
+    t0 = time.perf_counter()
+    for study_case in study_cases:
+        batch.run_study_case(app, project_name, study_case, commands, collect)
+    t_serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pool = session.EnginePool(size=args.sessions, engine_factory=powerfactory.engine_factory,
+                              factory_kwargs=factory_kwargs)
+    with pool:
+        pool.start()
+        t_start = time.perf_counter() - t0
+
+        runner = batch.StudyCaseBatchRunner(pool, project_name, commands, collect=collect)
+        t0 = time.perf_counter()
+        outcome = runner.run(study_cases)
+        t_batch = time.perf_counter() - t0
+
+    failed = [x.name for x in outcome.values() if not x.succeeded]
+    if failed:
+        raise ValueError('Study cases failed: {}'.format(', '.join(failed)))
+
+    return collections.OrderedDict((
+        ('study_cases', len(study_cases)),
+        ('sessions', args.sessions),
+        ('serial_s', t_serial),
+        ('pool_start_s', t_start),
+        ('batch_s', t_batch),
+        ('study_cases_per_second', len(study_cases) / t_batch),
+    ))
+
+
+suite = collections.OrderedDict((
+    ('install_discovery', bench_install_discovery),
+    ('import_time', bench_import_time),
+    ('project_navigation', bench_project_navigation),
+    ('result_extraction', bench_result_extraction),
+    ('batch_orchestration', bench_batch_orchestration),
+))
+
+
+def git_revision():
+    """
+        Returns the git revision of the repository, or None if it cannot be determined
+    :return str|None revision:
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            universal_newlines=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """
+        Returns the times which have increased by more than the tolerance compared with a baseline report
+    :param dict report:  Report produced by this run
+    :param dict baseline:  Report from a previous run
+    :param float tolerance:  Fractional increase which is reported as a regression
+    :return list regressions:  List of (benchmark, metric, baseline, current)
+    """
+    regressions = list()
+    for name, metrics in report['benchmarks'].items():
+        previous = baseline.get('benchmarks', dict()).get(name, dict())
+        for metric, value in metrics.items():
+            if not metric.endswith(time_suffix) or not previous.get(metric):
+                continue
+            if value > previous[metric] * (1.0 + tolerance):
+                regressions.append((name, metric, previous[metric], value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the pf_control benchmark suite against a fake PowerFactory')
+    parser.add_argument('benchmarks', nargs='*', help='Benchmarks to run ({}), default all'.format(', '.join(suite)))
+    parser.add_argument('--output', help='File to write the JSON results to')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=default_tolerance,
+                        help='Fractional increase in a time reported as a regression')
+    parser.add_argument('--verbose', action='store_true', help='Include the pf_control debug messages')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of times each measurement is repeated')
+    parser.add_argument('--directories', type=int, default=20000, help='Number of synthetic install directories')
+    parser.add_argument('--library-depth', type=int, default=3, help='Depth of the characteristics library')
+    parser.add_argument('--library-fan-out', type=int, default=6, help='Folders within each library folder')
+    parser.add_argument('--api-latency', type=float, default=0.0002, help='Latency of each GetContents call (s)')
+    parser.add_argument('--generators', type=int, default=50, help='Number of monitored generators')
+    parser.add_argument('--rows', type=int, default=2000, help='Number of rows in each results file')
+    parser.add_argument('--study-cases', type=int, default=16, help='Number of study cases in the batch')
+    parser.add_argument('--sessions', type=int, default=4, help='Number of engine sessions in the batch pool')
+    parser.add_argument('--start-latency', type=float, default=0.5, help='Time taken to start an engine (s)')
+    parser.add_argument('--load-flow-latency', type=float, default=0.05, help='Time taken by ComLdf (s)')
+    parser.add_argument('--simulation-latency', type=float, default=0.5, help='Time taken by ComSim (s)')
+    args = parser.parse_args()
+    unknown = [x for x in args.benchmarks if x not in suite]
+    if unknown:
+        parser.error('unknown benchmarks: {}'.format(', '.join(unknown)))
+    if not args.verbose:
+        constants.logger.setLevel(logging.WARNING)
+
+    report = collections.OrderedDict((
+        ('timestamp', datetime.datetime.now().isoformat(timespec='seconds')),
+        ('revision', git_revision()),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('cpus', os.cpu_count()),
+        ('settings', vars(args)),
+        ('benchmarks', collections.OrderedDict()),
+    ))
+
+    for name in args.benchmarks or suite:
+        t0 = time.perf_counter()
+        report['benchmarks'][name] = metrics = suite[name](args)
+        print('{} ({:.1f} s)'.format(name, time.perf_counter() - t0))
+        for metric, value in metrics.items():
+            print('\t{:<30}{:>14}'.format(metric, '{:.6g}'.format(value) if isinstance(value, float) else str(value)))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('Results written to <{}>'.format(args.output))
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for name, metric, previous, value in regressions:
+            print('REGRESSION - {} {} {:.4f} s -> {:.4f} s ({:+.0%})'.format(
+                name, metric, previous, value, value / previous - 1.0))
+        if regressions:
+            sys.exit(1)
+        print('No regressions compared with <{}> (tolerance {:.0%})'.format(args.baseline, args.tolerance))
+
+
+if __name__ == '__main__':
+    main()
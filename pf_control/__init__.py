@@ -9,16 +9,69 @@
 """
 import importlib
 import logging
+import os
+import sys
 
 import pf_control.constants as constants
-import pf_control.gui as gui
-import pf_control.pf as pf
 
-# Reload all modules
-constants = importlib.reload(constants)
-gui = importlib.reload(gui)
+# Sub modules are only imported when first accessed (i.e. pf_control.gui) so that importing pf_control does not
+# load tkinter, PIL, etc. for scripts which do not need them
+_lazy_modules = (
+	'gui', 'pf', 'cli', 'json_cache', 'install_registry', 'install_scanner', 'licence', 'licence_host', 'session', 'batch',
+	'project', 'characteristics', 'results', 'export_reader', 'result_store',
+	'monitoring', 'query', 'events', 'snapshot', 'grid_sweep', 'result_cache', 'harmonics', 'profiling', 'engine_api',
+	'licence_profiles'
+)
+
+# Set this environment variable to reload all modules when pf_control is imported (interactive development only)
+reload_env_variable = 'PF_CONTROL_RELOAD'
+
+
+def __getattr__(name):
+	"""
+		Imports a sub module the first time it is accessed as an attribute of the package
+	:param str name:  Name of attribute
+	:return module:
+	"""
+	if name in _lazy_modules:
+		return importlib.import_module('{}.{}'.format(__name__, name))
+	raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+	return sorted(set(globals()) | set(_lazy_modules))
+
 
-if constants.logger is None:
-	logging.basicConfig()
-	constants.logger = logging.getLogger()
-	constants.logger.setLevel(level=logging.DEBUG)
+def setup_logger():
+	"""
+		Creates the default logger if one has not already been defined
+	:return None:
+	"""
+	if constants.logger is None:
+		logging.basicConfig()
+		constants.logger = logging.getLogger()
+		constants.logger.setLevel(level=logging.DEBUG)
+	return None
+
+
+def reload():
+	"""
+		Reloads constants and any sub modules which have already been imported, used during interactive development
+		so that changes are picked up without restarting Python
+	:return None:
+	"""
+	global constants
+	constants = importlib.reload(constants)
+	setup_logger()
+	for name in _lazy_modules:
+		module = sys.modules.get('{}.{}'.format(__name__, name))
+		if module is not None:
+			importlib.reload(module)
+	return None
+
+
+setup_logger()
+
+# Reload all modules
+if os.getenv(reload_env_variable):
+	reload()
@@ -0,0 +1,8 @@
+"""
+	Command line entry point for pf_control, see pf_control.cli for details
+"""
+import sys
+
+import pf_control.cli as cli
+
+sys.exit(cli.main())
@@ -0,0 +1,248 @@
+"""
+#######################################################################################################################
+###											Batch Runner															###
+###		Runs a set of study cases in parallel, each study case being handled by one of the engine sessions in an	###
+###		EnginePool, with failed study cases retried and the wall time of each reported								###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import time
+
+import pf_control.constants as constants
+import pf_control.result_cache as result_cache
+
+
+class StudyCaseError(RuntimeError):
+    """ Raised when a study case cannot be found or one of its commands fails """
+    pass
+
+
+def get_study_case_folder(app):
+    """
+        Returns the folder containing the study cases of the active project
+    :param object app:  PowerFactory application
+    :return object folder:
+    """
+    folder = app.GetProjectFolder('study')
+    if folder is None:
+        raise StudyCaseError('Active project does not contain a study case folder')
+    return folder
+
+
+def activate_project(app, project):
+    """
+        Activates a project if it is not already the active project
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :return object prj:  Active project
+    """
+    prj = app.GetActiveProject()
+    if prj is None or prj.loc_name != project:
+        if app.ActivateProject(project):
+            raise StudyCaseError('Unable to activate project <{}>'.format(project))
+        prj = app.GetActiveProject()
+    return prj
+
+
+def activate_study_case(app, project, study_case):
+    """
+        Activates a study case if it is not already the active study case
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :return object case:  Active study case
+    """
+    activate_project(app, project)
+
+    case = app.GetActiveStudyCase()
+    if case is not None and case.loc_name == study_case:
+        return case
+
+    # GetContents treats * and ? in the name as wildcards so the study cases returned are checked for an exact match
+    cases = [
+        x for x in get_study_case_folder(app).GetContents('{}.IntCase'.format(study_case)) if x.loc_name == study_case
+    ]
+    if not cases:
+        raise StudyCaseError('Study case <{}> not found in project <{}>'.format(study_case, project))
+    if cases[0].Activate():
+        raise StudyCaseError('Unable to activate study case <{}>'.format(study_case))
+    return cases[0]
+
+
+def list_study_cases(app, project):
+    """
+        Job which returns the names of all the study cases in a project
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :return list names:
+    """
+    activate_project(app, project)
+    return [x.loc_name for x in get_study_case_folder(app).GetContents('*.IntCase')]
+
+
+def run_study_case(app, project, study_case, commands, collect=None):
+    """
+        Job which activates a study case, executes each of the commands and then collects the results
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :param tuple commands:  Names of the commands to execute in order (e.g. ('ComHLdf', 'ComFsweep'))
+    :param func collect: (optional) - Function called as collect(app) once the commands have been executed, the
+                                        value returned must be picklable
+    :return (float, object) (wall_time, result):  Time in seconds taken and the value returned by collect, if
+                                                    collect is None a dictionary of {command: return code}
+    """
+    t0 = time.perf_counter()
+    activate_study_case(app, project, study_case)
+
+    return_codes = collections.OrderedDict()
+    for command in commands:
+        cmd = app.GetFromStudyCase(command)
+        if cmd is None:
+            raise StudyCaseError('Command <{}> not found in study case <{}>'.format(command, study_case))
+        return_codes[command] = cmd.Execute()
+        if return_codes[command]:
+            raise StudyCaseError('Command <{}> failed for study case <{}> with error code {}'.format(
+                command, study_case, return_codes[command]))
+
+    result = return_codes if collect is None else collect(app)
+    return time.perf_counter() - t0, result
+
+
+class StudyCaseResult:
+    """
+        Outcome of running a single study case
+    """
+
+    def __init__(self, name):
+        """
+        :param str name:  Name of the study case
+        """
+        self.name = name
+        self.result = None
+        self.wall_time = None
+        self.attempts = 0
+        self.error = None
+        # True if the result was returned from the cache rather than being run
+        self.cached = False
+
+    @property
+    def succeeded(self):
+        return self.error is None and (self.attempts > 0 or self.cached)
+
+
+class StudyCaseBatchRunner:
+    """
+        Class to run a number of study cases in parallel across the sessions of an EnginePool
+    """
+
+    def __init__(self, pool, project, commands, collect=None, retries=None, cache=None, key_details=None):
+        """
+            Initialise the runner
+        :param pf_control.session.EnginePool pool:  Pool of engine sessions to run the study cases on
+        :param str project:  Name of the project
+        :param tuple commands:  Names of the commands to execute for each study case in order
+        :param func collect: (optional) - Function called as collect(app) to obtain the results of each study case,
+                                            must be importable by the worker processes
+        :param int retries: (optional) - Number of times a failed study case is retried
+        :param pf_control.result_cache.ResultCache cache: (optional) - Cache of previous results, study cases whose
+                                                                        key is in the cache are not run
+        :param dict key_details: (optional) - Keyword arguments for pf_control.result_cache.study_key describing
+                                                anything else which changes the results (e.g. command settings,
+                                                characteristic values and monitored variables), required if a cache
+                                                is provided since the settings of the project cannot be detected.
+                                                An empty dictionary confirms nothing else changes the results.
+        """
+        if cache is not None and key_details is None:
+            raise ValueError('key_details must describe the settings which change the results when a cache is used')
+
+        self.logger = constants.logger
+        self.pool = pool
+        self.project = project
+        self.commands = tuple(commands)
+        self.collect = collect
+        self.retries = constants.Batch.retries if retries is None else retries
+        self.cache = cache
+        self.key_details = key_details or dict()
+        self.wall_time = None
+
+    def key(self, study_case):
+        """
+            Returns the key of the results of a study case in the cache, which includes the engine factory of the
+            pool and its arguments (e.g. the PowerFactory version)
+        :param str study_case:  Name of the study case
+        :return str key:
+        """
+        return result_cache.study_key(
+            project=self.project, study_case=study_case, commands=self.commands,
+            collect=result_cache.describe_function(self.collect),
+            engine=[result_cache.describe_function(self.pool.engine_factory), self.pool.factory_kwargs],
+            **self.key_details
+        )
+
+    def run(self, study_cases=None):
+        """
+            Runs the study cases
+        :param list study_cases: (optional) - Names of study cases to run, if None all study cases are run
+        :return collections.OrderedDict results:  Dictionary of {study case name: StudyCaseResult}
+        """
+        t0 = time.perf_counter()
+        if study_cases is None:
+            study_cases = self.pool.run(list_study_cases, self.project)
+
+        results = collections.OrderedDict((name, StudyCaseResult(name)) for name in study_cases)
+        pending = dict()
+        for case in results.values():
+            cached = None if self.cache is None else self.cache.get(self.key(case.name))
+            if cached is not None:
+                case.wall_time, case.result = cached
+                case.cached = True
+            else:
+                pending[self.submit(case)] = case
+
+        while pending:
+            future = next(iter(pending))
+            case = pending.pop(future)
+            try:
+                case.wall_time, case.result = future.result()
+                case.error = None
+                if self.cache is not None:
+                    self.cache.put(self.key(case.name), (case.wall_time, case.result))
+            except Exception as error:
+                case.error = error
+                if case.attempts <= self.retries:
+                    self.logger.warning('Study case <{}> failed on attempt {} and will be retried'.format(
+                        case.name, case.attempts))
+                    pending[self.submit(case)] = case
+
+        self.wall_time = time.perf_counter() - t0
+        self.logger.info(self.report(results))
+        return results
+
+    def submit(self, case):
+        """
+            Submits a study case to the pool
+        :param StudyCaseResult case:
+        :return concurrent.futures.Future future:
+        """
+        case.attempts += 1
+        return self.pool.submit(run_study_case, self.project, case.name, self.commands, self.collect)
+
+    def report(self, results):
+        """
+            Returns a summary table of the wall time of each study case
+        :param dict results:  Dictionary of {study case name: StudyCaseResult}
+        :return str summary:
+        """
+        lines = ['{:<40}{:>10}{:>10}  {}'.format('Study case', 'Time (s)', 'Attempts', 'Status')]
+        for case in results.values():
+            lines.append('{:<40}{:>10}{:>10}  {}'.format(
+                case.name, '' if case.wall_time is None else '{:.2f}'.format(case.wall_time), case.attempts,
+                'CACHED' if case.cached else 'OK' if case.succeeded else 'FAILED'))
+        succeeded = sum(x.succeeded for x in results.values())
+        lines.append('{} of {} study cases completed in {:.2f} s using {} engine session(s)'.format(
+            succeeded, len(results), self.wall_time, self.pool.size))
+        if self.cache is not None:
+            lines.append('Result cache: {}'.format(self.cache.report()))
+        return '\n'.join(lines)
@@ -0,0 +1,161 @@
+"""
+#######################################################################################################################
+###											Characteristics															###
+###		Batched editing of the vectors of PowerFactory vector characteristics (ChaVec), reading all of the targets	###
+###		once and only writing back those vectors which have actually changed										###
+###																													###
+#######################################################################################################################
+"""
+import collections
+
+import numpy as np
+
+import pf_control.constants as constants
+import pf_control.profiling as profiling
+
+
+class CharacteristicChange:
+    """
+        Details of the changes made to a single characteristic vector
+    """
+
+    def __init__(self, name, old, new):
+        """
+        :param str name:  Name of the characteristic
+        :param np.ndarray old:  Vector before the change
+        :param np.ndarray new:  Vector after the change
+        """
+        self.name = name
+        self.old = old
+        self.new = new
+        if old.shape == new.shape:
+            self.indices = np.flatnonzero(np.abs(new - old) > constants.Characteristics.tolerance)
+        else:
+            # Vector has been resized so every element is considered changed
+            self.indices = np.arange(max(old.size, new.size))
+
+    def __str__(self):
+        if self.old.shape != self.new.shape:
+            return '{}: resized from {} to {} values'.format(self.name, self.old.size, self.new.size)
+        return '{}: {}'.format(self.name, ', '.join(
+            '[{}] {:g} -> {:g}'.format(i, self.old[i], self.new[i]) for i in self.indices))
+
+    def __repr__(self):
+        return 'CharacteristicChange({!r}, {} values changed)'.format(self.name, self.indices.size)
+
+
+class CharacteristicEditor:
+    """
+        Class to edit the vectors of a number of characteristics in a single batch.
+
+        The vectors of all of the characteristics are read once when the editor is created.  Updates are then
+        applied to these stored vectors and only the characteristics whose vectors differ are written back to
+        PowerFactory.
+    """
+
+    def __init__(self, characteristics):
+        """
+            Initialise the editor, reading the vectors of all of the characteristics
+        :param dict|list characteristics:  Dictionary of {name: ChaVec object} or list of ChaVec objects which are
+                                            referred to by their loc_name
+        """
+        self.logger = constants.logger
+        if not isinstance(characteristics, dict):
+            characteristics = collections.OrderedDict((x.loc_name, x) for x in characteristics)
+        self.characteristics = characteristics
+        self.vectors = dict()
+        self.refresh()
+
+        # Statistics
+        self.vectors_written = 0
+
+    @classmethod
+    def from_folder(cls, index, path):
+        """
+            Creates an editor for all of the vector characteristics in a folder
+        :param pf_control.project.ProjectIndex index:  Index of the project
+        :param str path:  Path to the folder containing the characteristics
+        :return CharacteristicEditor editor:
+        """
+        return cls(index.children(path, pf_class=constants.Characteristics.pf_class))
+
+    def refresh(self):
+        """
+            Reads the vectors of all of the characteristics from PowerFactory
+        :return None:
+        """
+        self.vectors = {
+            name: np.array(obj.vector, dtype=float) for name, obj in self.characteristics.items()
+        }
+        return None
+
+    def _updated_vector(self, name, update):
+        """
+            Returns the new vector for a characteristic
+        :param str name:  Name of the characteristic
+        :param np.ndarray|dict update:  Either the new vector, where NaN values leave the existing value unchanged,
+                                        or a dictionary of {index: value}
+        :return np.ndarray new:
+        """
+        if name not in self.vectors:
+            raise KeyError('Characteristic <{}> is not being edited, available characteristics are:\n\t{}'.format(
+                name, '\n\t'.join(self.vectors)))
+        current = self.vectors[name]
+
+        if isinstance(update, dict):
+            new = current.copy()
+            new[np.fromiter(update.keys(), dtype=int)] = np.fromiter(update.values(), dtype=float)
+            return new
+
+        update = np.asarray(update, dtype=float)
+        if update.shape != current.shape:
+            # Different length so the vector is replaced entirely
+            return update.copy()
+        return np.where(np.isnan(update), current, update)
+
+    @profiling.profiled()
+    def apply(self, updates, names=None, dry_run=False):
+        """
+            Applies updates to the characteristics and writes back those that have changed
+        :param dict|np.ndarray updates:  Either a dictionary of {name: update} where each update is a vector or
+                                            {index: value} dictionary, or a 2D array with one row per name
+        :param list names: (optional) - Names of the characteristics for each row if updates is a 2D array
+        :param bool dry_run: (optional) - If True nothing is written to PowerFactory and the changes that would be
+                                            made are just returned
+        :return list changes:  List of CharacteristicChange for each characteristic that has changed
+        """
+        if not isinstance(updates, dict):
+            updates = np.atleast_2d(np.asarray(updates, dtype=float))
+            if names is None or len(names) != updates.shape[0]:
+                raise ValueError('A name must be provided for each row of the updates array')
+            updates = collections.OrderedDict(zip(names, updates))
+
+        changes = list()
+        for name, update in updates.items():
+            new = self._updated_vector(name, update)
+            change = CharacteristicChange(name=name, old=self.vectors[name], new=new)
+            if change.indices.size:
+                changes.append(change)
+
+        if dry_run:
+            for change in changes:
+                self.logger.info('DRY RUN - {}'.format(change))
+            return changes
+
+        for change in changes:
+            self.characteristics[change.name].vector = change.new.tolist()
+            self.vectors[change.name] = change.new
+        self.vectors_written += len(changes)
+        self.logger.debug('{} of {} characteristics changed and written to PowerFactory'.format(
+            len(changes), len(updates)))
+
+        return changes
+
+    def as_array(self, names=None):
+        """
+            Returns the current vectors as a 2D array, all vectors must be the same length
+        :param list names: (optional) - Names of the characteristics to include, defaults to all in order
+        :return np.ndarray vectors:  Array with one row per characteristic
+        """
+        names = list(self.vectors) if names is None else names
+        return np.vstack([self.vectors[x] for x in names])
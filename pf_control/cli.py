@@ -0,0 +1,157 @@
+"""
+#######################################################################################################################
+###											Command Line Interface													###
+###		Selects the PowerFactory licence modules for the current user and optionally launches PowerFactory			###
+###		without loading the GUI, run using:  python -m pf_control --help											###
+###																													###
+#######################################################################################################################
+"""
+import argparse
+import queue
+
+import pf_control.constants as constants
+import pf_control.licence as licence
+import pf_control.licence_host as licence_host
+import pf_control.licence_profiles as licence_profiles
+import pf_control.pf as pf
+
+# Exit status codes
+EXIT_SUCCESS = 0
+EXIT_ERROR = 1
+EXIT_INVALID_ARGUMENTS = 2
+EXIT_NO_CONNECTION = 3
+EXIT_CANCELLED = 130
+
+# Exit status associated with the final event from the licence worker
+exit_codes = {
+    licence.EVENT_COMPLETE: EXIT_SUCCESS,
+    licence.EVENT_FAILED: EXIT_NO_CONNECTION,
+    licence.EVENT_CANCELLED: EXIT_CANCELLED,
+    licence.EVENT_ERROR: EXIT_ERROR
+}
+
+
+def build_parser():
+    """
+        Returns the parser for the command line arguments
+    :return argparse.ArgumentParser parser:
+    """
+    licence_names = [x[0] for x in constants.Licence.modules]
+    parser = argparse.ArgumentParser(
+        prog='python -m pf_control',
+        description='Select PowerFactory licence modules for the current user and launch PowerFactory'
+    )
+    parser.add_argument(
+        '--pf-version', dest='pf_version', default=None,
+        help='PowerFactory version to use (e.g. "PowerFactory 2020" or "2020"), defaults to the latest installed'
+    )
+    parser.add_argument(
+        '-l', '--licences', nargs='*', default=list(), choices=licence_names, metavar='LICENCE',
+        help='Licence modules to enable, all others are disabled.  Options: {}'.format(', '.join(licence_names))
+    )
+    parser.add_argument(
+        '-p', '--profile', default=None,
+        help='Name of a saved licence profile to apply, used in place of --licences'
+    )
+    parser.add_argument(
+        '--save-profile', default=None, metavar='NAME', help='Save the licence modules selected as a profile'
+    )
+    parser.add_argument(
+        '--force', action='store_true', help='Write the licence settings even if they are already applied'
+    )
+    parser.add_argument(
+        '--launch', action='store_true', help='Launch PowerFactory once the licence modules have been selected'
+    )
+    parser.add_argument(
+        '--skip-host-check', action='store_true', help='Do not check the licence host can be reached first'
+    )
+    parser.add_argument(
+        '--list', action='store_true', help='List the installed PowerFactory versions and licence modules and exit'
+    )
+    return parser
+
+
+def resolve_version(pf_version, available_versions):
+    """
+        Returns the full name of the PowerFactory version allowing for just the year / service pack to be provided
+    :param str pf_version:  Version provided by the user, if None the latest version is returned
+    :param list available_versions:  Installed PowerFactory versions
+    :return str|None pf_version:  Full name of the PowerFactory version or None if it is not installed
+    """
+    if pf_version is None:
+        return available_versions[-1] if available_versions else None
+    for candidate in (pf_version, 'PowerFactory {}'.format(pf_version)):
+        if candidate in available_versions:
+            return candidate
+    return None
+
+
+def main(argv=None):
+    """
+        Runs the command line interface
+    :param list argv: (optional) - Command line arguments, if not provided sys.argv is used
+    :return int status:  Exit status
+    """
+    args = build_parser().parse_args(argv)
+    logger = constants.logger
+
+    pf_handler = pf.PowerFactory()
+    available_versions = pf_handler.c.available_power_factory_versions
+
+    profiles = licence_profiles.LicenceProfiles()
+
+    if args.list:
+        print('Installed PowerFactory versions:\n\t{}'.format('\n\t'.join(available_versions) or 'None found'))
+        print('Licence modules:\n\t{}'.format(
+            '\n\t'.join('{:<14}{}'.format(*x) for x in constants.Licence.modules)))
+        print('Licence profiles:\n\t{}'.format('\n\t'.join(profiles.names()) or 'None saved'))
+        return EXIT_SUCCESS
+
+    pf_version = resolve_version(args.pf_version, available_versions)
+    if pf_version is None:
+        logger.critical('PowerFactory version <{}> is not installed, available versions are:\n\t{}'.format(
+            args.pf_version, '\n\t'.join(available_versions)))
+        return EXIT_INVALID_ARGUMENTS
+
+    if args.profile is not None:
+        licences = profiles.get(args.profile)
+        if licences is None:
+            logger.critical('Licence profile <{}> does not exist, saved profiles are:\n\t{}'.format(
+                args.profile, '\n\t'.join(profiles.names())))
+            return EXIT_INVALID_ARGUMENTS
+    else:
+        licences = {attribute: int(attribute in args.licences) for attribute, _ in constants.Licence.modules}
+
+    if args.save_profile:
+        profiles.save_profile(args.save_profile, licences)
+        print(constants.Licence.msg_profile_saved.format(args.save_profile))
+
+    worker = licence.LicenceWorker(
+        licences=licences, pf_version=pf_version, initialise=pf_handler.initialise_power_factory,
+        is_reachable=(lambda host: True) if args.skip_host_check else licence_host.is_reachable,
+        profiles=profiles, force=args.force
+    )
+    worker.start()
+
+    # Report progress until the worker has finished, waiting with a timeout since a blocking get cannot be
+    # interrupted by Ctrl+C on Windows
+    try:
+        while True:
+            try:
+                event, message = worker.events.get(timeout=constants.Licence.poll_interval / 1000.0)
+            except queue.Empty:
+                continue
+            print(message)
+            if event in licence.FINAL_EVENTS:
+                break
+    except KeyboardInterrupt:
+        worker.cancel()
+        print(constants.Licence.msg_cancelled)
+        return EXIT_CANCELLED
+
+    status = exit_codes[event]
+    if status == EXIT_SUCCESS and args.launch:
+        logger.debug('Launching {}'.format(pf_version))
+        pf_handler.launch_power_factory(pf_version=pf_version)
+
+    return status
@@ -61,10 +61,24 @@ class PowerFactory:
         # Get reference to logger
         self.logger = logger
 
-        # Find all PowerFactory versions installed in this location
+        # Find all PowerFactory versions installed in this location, the result of the search is cached so that
+        # the directory is only searched again if an installation has changed
+        import pf_control.install_registry as install_registry
+        registry = install_registry.InstallRegistry()
+        installs = registry.lookup(
+            key='glob|{}|{}'.format(self.default_install_directory, self.power_factory_search),
+            roots=[self.default_install_directory],
+            search=self.search_installed_versions
+        )
+        self.available_power_factory_versions = sorted(installs.keys())
+
+    def search_installed_versions(self):
+        """
+            Function searches the default installation directory for all installed PowerFactory versions
+        :return dict installs:  Dictionary of {PowerFactory version: installation path}
+        """
         power_factory_paths = glob.glob(os.path.join(self.default_install_directory, self.power_factory_search))
-        self.available_power_factory_versions = [os.path.basename(x) for x in power_factory_paths]
-        self.available_power_factory_versions.sort()
+        return {os.path.basename(x): x for x in power_factory_paths}
 
     def select_power_factory_version(self, pf_version=None, mock_python_version=str()):
         """
@@ -136,12 +150,351 @@ class PowerFactory:
             raise EnvironmentError('Incompatible Python version')
 
 
+class LicenceHost:
+    """
+        Constants used when checking the PowerFactory licence server can be reached
+    """
+    # Hosts tried if the power_factory_host cannot be reached, in order of preference
+    fallback_hosts = list()
+
+    # TCP ports the licence server listens on (CodeMeter network server)
+    ports = (22350,)
+
+    # Time in seconds to wait for each connection attempt
+    timeout = 2.0
+
+    # Time in seconds for which DNS results are reused
+    dns_ttl = 300.0
+
+
+class Licence:
+    """
+        Constants relating to the PowerFactory licence modules which can be selected for a user
+    """
+    # PowerFactory user attribute for each licence module and the label used to describe it in the GUI
+    modules = (
+        ('harm', 'Power Quality'),
+        ('contingency', 'Contingency Analysis'),
+        ('qdynsim', 'Quasi-Dynamic Simulation'),
+        ('script', 'Scripting and Automation'),
+        ('stab', 'Stability Analysis'),
+        ('smallsig', 'Small Signal Stability'),
+        ('netred', 'Network Reduction'),
+        ('paramid', 'System Parameter Identification'),
+        ('prot', 'Overcurrent Protection'),
+        ('arcflash', 'Arc-Flash Analysis'),
+        ('tececo', 'Techno-Economical Analysis'),
+    )
+
+    # User attributes which are always written with the licence modules
+    fixed_attributes = (('check_adv', 0),)
+
+    # Status messages reported whilst the licence settings are changed
+    msg_check_connection = 'Check VPN connection'
+    msg_no_connection = 'No VPN Connection'
+    msg_initialising = 'Setting up PowerFactory licence (take around 10 seconds)'
+    msg_writing = 'Writing licence selection to PowerFactory user'
+    msg_complete = 'Licence selection updated, click Launch PowerFactory'
+    msg_cancelling = 'Cancelling, waiting for PowerFactory to finish initialising'
+    msg_cancelled = 'Licence selection cancelled'
+    msg_error = 'Error changing licence settings: {}'
+    msg_waiting_engine = 'Waiting for PowerFactory to finish starting'
+    msg_unchanged = 'Licence selection already applied, click Launch PowerFactory'
+    msg_profile_saved = 'Licence profile <{}> saved'
+    msg_profile_no_name = 'Enter a name for the licence profile before saving'
+
+    # If True an engine is started for the default version as soon as the launcher opens so that it is ready when
+    # the selection is confirmed, the engine requires a licence whilst the launcher is open
+    prewarm_engine = True
+
+    # Time in milliseconds between the GUI checking for progress of the licence settings being changed
+    poll_interval = 100
+
+
+class InstallSearch:
+    """
+        Constants used when searching the file system for PowerFactory installations
+    """
+    # Name of the PowerFactory executable that identifies an installation
+    pf_application = '*PowerFactory.exe'
+
+    # Directories to search within, custom_roots can be populated with additional locations (e.g. other drives)
+    roots = [
+        os.getenv('ProgramFiles', r'C:\Program Files'),
+        os.getenv('ProgramFiles(x86)', r'C:\Program Files (x86)')
+    ]
+    custom_roots = list()
+
+    # Maximum number of directories below a root that will be searched, PowerFactory is normally installed at
+    # <root>\DIgSILENT\PowerFactory <version>
+    max_depth = 3
+
+    # Number of threads used to list directories concurrently
+    max_workers = 8
+
+    # Directories which will never contain a PowerFactory installation and so are not searched (case insensitive)
+    pruned_directories = (
+        'Windows*', 'Microsoft*', 'Common Files', 'Internet Explorer', 'WindowsApps', 'ModifiableWindowsApps',
+        'Reference Assemblies', 'MSBuild', 'dotnet', 'IIS', 'IIS Express', 'Uninstall Information', 'Adobe', 'Google',
+        'Mozilla*', 'NVIDIA*', 'Intel', 'AMD', 'Realtek', 'Dell', 'HP', 'Lenovo', 'Java', 'Git', 'Docker',
+        'JetBrains', 'Python', 'Python3*', 'Anaconda*', 'Zoom', 'Citrix', 'VMware', 'Oracle', 'Cisco', '$*', '.*'
+    )
+
+
+class EnginePool:
+    """
+        Constants relating to the pool of PowerFactory engine sessions
+    """
+    # Number of engine sessions (worker processes), each requires a PowerFactory licence
+    size = 1
+
+    # Sessions are recycled after this many jobs (None for no limit) or once their memory has grown by this many bytes
+    max_jobs = 100
+    max_memory_growth = 2 * 1024 ** 3
+
+    # Time in seconds to wait for an engine to start and for a worker process to stop
+    start_timeout = 300.0
+    stop_timeout = 10.0
+
+    # Sessions idle for longer than this many seconds are health checked before being handed out
+    health_check_interval = 60.0
+
+
+class Batch:
+    """
+        Constants relating to running batches of study cases
+    """
+    # Number of times a failed study case is retried
+    retries = 1
+
+
+class ProjectIndex:
+    """
+        Constants relating to resolving paths within a PowerFactory project
+    """
+    # Separator used between the parts of a path
+    separator = '/'
+
+
+class Characteristics:
+    """
+        Constants relating to editing PowerFactory characteristics
+    """
+    # Class of the vector characteristics
+    pf_class = 'ChaVec'
+
+    # Values which differ by no more than this are considered unchanged and are not written back
+    tolerance = 0.0
+
+
+class Results:
+    """
+        Constants relating to reading PowerFactory results
+    """
+    # Name given to the first (time / frequency) column of the results
+    index_name = 'time'
+
+
+class ExportReader:
+    """
+        Constants relating to reading files exported by ComRes
+    """
+    # Number of header rows (objects and variables) written with ciopt_head = 1
+    header_rows = 2
+
+    # Delimiters which are considered when detecting the delimiter of a file
+    delimiters = (',', ';', '\t')
+
+    # Separator between the variable name and its unit in the header (e.g. 'm:u1 in p.u.')
+    unit_separator = ' in '
+
+    encoding = 'utf-8'
+
+    # Default number of rows read in each chunk
+    chunk_rows = 10000
+
+    # Name of each column when converted to Parquet / Feather
+    column_name = '{object}|{variable}'
+
+
+class ResultStore:
+    """
+        Constants relating to the binary result store
+    """
+    # Version of the result store format, must be incremented if the format changes
+    version = 1
+
+    # Data type used to store values unless another is requested
+    dtype = 'float32'
+
+    # Names of the files within each run directory
+    schema_file = 'schema.json'
+    index_file = 'index.npy'
+    variable_file = 'variable_{:04d}.npy'
+
+
+class Monitoring:
+    """
+        Constants relating to registering monitored variables with a results file
+    """
+    # Class of the objects in a results file which define the variables monitored for an object
+    monitor_class = 'IntMon'
+
+
+class Query:
+    """
+        Constants relating to querying calculation relevant objects
+    """
+    all_objects = '*.*'
+    terminals = '*.ElmTerm'
+
+    # Attribute of a terminal that gives the nominal voltage (kV)
+    nominal_voltage = 'uknom'
+
+
+class Events:
+    """
+        Constants relating to running sweeps of RMS / EMT simulation events
+    """
+    # Event types available to an event matrix, each is a sequence of (event class, attributes, time offset in
+    # seconds) so that a single type can be made up of several events (e.g. a fault and its clearance)
+    types = {
+        'trip': (('EvtSwitch', {'i_switch': 0}, 0.0),),
+        'close': (('EvtSwitch', {'i_switch': 1}, 0.0),),
+        'outage': (('EvtOutage', {'i_what': 0}, 0.0),),
+        'short_circuit': (('EvtShc', {'i_shc': 0}, 0.0),),
+        'fault_100ms': (('EvtShc', {'i_shc': 0}, 0.0), ('EvtShc', {'i_shc': 4}, 0.1)),
+    }
+
+    # Folder of the study case which holds the simulation events and the command used to run a simulation
+    event_folder = 'IntEvt'
+    simulation = 'ComSim'
+
+    # Results file in the study case the simulation results are recorded in
+    result_name = 'Results.ElmRes'
+
+    # Name given to the events created for a scenario and to the directory each scenario is stored in
+    event_name = 'pf_control_event_{}'
+    scenario_directory = 'scenario_{:05d}'
+
+    # File in the sweep directory listing each of the scenarios stored
+    sweep_file = 'sweep.json'
+
+
+class Snapshot:
+    """
+        Constants relating to reusing the initial conditions of a simulation
+    """
+    # Commands which calculate the load flow and the initial conditions
+    load_flow = 'ComLdf'
+    initial_conditions = 'ComInc'
+
+    # Command used to save and load a snapshot of the simulation state along with the attribute and values which
+    # select whether the snapshot is saved or loaded, if the command cannot be used the initial conditions are
+    # recalculated each time instead
+    command = 'ComSnapshot'
+    action_attribute = 'iopt_act'
+    action_save = 0
+    action_load = 1
+
+
+class GridSweep:
+    """
+        Constants relating to running harmonic frequency sweeps over a grid of parameter values
+    """
+    # Commands executed for each point of the grid and the results file the frequency sweep is recorded in
+    commands = ('ComHLdf', 'ComFsweep')
+    result_name = 'Freq.Sweep.ElmRes'
+
+    # Name of the axis which selects the operation scenario and the project folder the scenarios are stored in
+    scenario_axis = 'scenario'
+    scenario_folder = 'scen'
+    scenario_class = 'IntScenario'
+
+
+class Harmonics:
+    """
+        Constants relating to the analysis of harmonic impedance frequency sweeps
+    """
+    # Variables of the frequency sweep results giving the magnitude (Ohm) and angle (deg) of the impedance
+    magnitude_variable = 'm:Z'
+    angle_variable = 'm:phiz'
+
+    # Bandwidth used for the Q-factor is where the impedance magnitude is above this fraction of the peak (-3 dB)
+    half_power = 0.5 ** 0.5
+
+    # Number of peaks processed together when calculating Q-factors, limits the memory used to
+    # (frequencies x chunk_peaks) bytes
+    chunk_peaks = 4096
+
+
+class Profiling:
+    """
+        Constants relating to profiling the time spent in PowerFactory and in pf_control
+    """
+    # Setting this environment variable enables profiling when pf_control is imported, if it is set to a file path
+    # (e.g. PF_CONTROL_PROFILE=trace.json) a Chrome trace is written to the file when Python exits
+    env_variable = 'PF_CONTROL_PROFILE'
+
+    # Categories of the spans recorded
+    category_engine = 'powerfactory'
+    category_python = 'pf_control'
+    category_job = 'job'
+
+    # Maximum number of individual spans kept for the trace, beyond this only the summary statistics are updated
+    max_events = 1000000
+
+
+class EngineApi:
+    """
+        Constants relating to selecting the API supported by each PowerFactory version
+    """
+    # GetApplicationExt, which raises ExitError with the error code rather than returning None, is used for versions
+    # from this year onwards
+    ext_min_year = 2019
+    entry_point = 'GetApplication'
+    entry_point_ext = 'GetApplicationExt'
+    exit_error = 'ExitError'
+
+    # Error code reported when GetApplication returns None rather than the application
+    error_no_application = 1
+
+
+class LocalCache:
+    """
+        Constants relating to files stored locally to avoid repeating slow operations
+    """
+    # Directory in which all locally cached files are stored
+    directory = os.path.join(os.getenv('LOCALAPPDATA', os.path.expanduser('~')), 'PSC', 'pf_control')
+
+    # Cache of the PowerFactory installations found, version must be incremented if the format changes
+    install_registry = os.path.join(directory, 'install_registry.json')
+    install_registry_version = 1
+
+    # Cache of the results of study executions, the least recently used results are removed once the total size of
+    # the cache exceeds result_cache_max_size bytes
+    result_cache = os.path.join(directory, 'results')
+    result_cache_max_size = 10 * 1024 ** 3
+    result_cache_extension = '.pkl'
+
+    # Capabilities of the API of each installed PowerFactory version, version must be incremented if the format changes
+    capabilities = os.path.join(directory, 'capabilities.json')
+    capabilities_version = 1
+
+    # Named licence profiles and the licence settings last applied for each user and PowerFactory version
+    licence_profiles = os.path.join(directory, 'licence_profiles.json')
+    licence_profiles_version = 1
+
+
 class GuiDefaults:
     gui_title = 'PSC - PowerFactory Loader'
 
     # Default labels for buttons (only those which get changed during running)
     button_select_settings_label = 'Confirm Selection'
     button_launch_powerfactory_label = 'Launch PowerFactory'
+    button_cancel_settings_label = 'Cancel'
+    button_save_profile_label = 'Save Profile'
+    checkbox_force_label = 'Re-apply even if unchanged'
 
     # Default extensions used in file type selection windows
     xlsx_types = (('xlsx files', '*.xlsx'), ('All Files', '*.*'))
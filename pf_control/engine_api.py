@@ -0,0 +1,182 @@
+"""
+#######################################################################################################################
+###											Engine API																###
+###		Detects the API supported by each installed PowerFactory version (entry point, how errors are reported		###
+###		and optional features such as reading whole result columns) once and caches it alongside the install		###
+###		registry so that callers never need to probe the engine again												###
+###																													###
+#######################################################################################################################
+"""
+import re
+
+import pf_control.constants as constants
+import pf_control.json_cache as json_cache
+
+# EngineApi of the engine initialised in this process, set by pf_control.pf.PowerFactory.initialise_power_factory
+current = None
+
+
+class EngineStartError(RuntimeError):
+    """ Raised when the PowerFactory application cannot be obtained, code is the error code reported by the engine """
+
+    def __init__(self, code, message=None):
+        RuntimeError.__init__(self, message or 'Unable to start PowerFactory, error code {}'.format(code))
+        self.code = code
+
+
+def version_year(pf_version):
+    """
+        Returns the year of a PowerFactory version
+    :param str pf_version:  Version, e.g. 'PowerFactory 2020 SP2'
+    :return int|None year:  Year or None if the version does not contain one
+    """
+    match = re.search(r'\b(\d{4})\b', pf_version or str())
+    return int(match.group(1)) if match else None
+
+
+def detect(module, pf_version):
+    """
+        Detects the capabilities of the powerfactory module for a version, features which can only be determined from
+        a running engine are None until they are recorded
+    :param module module:  Imported powerfactory module
+    :param str pf_version:  Version the module belongs to
+    :return dict capabilities:
+    """
+    year = version_year(pf_version)
+    has_ext = hasattr(module, constants.EngineApi.entry_point_ext)
+    # Where the year is unknown the entry point provided by the module is used
+    use_ext = has_ext and (year is None or year >= constants.EngineApi.ext_min_year)
+    return {
+        'year': year,
+        'entry_point': constants.EngineApi.entry_point_ext if use_ext else constants.EngineApi.entry_point,
+        'exit_error': use_ext and hasattr(module, constants.EngineApi.exit_error),
+        'column_values': None,
+    }
+
+
+class CapabilityRegistry(json_cache.JsonCache):
+    """
+        Persistent cache of the capabilities of each PowerFactory version.  Each entry records the modification time
+        of the directories of the installation (e.g. the Python directory containing the powerfactory module) so the
+        capabilities are detected again if the installation is updated.
+    """
+    description = 'API capabilities cache'
+
+    def __init__(self, cache_file=None):
+        """
+            Initialise the registry
+        :param str cache_file: (optional) - Path to the cache file, defaults to constants.LocalCache.capabilities
+        """
+        json_cache.JsonCache.__init__(
+            self, cache_file=cache_file or constants.LocalCache.capabilities,
+            format_version=constants.LocalCache.capabilities_version
+        )
+
+    def get(self, pf_version, watch, detect_capabilities):
+        """
+            Returns the capabilities of a version, using the cached capabilities if they are still valid
+        :param str pf_version:  PowerFactory version
+        :param list watch:  Directories which change if the installation is updated
+        :param func detect_capabilities:  Function which returns the capabilities if they need to be detected
+        :return dict capabilities:
+        """
+        entry = self.data['entries'].get(pf_version)
+        if entry is not None and self.is_valid(entry):
+            self.logger.debug('API capabilities of <{}> loaded from cache'.format(pf_version))
+            return dict(entry['capabilities'])
+
+        self.logger.debug('Detecting the API capabilities of <{}>'.format(pf_version))
+        capabilities = detect_capabilities()
+        self.data['entries'][pf_version] = {
+            'capabilities': capabilities,
+            'watch': {pth: self.get_mtime(pth) for pth in sorted(set(watch))}
+        }
+        self.save()
+        return dict(capabilities)
+
+    def update(self, pf_version, **features):
+        """
+            Records features detected from a running engine
+        :param str pf_version:  PowerFactory version
+        :param features:  Values of the features, e.g. column_values=True
+        :return None:
+        """
+        entry = self.data['entries'].get(pf_version)
+        if entry is None:
+            return None
+        entry['capabilities'].update(features)
+        self.save()
+        return None
+
+
+class EngineApi:
+    """
+        Adapter for the powerfactory module of a particular version which uses the quickest entry point supported and
+        reports a failure to start the same way regardless of the version
+    """
+
+    def __init__(self, module, pf_version, watch=None, registry=None):
+        """
+            Initialise the adapter, the capabilities are only detected if they are not already cached
+        :param module module:  Imported powerfactory module
+        :param str pf_version:  Version the module belongs to, e.g. 'PowerFactory 2020'
+        :param list watch: (optional) - Directories which change if the installation is updated (e.g. the directory
+                                        the powerfactory module was imported from)
+        :param CapabilityRegistry registry: (optional) - Cache of the capabilities
+        """
+        self.logger = constants.logger
+        self.module = module
+        self.pf_version = pf_version
+        self.registry = registry or CapabilityRegistry()
+        self.capabilities = self.registry.get(pf_version, watch or list(), lambda: detect(module, pf_version))
+
+    @property
+    def entry_point(self):
+        return self.capabilities['entry_point']
+
+    def get_application(self, **kwargs):
+        """
+            Returns the PowerFactory application
+        :param kwargs:  Passed to the entry point (e.g. username and password)
+        :return object app:
+        """
+        func = getattr(self.module, self.entry_point)
+        if self.capabilities['exit_error']:
+            try:
+                app = func(**kwargs)
+            except getattr(self.module, constants.EngineApi.exit_error) as error:
+                raise EngineStartError(error.code)
+        else:
+            app = func(**kwargs)
+
+        if app is None:
+            raise EngineStartError(constants.EngineApi.error_no_application)
+        return app
+
+    def supports(self, feature, obj, attribute):
+        """
+            Returns whether a feature is supported, if it is not yet known it is detected from an object of the
+            running engine and recorded so it is not detected again
+        :param str feature:  Name of the feature in the capabilities, e.g. 'column_values'
+        :param object obj:  Object which provides the feature if it is supported
+        :param str attribute:  Attribute of the object providing the feature, e.g. 'GetColumnValues'
+        :return bool supported:
+        """
+        supported = self.capabilities.get(feature)
+        if supported is None:
+            supported = hasattr(obj, attribute)
+            self.capabilities[feature] = supported
+            self.registry.update(self.pf_version, **{feature: supported})
+        return supported
+
+
+def has_column_values(elmres):
+    """
+        Returns whether whole columns of a results file can be read with GetColumnValues, using the capabilities of
+        the engine initialised in this process where known
+    :param object elmres:  PowerFactory results object (ElmRes)
+    :return bool supported:
+    """
+    if current is None:
+        return hasattr(elmres, 'GetColumnValues')
+    return current.supports('column_values', elmres, 'GetColumnValues')
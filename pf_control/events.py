@@ -0,0 +1,424 @@
+"""
+#######################################################################################################################
+###											Event Sweep																###
+###		Runs a matrix of simulation events (element x event type x time) across the engine sessions of an			###
+###		EnginePool, each scenario creating its events in the IntEvt folder, running ComInc and ComSim and the		###
+###		results being written to a result store as each scenario completes											###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import shutil
+import time
+
+import pf_control.batch as batch
+import pf_control.constants as constants
+import pf_control.monitoring as monitoring
+import pf_control.query as query
+import pf_control.result_store as result_store
+import pf_control.results as results
+import pf_control.snapshot as snapshot
+
+# State of the active study case reused by every scenario run in this process {key: SimulationState}
+_states = dict()
+
+
+class Scenario(collections.namedtuple('Scenario', ('number', 'element', 'event_type', 'time'))):
+    """
+        Single scenario of an event matrix
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return '{}|{}|{:g}'.format(self.element, self.event_type, self.time)
+
+    @property
+    def directory(self):
+        return constants.Events.scenario_directory.format(self.number)
+
+
+class EventMatrix:
+    """
+        Matrix of scenarios made up of every combination of element, event type and event time
+    """
+
+    def __init__(self, element_filter, event_types, times, elements=None, types=None):
+        """
+        :param str element_filter:  Filter for GetCalcRelevantObjects returning the elements the events are applied
+                                    to (e.g. '*.ElmSym')
+        :param list event_types:  Names of the event types to apply (e.g. ['trip', 'fault_100ms'])
+        :param list times:  Times in seconds at which the events are applied
+        :param list elements: (optional) - Names of the elements to include, if None all elements matching the
+                                            filter are included once they have been listed by list_elements
+        :param dict types: (optional) - Definition of the event types, defaults to constants.Events.types
+        """
+        self.element_filter = element_filter
+        self.event_types = list(event_types)
+        self.times = [float(x) for x in times]
+        self.elements = None if elements is None else list(elements)
+        self.types = types or constants.Events.types
+
+        missing = [x for x in self.event_types if x not in self.types]
+        if missing:
+            raise KeyError('Event types {} are not defined, available event types are:\n\t{}'.format(
+                missing, '\n\t'.join(self.types)))
+
+    def scenarios(self):
+        """
+            Returns every scenario in the matrix
+        :return list scenarios:  List of Scenario
+        """
+        if self.elements is None:
+            raise ValueError('Elements of the event matrix have not been listed')
+        return [
+            Scenario(i, element, event_type, t) for i, (element, event_type, t) in
+            enumerate(itertools.product(self.elements, self.event_types, self.times))
+        ]
+
+    def __len__(self):
+        return len(self.elements or []) * len(self.event_types) * len(self.times)
+
+
+class SimulationState:
+    """
+        Objects of a study case which are looked up once per process and then reused by each scenario
+    """
+
+    def __init__(self, app, element_filter, result_name, monitor_spec=None):
+        """
+        :param object app:  PowerFactory application
+        :param str element_filter:  Filter for GetCalcRelevantObjects returning the elements events are applied to
+        :param str result_name:  Name of the results file in the study case
+        :param pf_control.monitoring.MonitorSpec monitor_spec: (optional) - Variables to register with the
+                                                                            results file
+        """
+        self.app = app
+        self.query_cache = query.QueryCache(app)
+        self.elements = {x.loc_name: x for x in self.query_cache.get(element_filter)}
+
+        self.event_folder = self.get(constants.Events.event_folder)
+        self.simulation = self.get(constants.Events.simulation)
+        self.elmres = self.get(result_name)
+
+        if monitor_spec is not None:
+            monitoring.MonitorRegistration(
+                app=app, elmres=self.elmres, query=self.query_cache.get).register(monitor_spec)
+
+        # Initial conditions are restored from a snapshot for each scenario after the first
+        self.initial_conditions = snapshot.InitialConditions(app)
+
+        # Number of scenarios that have reused this state
+        self.scenarios_run = 0
+
+    def get(self, name):
+        """
+            Returns an object from the active study case
+        :param str name:
+        :return object obj:
+        """
+        obj = self.app.GetFromStudyCase(name)
+        if obj is None:
+            raise batch.StudyCaseError('<{}> not found in the active study case'.format(name))
+        return obj
+
+
+def get_state(app, project, study_case, element_filter, result_name, monitor_spec=None):
+    """
+        Activates the study case (if it is not already active) and returns the state for it, the state is only
+        created for the first scenario of a study case run in this process
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :param str element_filter:  Filter for the elements events are applied to
+    :param str result_name:  Name of the results file in the study case
+    :param pf_control.monitoring.MonitorSpec monitor_spec: (optional) - Variables to register with the results file
+    :return SimulationState state:
+    """
+    case = batch.activate_study_case(app, project, study_case)
+    key = (case.GetFullName(), element_filter, result_name, None if monitor_spec is None else monitor_spec.hash)
+    state = _states.get(key)
+    if state is None:
+        # Only a single study case is active at a time so the states for any other study case are discarded
+        _states.clear()
+        state = SimulationState(
+            app=app, element_filter=element_filter, result_name=result_name, monitor_spec=monitor_spec)
+        _states[key] = state
+    return state
+
+
+def list_elements(app, project, study_case, element_filter):
+    """
+        Job which returns the names of the elements matching a filter in a study case
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :param str element_filter:  Filter for GetCalcRelevantObjects
+    :return list names:
+    """
+    batch.activate_study_case(app, project, study_case)
+    return [x.loc_name for x in app.GetCalcRelevantObjects(element_filter)]
+
+
+def create_events(state, scenario, events):
+    """
+        Creates the events for a scenario in the event folder of the study case
+    :param SimulationState state:
+    :param Scenario scenario:
+    :param tuple events:  Sequence of (event class, attributes, time offset) for the event type
+    :return list created:  Events created
+    """
+    element = state.elements.get(scenario.element)
+    if element is None:
+        raise batch.StudyCaseError('Element <{}> not found in the active study case'.format(scenario.element))
+
+    created = list()
+    try:
+        for i, (pf_class, attributes, offset) in enumerate(events):
+            evt = state.event_folder.CreateObject(pf_class, constants.Events.event_name.format(i))
+            if evt is None:
+                raise batch.StudyCaseError('Unable to create event <{}> for scenario <{}>'.format(
+                    pf_class, scenario.name))
+            created.append(evt)
+            evt.p_target = element
+            evt.time = scenario.time + offset
+            for attribute, value in attributes.items():
+                evt.SetAttribute(attribute, value)
+    except Exception:
+        delete_events(created)
+        raise
+    return created
+
+
+def delete_events(events):
+    """
+        Deletes the events created for a scenario
+    :param list events:
+    :return None:
+    """
+    for evt in events:
+        evt.Delete()
+    return None
+
+
+def run_scenario(app, project, study_case, scenario, element_filter, types=None, result_name=None,
+                 monitor_spec=None, objects=None, variables=None):
+    """
+        Job which runs a single scenario, creating its events, running the simulation and reading the results
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :param Scenario scenario:  Scenario to run
+    :param str element_filter:  Filter for the elements events are applied to
+    :param dict types: (optional) - Definition of the event types, defaults to constants.Events.types
+    :param str result_name: (optional) - Name of the results file, defaults to constants.Events.result_name
+    :param pf_control.monitoring.MonitorSpec monitor_spec: (optional) - Variables to register with the results file
+    :param list objects: (optional) - Object names or wildcard patterns of the results to return
+    :param list variables: (optional) - Variable names or wildcard patterns of the results to return
+    :return (float, tuple) (wall_time, (index, values, columns, initialised)):  initialised is True if the initial
+                                                                                conditions had to be recalculated
+    """
+    t0 = time.perf_counter()
+    types = types or constants.Events.types
+    state = get_state(
+        app=app, project=project, study_case=study_case, element_filter=element_filter,
+        result_name=result_name or constants.Events.result_name, monitor_spec=monitor_spec
+    )
+
+    events = create_events(state, scenario, types[scenario.event_type])
+    try:
+        initialised = state.initial_conditions.ensure()
+        error = state.simulation.Execute()
+        if error:
+            raise batch.StudyCaseError('<{}> failed for scenario <{}> with error code {}'.format(
+                constants.Events.simulation, scenario.name, error))
+    finally:
+        delete_events(events)
+    state.scenarios_run += 1
+
+    reader = results.ResultsReader(state.elmres)
+    try:
+        index, values, columns = reader.read(objects=objects, variables=variables)
+    finally:
+        reader.release()
+    return time.perf_counter() - t0, (index, values, columns, initialised)
+
+
+class ScenarioResult(batch.StudyCaseResult):
+    """
+        Outcome of running a single scenario
+    """
+
+    def __init__(self, scenario):
+        """
+        :param Scenario scenario:
+        """
+        super().__init__(scenario.name)
+        self.scenario = scenario
+        # Directory of the result store the results were written to
+        self.pth = None
+        # Whether the initial conditions had to be recalculated rather than being restored from a snapshot
+        self.initialised = None
+
+
+class EventSweep:
+    """
+        Class to run every scenario of an event matrix across the sessions of an EnginePool, writing the results of
+        each scenario to a result store as soon as it completes
+    """
+
+    def __init__(self, pool, project, study_case, matrix, store_dir, monitor_spec=None, result_name=None,
+                 objects=None, variables=None, retries=None):
+        """
+            Initialise the sweep
+        :param pf_control.session.EnginePool pool:  Pool of engine sessions to run the scenarios on
+        :param str project:  Name of the project
+        :param str study_case:  Name of the study case
+        :param EventMatrix matrix:  Scenarios to run
+        :param str store_dir:  Directory the results of each scenario are stored in
+        :param pf_control.monitoring.MonitorSpec monitor_spec: (optional) - Variables to register with the results
+                                                                            file before the first scenario
+        :param str result_name: (optional) - Name of the results file, defaults to constants.Events.result_name
+        :param list objects: (optional) - Object names or wildcard patterns of the results to store
+        :param list variables: (optional) - Variable names or wildcard patterns of the results to store
+        :param int retries: (optional) - Number of times a failed scenario is retried
+        """
+        self.logger = constants.logger
+        self.pool = pool
+        self.project = project
+        self.study_case = study_case
+        self.matrix = matrix
+        self.store_dir = store_dir
+        self.monitor_spec = monitor_spec
+        self.result_name = result_name or constants.Events.result_name
+        self.objects = objects
+        self.variables = variables
+        self.retries = constants.Batch.retries if retries is None else retries
+        self.wall_time = None
+
+    def run(self):
+        """
+            Runs the scenarios
+        :return collections.OrderedDict results:  Dictionary of {scenario name: ScenarioResult}
+        """
+        t0 = time.perf_counter()
+        if self.matrix.elements is None:
+            self.matrix.elements = self.pool.run(
+                list_elements, self.project, self.study_case, self.matrix.element_filter)
+
+        sweep_results = collections.OrderedDict((x.name, ScenarioResult(x)) for x in self.matrix.scenarios())
+        pending = {self.submit(x): x for x in sweep_results.values()}
+
+        while pending:
+            # Scenarios are stored in the order they complete rather than the order they were submitted
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                self.collect(future, pending.pop(future), pending)
+
+        self.wall_time = time.perf_counter() - t0
+        self.write_index(sweep_results)
+        self.logger.info(self.report(sweep_results))
+        return sweep_results
+
+    def collect(self, future, scenario_result, pending):
+        """
+            Stores the results of a completed scenario, resubmitting it if the simulation failed and has retries
+            remaining.  A failure to store the results is not retried since running the simulation again would not
+            change the outcome.
+        :param concurrent.futures.Future future:
+        :param ScenarioResult scenario_result:
+        :param dict pending:  Dictionary of {future: ScenarioResult} that any retry is added to
+        :return None:
+        """
+        try:
+            scenario_result.wall_time, (index, values, columns, scenario_result.initialised) = future.result()
+        except Exception as error:
+            scenario_result.error = error
+            if scenario_result.attempts <= self.retries:
+                self.logger.warning('Scenario <{}> failed on attempt {} and will be retried'.format(
+                    scenario_result.name, scenario_result.attempts))
+                pending[self.submit(scenario_result)] = scenario_result
+            return None
+
+        try:
+            scenario_result.pth = self.store(scenario_result.scenario, index, values, columns)
+            scenario_result.error = None
+        except Exception as error:
+            self.logger.error('Unable to store the results of scenario <{}>: {}'.format(scenario_result.name, error))
+            scenario_result.error = error
+        return None
+
+    def submit(self, scenario_result):
+        """
+            Submits a scenario to the pool
+        :param ScenarioResult scenario_result:
+        :return concurrent.futures.Future future:
+        """
+        scenario_result.attempts += 1
+        return self.pool.submit(
+            run_scenario, self.project, self.study_case, scenario_result.scenario, self.matrix.element_filter,
+            self.matrix.types, self.result_name, self.monitor_spec, self.objects, self.variables
+        )
+
+    def store(self, scenario, index, values, columns):
+        """
+            Writes the results of a scenario to the result store, replacing any results already stored for the
+            scenario (e.g. by a previous sweep into the same directory)
+        :param Scenario scenario:
+        :param np.ndarray index:
+        :param np.ndarray values:
+        :param list columns:
+        :return str pth:  Directory the scenario was stored in
+        """
+        pth = os.path.join(self.store_dir, scenario.directory)
+        if os.path.exists(pth):
+            shutil.rmtree(pth)
+        metadata = {'element': scenario.element, 'event_type': scenario.event_type, 'time': scenario.time}
+        return result_store.store_results(pth, index=index, values=values, columns=columns, metadata=metadata)
+
+    def write_index(self, sweep_results):
+        """
+            Writes the list of scenarios and the directory each was stored in to the sweep directory
+        :param dict sweep_results:  Dictionary of {scenario name: ScenarioResult}
+        :return None:
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        scenarios = [
+            {
+                'element': x.scenario.element, 'event_type': x.scenario.event_type, 'time': x.scenario.time,
+                'directory': x.scenario.directory if x.succeeded else None, 'wall_time': x.wall_time
+            } for x in sweep_results.values()
+        ]
+        with open(os.path.join(self.store_dir, constants.Events.sweep_file), 'w') as f:
+            json.dump({'project': self.project, 'study_case': self.study_case, 'scenarios': scenarios}, f, indent=1)
+        return None
+
+    def scenarios_per_hour(self, sweep_results):
+        """
+            Returns the number of scenarios completed per hour
+        :param dict sweep_results:  Dictionary of {scenario name: ScenarioResult}
+        :return float throughput:
+        """
+        if not self.wall_time:
+            return 0.0
+        return sum(x.succeeded for x in sweep_results.values()) * 3600.0 / self.wall_time
+
+    def report(self, sweep_results):
+        """
+            Returns a summary of the sweep
+        :param dict sweep_results:  Dictionary of {scenario name: ScenarioResult}
+        :return str summary:
+        """
+        failed = [x for x in sweep_results.values() if not x.succeeded]
+        lines = ['Scenario <{}> failed: {}'.format(x.name, x.error) for x in failed]
+        lines.append('{} of {} scenarios completed in {:.2f} s using {} engine session(s) ({:.0f} scenarios/hour)'
+                     .format(len(sweep_results) - len(failed), len(sweep_results), self.wall_time, self.pool.size,
+                             self.scenarios_per_hour(sweep_results)))
+        completed = [x for x in sweep_results.values() if x.succeeded]
+        lines.append('Initial conditions restored from a snapshot for {} of {} scenarios'.format(
+            sum(not x.initialised for x in completed), len(completed)))
+        return '\n'.join(lines)
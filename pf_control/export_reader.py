@@ -0,0 +1,234 @@
+"""
+#######################################################################################################################
+###											Export Reader															###
+###		Streaming reader for the CSV / text files written by ComRes, parsing the two row PowerFactory header and	###
+###		returning the values in chunks of rows so that files larger than memory can be processed					###
+###																													###
+#######################################################################################################################
+"""
+import fnmatch
+import io
+import itertools
+import json
+
+import numpy as np
+
+import pf_control.constants as constants
+
+
+class ExportReader:
+    """
+        Class to read a ComRes export (iopt_exp = 6 CSV or iopt_exp = 4 text) with the header included
+        (ciopt_head = 1).
+
+        The first row of the header contains the object of each column and the second row the variable (optionally
+        followed by its unit, e.g. 'm:u1 in p.u.').  The first column is the time / frequency.  Only the header is
+        read when the reader is created, the values are then read in chunks with iter_chunks.
+    """
+
+    def __init__(self, pth, delimiter=None, decimal='.', encoding=None):
+        """
+            Initialise the reader and parse the header
+        :param str pth:  Path to the exported file
+        :param str delimiter: (optional) - Column delimiter, if None it is detected from the header
+        :param str decimal: (optional) - Decimal separator used for the values
+        :param str encoding: (optional) - Encoding of the file, defaults to constants.ExportReader.encoding
+        """
+        self.logger = constants.logger
+        self.pth = pth
+        self.decimal = decimal
+        self.encoding = encoding or constants.ExportReader.encoding
+
+        with open(self.pth, 'r', encoding=self.encoding) as f:
+            header = [f.readline().rstrip('\r\n') for _ in range(constants.ExportReader.header_rows)]
+
+        self.delimiter = delimiter or self.detect_delimiter(header[0])
+
+        object_row, variable_row = (self.split(x) for x in header)
+        if len(object_row) != len(variable_row):
+            raise ValueError('Header of <{}> has {} objects but {} variables'.format(
+                self.pth, len(object_row), len(variable_row)))
+
+        # Objects are only given for the first column of each object so are carried forward
+        self.objects = list()
+        current = str()
+        for obj in object_row[1:]:
+            current = obj.strip() or current
+            self.objects.append(current)
+
+        self.variables = list()
+        self.units = list()
+        for var in variable_row[1:]:
+            name, _, unit = var.strip().partition(constants.ExportReader.unit_separator)
+            self.variables.append(name.strip())
+            self.units.append(unit.strip())
+
+        self.index_name = variable_row[0].strip().partition(constants.ExportReader.unit_separator)[0].strip()
+        self._columns = list(zip(self.objects, self.variables))
+
+    @staticmethod
+    def detect_delimiter(line):
+        """
+            Returns the most common of the possible delimiters in a line
+        :param str line:
+        :return str delimiter:
+        """
+        return max(constants.ExportReader.delimiters, key=line.count)
+
+    def split(self, line):
+        """
+            Splits a header line into its columns
+        :param str line:
+        :return list parts:
+        """
+        return [x.strip().strip('"') for x in line.split(self.delimiter)]
+
+    @property
+    def columns(self):
+        """
+            Object and variable of each column (excluding the time / frequency column)
+        :return list columns:  List of (object, variable) tuples, built once when the header is read
+        """
+        return self._columns
+
+    def select(self, objects=None, variables=None):
+        """
+            Returns the indices of the columns matching the objects and variables
+        :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+        :return list indices:  Indices of the columns excluding the time / frequency column
+        """
+        def matches(value, patterns):
+            return patterns is None or any(fnmatch.fnmatchcase(value, x) for x in patterns)
+
+        if isinstance(objects, str):
+            objects = [objects]
+        if isinstance(variables, str):
+            variables = [variables]
+
+        return [i for i, (obj, var) in enumerate(self.columns) if matches(obj, objects) and matches(var, variables)]
+
+    def multi_index(self, indices=None):
+        """
+            Returns a pandas MultiIndex of (object, variable) for the columns
+        :param list indices: (optional) - Indices of the columns to include, if None all columns
+        :return pandas.MultiIndex:
+        """
+        import pandas as pd
+
+        columns = self.columns
+        if indices is not None:
+            columns = [columns[i] for i in indices]
+        return pd.MultiIndex.from_tuples(columns, names=('object', 'variable'))
+
+    def iter_chunks(self, objects=None, variables=None, chunk_rows=None, dtype=float):
+        """
+            Reads the values of the selected columns in chunks of rows
+        :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+        :param int chunk_rows: (optional) - Number of rows in each chunk, defaults to constants.ExportReader
+        :param dtype: (optional) - Data type of the values
+        :return generator: Yields (index, values) for each chunk where index is the time / frequency of each row and
+                            values is a 2D array of (rows x selected columns)
+        """
+        chunk_rows = chunk_rows or constants.ExportReader.chunk_rows
+        indices = self.select(objects=objects, variables=variables)
+        usecols = [0] + [i + 1 for i in indices]
+
+        with open(self.pth, 'r', encoding=self.encoding) as f:
+            for _ in range(constants.ExportReader.header_rows):
+                f.readline()
+
+            while True:
+                lines = list(itertools.islice(f, chunk_rows))
+                if not lines:
+                    break
+                if self.decimal != '.':
+                    lines = [x.replace(self.decimal, '.') for x in lines]
+
+                data = np.loadtxt(
+                    io.StringIO(''.join(lines)), delimiter=self.delimiter,
+                    usecols=usecols, dtype=dtype, ndmin=2
+                )
+                yield data[:, 0], data[:, 1:]
+
+    def read(self, objects=None, variables=None, dtype=float):
+        """
+            Reads all of the rows of the selected columns, only suitable where the selection fits in memory
+        :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+        :param dtype: (optional) - Data type of the values
+        :return (np.ndarray, np.ndarray, list) (index, values, columns):
+        """
+        indices = self.select(objects=objects, variables=variables)
+        columns = [self.columns[i] for i in indices]
+        chunks = list(self.iter_chunks(objects=objects, variables=variables, dtype=dtype))
+        if not chunks:
+            return np.empty(0), np.empty((0, len(indices)), dtype=dtype), columns
+        index = np.concatenate([x[0] for x in chunks])
+        values = np.concatenate([x[1] for x in chunks])
+        return index, values, columns
+
+    def arrow_schema(self, indices, dtype=np.float64):
+        """
+            Returns the pyarrow schema used when converting the selected columns, the objects, variables and units
+            are stored in the schema metadata
+        :param list indices:  Indices of the selected columns
+        :param dtype: (optional) - Data type of the values
+        :return pyarrow.Schema schema:
+        """
+        import pyarrow as pa
+
+        value_type = pa.from_numpy_dtype(np.dtype(dtype))
+        fields = [pa.field(self.index_name or constants.Results.index_name, pa.float64())]
+        fields += [
+            pa.field(constants.ExportReader.column_name.format(
+                object=self.objects[i], variable=self.variables[i]), value_type) for i in indices
+        ]
+        metadata = {
+            'objects': json.dumps([self.objects[i] for i in indices]),
+            'variables': json.dumps([self.variables[i] for i in indices]),
+            'units': json.dumps([self.units[i] for i in indices]),
+            'source': self.pth
+        }
+        return pa.schema(fields, metadata=metadata)
+
+    def convert(self, out_pth, file_format='parquet', objects=None, variables=None, chunk_rows=None, dtype=float):
+        """
+            Converts the selected columns to a Parquet or Feather file one chunk at a time
+        :param str out_pth:  File to write
+        :param str file_format: (optional) - 'parquet' or 'feather'
+        :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+        :param int chunk_rows: (optional) - Number of rows in each chunk
+        :param dtype: (optional) - Data type of the values
+        :return int rows:  Number of rows written
+        """
+        import pyarrow as pa
+
+        indices = self.select(objects=objects, variables=variables)
+        schema = self.arrow_schema(indices, dtype=dtype)
+
+        if file_format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(out_pth, schema)
+        elif file_format == 'feather':
+            # Feather (version 2) is the Arrow IPC file format
+            writer = pa.ipc.new_file(out_pth, schema)
+        else:
+            raise ValueError('Unsupported file format <{}>, must be parquet or feather'.format(file_format))
+
+        rows = 0
+        try:
+            for index, values in self.iter_chunks(
+                    objects=objects, variables=variables, chunk_rows=chunk_rows, dtype=dtype):
+                arrays = [pa.array(index.astype(np.float64))]
+                arrays += [pa.array(values[:, j]) for j in range(values.shape[1])]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                rows += index.size
+        finally:
+            writer.close()
+
+        self.logger.debug('{} rows of {} columns converted from <{}> to <{}>'.format(
+            rows, len(indices), self.pth, out_pth))
+        return rows
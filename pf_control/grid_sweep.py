@@ -0,0 +1,452 @@
+"""
+#######################################################################################################################
+###											Grid Sweep																###
+###		Runs a harmonic frequency sweep for every combination of a grid of characteristic values and operation		###
+###		scenarios across the engine sessions of an EnginePool, only running each distinct combination once and		###
+###		assembling the results into a single N-dimensional array													###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import concurrent.futures
+import functools
+import itertools
+import time
+
+import numpy as np
+
+import pf_control.batch as batch
+import pf_control.characteristics as characteristics
+import pf_control.constants as constants
+import pf_control.project as project_index
+import pf_control.result_cache as result_cache
+import pf_control.results as results
+
+# Characteristic editor for the active project reused by every point run in this process {key: CharacteristicEditor}
+_editors = dict()
+
+
+class GridAxis(collections.namedtuple('GridAxis', ('name', 'values', 'path', 'index'))):
+    """
+        Single axis of a parameter grid, either the values of a characteristic (path is the path to the
+        characteristic) or the names of operation scenarios (path is None)
+    """
+    __slots__ = ()
+
+
+class ParameterGrid:
+    """
+        Grid of parameter values, the sweep is run for every combination of the values of each axis
+    """
+
+    def __init__(self):
+        self.axes = collections.OrderedDict()
+
+    def add(self, name, values, path=None, index=0):
+        """
+            Adds an axis to the grid
+        :param str name:  Name of the axis, constants.GridSweep.scenario_axis for the operation scenario
+        :param list values:  Values of the axis, these are the names of the operation scenarios for the scenario axis
+        :param str path: (optional) - Path to the characteristic within the project (e.g.
+                                        'Library/Operational Library/Characteristics/OC_Intact_V/L'), required for
+                                        all axes other than the scenario axis
+        :param int index: (optional) - Index within the vector of the characteristic that is set, if None each
+                                        value is the complete vector
+        :return ParameterGrid self:
+        """
+        if name in self.axes:
+            raise KeyError('Axis <{}> has already been added to the grid'.format(name))
+        if path is None and name != constants.GridSweep.scenario_axis:
+            raise ValueError('A characteristic path must be provided for axis <{}>'.format(name))
+        # An axis setting the complete vector would overwrite any other axis of the same characteristic
+        for axis in self.axes.values():
+            if path is not None and axis.path == path and (index is None or axis.index is None or axis.index == index):
+                raise ValueError('Axis <{}> and axis <{}> both set {} of characteristic <{}>'.format(
+                    axis.name, name, 'the vector' if index is None or axis.index is None else 'index {}'.format(index),
+                    path))
+
+        # Values are converted to built in types so that they can be included in the hash of each point
+        values = [np.asarray(x).tolist() if isinstance(x, (list, tuple, np.ndarray, np.generic)) else x for x in values]
+        self.axes[name] = GridAxis(name=name, values=values, path=path, index=index)
+        return self
+
+    @property
+    def shape(self):
+        return tuple(len(x.values) for x in self.axes.values())
+
+    def targets(self):
+        """
+            Returns the details required by the worker processes to apply the value of each axis
+        :return dict targets:  Dictionary of {axis name: (characteristic path, index)}
+        """
+        return collections.OrderedDict((name, (axis.path, axis.index)) for name, axis in self.axes.items())
+
+    def combinations(self):
+        """
+            Returns every combination of the values of the axes
+        :return list combinations:  List of (position, settings) where position is the index of the value of each
+                                    axis and settings is a dictionary of {axis name: value}
+        """
+        names = list(self.axes)
+        return [
+            (tuple(i for i, _ in point), collections.OrderedDict(zip(names, (value for _, value in point))))
+            for point in itertools.product(*(enumerate(x.values) for x in self.axes.values()))
+        ]
+
+
+class GridResult:
+    """
+        Results of a grid sweep as a single array with one dimension for each axis followed by the frequency and the
+        columns of the results
+    """
+
+    def __init__(self, axes, index, columns, values):
+        """
+        :param collections.OrderedDict axes:  Dictionary of {axis name: values}
+        :param np.ndarray index:  Frequencies of the sweep
+        :param list columns:  List of (object, variable) for each column
+        :param np.ndarray values:  Array of (axis 1 x ... x axis N x frequencies x columns), NaN where a point failed
+        """
+        self.axes = axes
+        self.index = index
+        self.columns = columns
+        self.values = values
+
+    def point(self, **settings):
+        """
+            Returns the results for a single value of some or all of the axes
+        :param settings:  Value of each axis to select, axes not included are kept in full
+        :return np.ndarray values:
+        """
+        selection = list()
+        for name, values in self.axes.items():
+            if name in settings:
+                if settings[name] not in values:
+                    raise KeyError('Value {} is not one of the values of axis <{}>'.format(settings[name], name))
+                selection.append(values.index(settings[name]))
+            else:
+                selection.append(slice(None))
+        return self.values[tuple(selection)]
+
+    def column(self, obj, variable):
+        """
+            Returns the results of a single column for every point of the grid
+        :param str obj:  Name of the object
+        :param str variable:  Name of the variable (e.g. 'm:Z')
+        :return np.ndarray values:  Array of (axis 1 x ... x axis N x frequencies)
+        """
+        return self.values[..., self.columns.index((obj, variable))]
+
+
+def activate_scenario(app, name):
+    """
+        Activates an operation scenario if it is not already the active operation scenario
+    :param object app:  PowerFactory application
+    :param str name:  Name of the operation scenario
+    :return None:
+    """
+    active = app.GetActiveScenario()
+    if active is not None and active.loc_name == name:
+        return None
+
+    folder = app.GetProjectFolder(constants.GridSweep.scenario_folder)
+    scenarios = folder.GetContents('{}.{}'.format(name, constants.GridSweep.scenario_class)) if folder else list()
+    # As for study cases the name may contain wildcards
+    scenarios = [x for x in scenarios if x.loc_name == name]
+    if not scenarios:
+        raise batch.StudyCaseError('Operation scenario <{}> not found in the active project'.format(name))
+    if scenarios[0].Activate():
+        raise batch.StudyCaseError('Unable to activate operation scenario <{}>'.format(name))
+    return None
+
+
+def get_editor(app, paths):
+    """
+        Returns the characteristic editor for the characteristics of the grid, the editor is only created for the
+        first point of a project run in this process
+    :param object app:  PowerFactory application
+    :param tuple paths:  Paths of the characteristics
+    :return pf_control.characteristics.CharacteristicEditor editor:
+    """
+    key = (app.GetActiveProject().GetFullName(), paths)
+    editor = _editors.get(key)
+    if editor is None:
+        _editors.clear()
+        index = project_index.ProjectIndex.from_app(app)
+        editor = characteristics.CharacteristicEditor(
+            characteristics=collections.OrderedDict((x, index.resolve(x)) for x in paths))
+        _editors[key] = editor
+    return editor
+
+
+def apply_settings(app, settings, targets):
+    """
+        Applies the value of each axis of a point of the grid, only the characteristics that change are written
+    :param object app:  PowerFactory application
+    :param dict settings:  Dictionary of {axis name: value}
+    :param dict targets:  Dictionary of {axis name: (characteristic path, index)}
+    :return None:
+    """
+    updates = collections.OrderedDict()
+    for name, value in settings.items():
+        path, index = targets[name]
+        if path is None:
+            activate_scenario(app, value)
+        elif index is None:
+            updates[path] = value
+        else:
+            updates.setdefault(path, dict())[index] = value
+
+    if updates:
+        editor = get_editor(app, tuple(sorted(x for x, _ in targets.values() if x is not None)))
+        editor.apply(updates)
+    return None
+
+
+def capture_settings(app, targets):
+    """
+        Returns the current values of everything the axes of the grid change so that they can be restored
+    :param object app:  PowerFactory application
+    :param dict targets:  Dictionary of {axis name: (characteristic path, index)}
+    :return dict original:  Dictionary with the active operation scenario (if there is a scenario axis) and the
+                            vector of each characteristic {path: vector}
+    """
+    original = dict()
+    if any(path is None for path, _ in targets.values()):
+        original['scenario'] = app.GetActiveScenario()
+
+    paths = tuple(sorted(x for x, _ in targets.values() if x is not None))
+    if paths:
+        editor = get_editor(app, paths)
+        # The characteristics may have been changed since the editor was created
+        editor.refresh()
+        original['characteristics'] = collections.OrderedDict((x, editor.vectors[x].copy()) for x in paths)
+    return original
+
+
+def restore_settings(app, targets, original):
+    """
+        Restores the characteristics and operation scenario captured by capture_settings
+    :param object app:  PowerFactory application
+    :param dict targets:  Dictionary of {axis name: (characteristic path, index)}
+    :param dict original:  Values returned by capture_settings
+    :return None:
+    """
+    if original.get('characteristics'):
+        editor = get_editor(app, tuple(sorted(x for x, _ in targets.values() if x is not None)))
+        editor.apply(original['characteristics'])
+
+    if 'scenario' in original:
+        scenario = original['scenario']
+        active = app.GetActiveScenario()
+        if scenario is None and active is not None:
+            active.Deactivate()
+        elif scenario is not None and active != scenario:
+            if scenario.Activate():
+                raise batch.StudyCaseError('Unable to reactivate operation scenario <{}>'.format(scenario.loc_name))
+    return None
+
+
+def run_grid_point(app, project, study_case, settings, targets, commands, result_name, objects=None, variables=None):
+    """
+        Job which applies the settings of a point of the grid, runs the commands and reads the results.  The
+        characteristics and operation scenario are restored afterwards (even if the point fails) so the project is
+        left as it was found and the settings of one point can never leak into another job run by the same engine.
+    :param object app:  PowerFactory application
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :param dict settings:  Dictionary of {axis name: value}
+    :param dict targets:  Dictionary of {axis name: (characteristic path, index)}
+    :param tuple commands:  Names of the commands to execute in order
+    :param str result_name:  Name of the results file in the study case
+    :param list objects: (optional) - Object names or wildcard patterns of the results to return
+    :param list variables: (optional) - Variable names or wildcard patterns of the results to return
+    :return (float, tuple) (wall_time, (index, values, columns)):
+    """
+    batch.activate_study_case(app, project, study_case)
+    original = capture_settings(app, targets)
+    try:
+        apply_settings(app, settings, targets)
+        collect = functools.partial(
+            results.collect_results, result_name=result_name, objects=objects, variables=variables)
+        return batch.run_study_case(app, project, study_case, commands, collect=collect)
+    finally:
+        restore_settings(app, targets, original)
+
+
+class GridSweep:
+    """
+        Class to run a frequency sweep for every point of a parameter grid across the sessions of an EnginePool.
+
+        Each point is identified by a hash of everything that determines its results, points with the same hash
+        (within this grid or already in the cache from a previous sweep) are only run once.  The characteristics and
+        operation scenario changed by each point are restored once it has run.
+    """
+
+    def __init__(self, pool, project, study_case, grid, commands=None, result_name=None, objects=None,
+                 variables=None, cache=None, retries=None, key_details=None):
+        """
+            Initialise the sweep
+        :param pf_control.session.EnginePool pool:  Pool of engine sessions to run the points on
+        :param str project:  Name of the project
+        :param str study_case:  Name of the study case
+        :param ParameterGrid grid:  Grid of parameter values
+        :param tuple commands: (optional) - Commands to execute for each point, defaults to constants.GridSweep
+        :param str result_name: (optional) - Name of the results file, defaults to constants.GridSweep
+        :param list objects: (optional) - Object names or wildcard patterns of the results to return
+        :param list variables: (optional) - Variable names or wildcard patterns of the results to return (e.g.
+                                            ['m:Z', 'm:phiz'])
+        :param pf_control.result_cache.ResultCache|dict cache: (optional) - Cache of {hash: (index, values, columns)}
+                                        of previous results, which is updated with the results of each point run
+        :param int retries: (optional) - Number of times a failed point is retried
+        :param dict key_details: (optional) - Details of anything else which changes the results (e.g. command
+                                                settings or changes to the network), included in the hash of each
+                                                point.  Required if a cache is provided since the settings of the
+                                                project cannot be detected, an empty dictionary confirms nothing else
+                                                changes the results.
+        """
+        if cache is not None and key_details is None:
+            raise ValueError('key_details must describe the settings which change the results when a cache is used')
+
+        self.logger = constants.logger
+        self.pool = pool
+        self.project = project
+        self.study_case = study_case
+        self.grid = grid
+        self.commands = tuple(commands or constants.GridSweep.commands)
+        self.result_name = result_name or constants.GridSweep.result_name
+        self.objects = objects
+        self.variables = variables
+        self.cache = dict() if cache is None else cache
+        self.retries = constants.Batch.retries if retries is None else retries
+        self.key_details = key_details or dict()
+        self.wall_time = None
+
+        # Statistics for the last sweep
+        self.points = 0
+        self.duplicates = 0
+        self.cache_hits = 0
+        self.executed = 0
+        self.failed = 0
+
+    def point_hash(self, settings):
+        """
+            Returns the hash of a point of the grid, which includes the engine factory of the pool and its
+            arguments (e.g. the PowerFactory version)
+        :param dict settings:  Dictionary of {axis name: value}
+        :return str hash:
+        """
+        targets = self.grid.targets()
+        return result_cache.content_hash({
+            'project': self.project,
+            'study_case': self.study_case,
+            'commands': self.commands,
+            'result_name': self.result_name,
+            'objects': self.objects,
+            'variables': self.variables,
+            'settings': [[targets[name], value] for name, value in sorted(settings.items())],
+            'engine': [result_cache.describe_function(self.pool.engine_factory), self.pool.factory_kwargs],
+            'details': self.key_details
+        })
+
+    def run(self):
+        """
+            Runs the sweep
+        :return GridResult result:
+        """
+        t0 = time.perf_counter()
+        combinations = self.grid.combinations()
+
+        # Dictionary of {hash: [positions]} so that each distinct point is only run once
+        points = collections.OrderedDict()
+        settings = dict()
+        for position, point_settings in combinations:
+            key = self.point_hash(point_settings)
+            points.setdefault(key, list()).append(position)
+            settings[key] = point_settings
+
+        self.points = len(combinations)
+        self.duplicates = self.points - len(points)
+        self.executed = self.failed = 0
+
+        # Dictionary of {hash: (index, values, columns)} for this sweep, kept separately from the cache since the
+        # cache may remove results before the sweep has completed
+        point_results = dict()
+        pending = dict()
+        for key in points:
+            cached = self.cache.get(key)
+            if cached is not None:
+                point_results[key] = cached
+            else:
+                point = batch.StudyCaseResult(key)
+                pending[self.submit(point, settings[key])] = point
+        self.cache_hits = len(point_results)
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                point = pending.pop(future)
+                try:
+                    point.wall_time, point_results[point.name] = future.result()
+                    self.cache[point.name] = point_results[point.name]
+                    self.executed += 1
+                except Exception as error:
+                    point.error = error
+                    if point.attempts <= self.retries:
+                        self.logger.warning('Grid point {} failed on attempt {} and will be retried'.format(
+                            dict(settings[point.name]), point.attempts))
+                        pending[self.submit(point, settings[point.name])] = point
+                    else:
+                        self.logger.error('Grid point {} failed: {}'.format(dict(settings[point.name]), error))
+                        self.failed += 1
+
+        grid_result = self.assemble(points, point_results)
+        self.wall_time = time.perf_counter() - t0
+        self.logger.info(self.report())
+        return grid_result
+
+    def submit(self, point, settings):
+        """
+            Submits a point of the grid to the pool
+        :param pf_control.batch.StudyCaseResult point:
+        :param dict settings:  Dictionary of {axis name: value}
+        :return concurrent.futures.Future future:
+        """
+        point.attempts += 1
+        return self.pool.submit(
+            run_grid_point, self.project, self.study_case, settings, self.grid.targets(), self.commands,
+            self.result_name, self.objects, self.variables
+        )
+
+    def assemble(self, points, point_results):
+        """
+            Assembles the results of every point into a single array
+        :param dict points:  Dictionary of {hash: [positions]}
+        :param dict point_results:  Dictionary of {hash: (index, values, columns)} for each point that completed
+        :return GridResult result:
+        """
+        available = [key for key in points if key in point_results]
+        if not available:
+            raise batch.StudyCaseError('No points of the grid completed successfully')
+
+        index, first_values, columns = point_results[available[0]]
+        values = np.full(self.grid.shape + first_values.shape, np.nan)
+        for key in available:
+            point_index, point_values, point_columns = point_results[key]
+            if list(point_columns) != list(columns) or not np.array_equal(point_index, index):
+                raise ValueError('Results of grid point {} do not have the same frequencies and columns as the '
+                                 'other points'.format(points[key][0]))
+            for position in points[key]:
+                values[position] = point_values
+
+        axes = collections.OrderedDict((name, axis.values) for name, axis in self.grid.axes.items())
+        return GridResult(axes=axes, index=index, columns=list(columns), values=values)
+
+    def report(self):
+        """
+            Returns a summary of the sweep
+        :return str summary:
+        """
+        return ('{} grid points ({} duplicates, {} already cached) with {} run and {} failed in {:.2f} s using {} '
+                'engine session(s)'.format(self.points, self.duplicates, self.cache_hits, self.executed, self.failed,
+                                           self.wall_time, self.pool.size))
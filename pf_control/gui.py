@@ -6,16 +6,19 @@ import tkinter as tk
 import tkinter.messagebox as messagebox
 import tkinter.ttk as ttk
 import os
+import collections
 from tkinter import *
 
 from PIL import Image, ImageTk
 
 import pf_control
 import pf_control.constants as constants
+import pf_control.licence as licence
+import pf_control.licence_host as licence_host
+import pf_control.licence_profiles as licence_profiles
 import webbrowser
 
 import subprocess
-import platform
 
 import sys
 
@@ -56,8 +59,8 @@ class MainGui:
         # Configure styles
         self.styles = CustomStyles()
 
-        # Get a reference to all PowerFactory versions
-        self.c = constants.PowerFactory()
+        # Get a reference to all PowerFactory versions (already found when initialising the PowerFactory class)
+        self.c = self.pf.c
 
         # Set the default value as the most recent version and enable dropdown
         default_pf_version = self.c.available_power_factory_versions[-1]
@@ -76,38 +79,27 @@ class MainGui:
         # Get selected PowerFactory version and Define the powerfactory application path
         #self.selected_pf_version_get = self.selected_pf_version.get()
 
-        # Add checkbox for each simulation module
-        self.power_quality = self.add_checkbox(
-            row=self.row(1), col=self.col(), text="Power Quality"
-        )
-        self.contingency = self.add_checkbox(
-            row=self.row(), col=self.col() + 1, text="Contingency Analysis"
-        )
-        self.quasi_dynamic = self.add_checkbox(
-            row=self.row(1), col=self.col(), text="Quasi-Dynamic Simulation"
-        )
-        self.scripting = self.add_checkbox(
-            row=self.row(), col=self.col() + 1, text="Scripting and Automation"
-        )
-        self.stability = self.add_checkbox(
-            row=self.row(1), col=self.col(), text="Stability Analysis"
-        )
-        self.small_signal = self.add_checkbox(
-            row=self.row(), col=self.col() + 1, text="Small Signal Stability"
-        )
-        self.network_reduction = self.add_checkbox(
-            row=self.row(1), col=self.col(), text="Network Reduction"
-        )
-        self.parameter_identification = self.add_checkbox(
-            row=self.row(), col=self.col() + 1, text="System Parameter Identification"
-        )
-        self.overcurrent_protection = self.add_checkbox(
-            row=self.row(1), col=self.col(), text="Overcurrent Protection"
+        # Add a label and editable DropDown box to select a saved licence profile or enter the name of a new one
+        self.profiles = licence_profiles.LicenceProfiles()
+        _ = self.add_minor_label(
+            row=self.row(1), col=self.col(), label='Licence Profile:', columnspan=1,
+            style=self.styles.label_general_left
         )
-        self.arc_flash = self.add_checkbox(
-            row=self.row(), col=self.col() + 1, text="Arc-Flash Analysis"
+        self.selected_profile, self.profile_combobox = self.add_combobox(
+            row=self.row(), col=self.col() + 1, values=self.profiles.names(), cmd=self.load_profile
         )
 
+        # Add checkbox for each simulation module, two per row
+        self.licence_vars = collections.OrderedDict()
+        for i, (attribute, label) in enumerate(constants.Licence.modules):
+            if i % 2 == 0:
+                row, col = self.row(1), self.col()
+            else:
+                row, col = self.row(), self.col() + 1
+            self.licence_vars[attribute] = self.add_checkbox(row=row, col=col, text=label)
+        # Start with the selection last confirmed
+        self.set_licences(self.profiles.last_selection)
+
         # Add button for user to confirm selection and open PF in engine mode to change licence settings
         self.button_confirm_settings = self.add_cmd(
             label=constants.GuiDefaults.button_select_settings_label,
@@ -122,6 +114,27 @@ class MainGui:
             row=self.row(), col=self.col()+1
         )
 
+        # Add button for user to cancel the licence settings being changed
+        self.button_cancel_settings = self.add_cmd(
+            label=constants.GuiDefaults.button_cancel_settings_label,
+            cmd=self.cancel_licence_settings, tooltip='Click to cancel changing the licence settings',
+            state=tk.DISABLED, row=self.row(1), col=self.col()
+        )
+
+        # Add button for user to save the selected licences as a profile
+        self.button_save_profile = self.add_cmd(
+            label=constants.GuiDefaults.button_save_profile_label,
+            cmd=self.save_profile, tooltip='Click to save the selected licences with the profile name entered',
+            row=self.row(), col=self.col() + 1
+        )
+        # Add checkbox so that the licences can be written again if the user attributes have been changed directly
+        # in PowerFactory since they were last applied
+        self.force_licences = self.add_checkbox(
+            row=self.row(1), col=self.col(), text=constants.GuiDefaults.checkbox_force_label
+        )
+        # Reference to the thread used to change the licence settings
+        self.licence_worker = None
+
         # Separator
         self.add_sep(row=self.row(1), col_span=2)
 
@@ -149,63 +162,139 @@ class MainGui:
             size=constants.GuiDefaults.img_size_psc
         )
 
+        # Start the engine for the default version whilst the user makes their selection, unless the selection is
+        # already applied in which case the engine is unlikely to be needed
+        self.warm_engine = None
+        if constants.Licence.prewarm_engine and not self.profiles.is_applied(
+                default_pf_version, licence.target_attributes(self.get_licences())):
+            self.warm_engine = licence.WarmEngine(pf_version=default_pf_version, is_reachable=licence_host.is_reachable)
+            self.warm_engine.start()
+
         self.master.mainloop()
 
     def change_licence_settings(self):
+        """
+            Function starts a separate thread to check the connection to the licence host, open PowerFactory in
+            engine mode and write the selected licences so that the GUI remains responsive.  Progress is then
+            obtained by polling the thread from the Tk main loop.
+        :return None:
+        """
+        self.pf_version = self.selected_pf_version.get()
+        licences = self.get_licences()
 
-        self.status_bar.configure(text="Check VPN connection")
-        self.master.update()
-        response = self.ping(constants.PowerFactory.power_factory_host)
-        # and then check the response, if no VPN connection, indicate this in the GUI status output
-        if response == 0:
-
-            # Open PF in engine mode and get current user
-            self.status_bar.configure(text="Setting up PowerFactory licence (take around 10 seconds)")
-            self.master.update()
-
-            self.pf_version = self.selected_pf_version.get()
-            app = self.pf.initialise_power_factory(pf_version=self.pf_version)
-            user = app.GetCurrentUser()
-            # Set selected license
-            user.check_adv = 0
-            user.harm = self.power_quality.get()
-            user.contingency = self.contingency.get()
-            user.qdynsim = self.quasi_dynamic.get()
-            user.script = self.scripting.get()
-            user.stab = self.stability.get()
-            user.smallsig = self.small_signal.get()
-            user.netred = self.network_reduction.get()
-            user.paramid = self.parameter_identification.get()
-            user.prot = self.overcurrent_protection.get()
-            user.arcflash = self.arc_flash.get()
+        self.licence_worker = licence.LicenceWorker(
+            licences=licences, pf_version=self.pf_version, initialise=self.pf.initialise_power_factory,
+            is_reachable=licence_host.is_reachable, warm_engine=self.warm_engine, profiles=self.profiles,
+            force=bool(self.force_licences.get())
+        )
 
-            # Enable PowerFactory Launching Button
-            self.status_bar.configure(text="Licence selection updated, click Launch PowerFactory")
-            self.master.update()
-            self.button_launch_powerfactory.configure(state=tk.NORMAL)
-        else:
-            self.status_bar.configure(text="No VPN Connection")
+        self.button_confirm_settings.configure(state=tk.DISABLED)
+        self.button_launch_powerfactory.configure(state=tk.DISABLED)
+        self.button_cancel_settings.configure(state=tk.NORMAL)
+
+        self.licence_worker.start()
+        self.master.after(constants.Licence.poll_interval, self.poll_licence_worker)
+
+        return None
 
-    def ping(self, host):
+    def get_licences(self):
         """
-        Returns True if host (str) responds to a ping request.
-        Remember that a host may not respond to a ping (ICMP) request even if the host name is valid.
+            Returns the licence modules selected
+        :return collections.OrderedDict licences:  Dictionary of {user attribute: 0 / 1}
         """
+        return collections.OrderedDict((k, v.get()) for k, v in self.licence_vars.items())
 
-        # Option for the number of packets as a function of
-        param = '-n' if platform.system().lower() == 'windows' else '-c'
+    def set_licences(self, licences):
+        """
+            Function ticks the checkbox of each licence module selected
+        :param dict licences:  Dictionary of {user attribute: 0 / 1}, if None the checkboxes are unchanged
+        :return None:
+        """
+        if licences is not None:
+            for attribute, var in self.licence_vars.items():
+                var.set(licences.get(attribute, 0))
+        return None
 
-        # Building the command. Ex: "ping -c 1 google.com"
-        command = ['ping', param, '1', host]
+    def load_profile(self, *args):
+        """
+            Function selects the licence modules of the profile chosen in the dropdown box
+        :return None:
+        """
+        self.set_licences(self.profiles.get(self.selected_profile.get()))
+        return None
 
-        return subprocess.call(command)
+    def save_profile(self):
+        """
+            Function saves the selected licence modules with the profile name entered in the dropdown box
+        :return None:
+        """
+        name = self.selected_profile.get().strip()
+        if not name:
+            self.status_bar.configure(text=constants.Licence.msg_profile_no_name)
+            return None
+
+        self.profiles.save_profile(name, self.get_licences())
+        self.profile_combobox.configure(values=self.profiles.names())
+        self.status_bar.configure(text=constants.Licence.msg_profile_saved.format(name))
+        return None
+
+    def poll_licence_worker(self):
+        """
+            Function updates the GUI with any progress from the licence worker and continues polling until the
+            worker has finished
+        :return None:
+        """
+        worker = self.licence_worker
+        # Checked before the events are read so that the final drain happens after the worker has finished
+        alive = worker.is_alive()
+        for event, message in worker.get_events():
+            # Once cancelled only the final outcome is of interest, which may still be that the settings were written
+            if worker.cancelled and event not in licence.FINAL_EVENTS:
+                continue
+            self.status_bar.configure(text=message)
+            # Enable PowerFactory Launching Button
+            if event == licence.EVENT_COMPLETE:
+                self.button_launch_powerfactory.configure(state=tk.NORMAL)
+            elif event == licence.EVENT_CANCELLED:
+                self.button_launch_powerfactory.configure(state=tk.DISABLED)
+
+        if alive:
+            self.master.after(constants.Licence.poll_interval, self.poll_licence_worker)
+        else:
+            self.button_cancel_settings.configure(state=tk.DISABLED)
+            self.button_confirm_settings.configure(state=tk.NORMAL)
+
+        return None
+
+    def cancel_licence_settings(self):
+        """
+            Function requests the licence worker to stop, since PowerFactory cannot be interrupted whilst it is
+            initialising the confirm button is only re-enabled once the worker has actually finished
+        :return None:
+        """
+        if self.licence_worker is not None and self.licence_worker.is_alive():
+            self.licence_worker.cancel()
+            self.status_bar.configure(text=constants.Licence.msg_cancelling)
+        self.button_cancel_settings.configure(state=tk.DISABLED)
+        return None
 
     def launch_powerfactory(self):
 
         self.power_factory_launch_button = 1
+        self.discard_warm_engine()
 
         self.master.destroy()
 
+    def discard_warm_engine(self):
+        """
+            Function stops the engine started in advance so that it no longer holds a licence
+        :return None:
+        """
+        if self.warm_engine is not None:
+            self.warm_engine.discard()
+            self.warm_engine = None
+        return None
+
     def add_psc_logo_wm(self):
         """
             Function just adds the PSC logo to the windows manager in GUI
@@ -380,6 +469,24 @@ class MainGui:
         option_menu.configure(state=state)
         return variable
 
+    def add_combobox(self, row, col, values, cmd=None):
+        """
+            Function adds an editable dropdown box to the GUI, a value can either be selected or typed in
+        :param int row: Row number to use
+        :param int col: Column number to use
+        :param list values:  Values to populate dropdown box with
+        :param func cmd: (optional) - Command to run when a value is selected
+        :return (tk.StringVar, ttk.Combobox) (variable, combobox):  References to the string variable and the
+                                                                    DropDown box so its values can be updated
+        """
+        variable = tk.StringVar(self.master)
+
+        combobox = ttk.Combobox(self.master, textvariable=variable, values=values)
+        combobox.grid(row=row, column=col, padx=6)
+        if cmd is not None:
+            combobox.bind('<<ComboboxSelected>>', cmd)
+        return variable, combobox
+
     def add_cmd(self, label, cmd, state=tk.NORMAL, tooltip=str(), row=None, col=None):
         """
             Function just adds the command button to the GUI which is used for loading the SAV case
@@ -418,6 +525,7 @@ class MainGui:
         # Test what option the user provided
         if result == 'yes':
             self.abort = True
+            self.discard_warm_engine()
             self.master.destroy()
             return None
         else:
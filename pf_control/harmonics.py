@@ -0,0 +1,232 @@
+"""
+#######################################################################################################################
+###											Harmonics																###
+###		Vectorised analysis of the impedance-frequency results of a harmonic frequency sweep, operating on the		###
+###		(frequencies x terminals) arrays of every terminal at once to find resonances, their Q-factor and the		###
+###		envelope of the impedance loci across a number of scenarios													###
+###																													###
+#######################################################################################################################
+"""
+import collections
+
+import numpy as np
+
+import pf_control.constants as constants
+import pf_control.profiling as profiling
+
+
+class Resonances(collections.namedtuple(
+        'Resonances', ('frequency_index', 'terminal', 'frequency', 'magnitude', 'bandwidth', 'q_factor'))):
+    """
+        Resonance peaks found in a frequency sweep, each field is an array with one value per peak sorted by terminal
+        and then frequency.  The bandwidth and Q-factor are NaN where the impedance does not fall below the half
+        power level on both sides of the peak within the sweep.
+    """
+    __slots__ = ()
+
+    @property
+    def damping(self):
+        """
+            Damping ratio of each resonance
+        :return np.ndarray damping:
+        """
+        return 1.0 / (2.0 * self.q_factor)
+
+    def for_terminal(self, terminal):
+        """
+            Returns the resonances of a single terminal
+        :param int terminal:  Index of the terminal
+        :return Resonances resonances:
+        """
+        start, stop = np.searchsorted(self.terminal, [terminal, terminal + 1])
+        return Resonances(*(x[start:stop] for x in self))
+
+
+class LociEnvelope(collections.namedtuple(
+        'LociEnvelope', ('r_min', 'r_max', 'x_min', 'x_max', 'z_min', 'z_max', 'angle_min', 'angle_max'))):
+    """
+        Envelope of the impedance loci across a number of scenarios, each field is a (frequencies x terminals) array.
+        The envelope is given both as the bounding rectangle in the R-X plane and as the annular sector bounded by the
+        impedance magnitude and angle (deg).
+    """
+    __slots__ = ()
+
+
+def to_complex(magnitude, angle):
+    """
+        Returns the complex impedance from its magnitude and angle
+    :param np.ndarray magnitude:  Impedance magnitude
+    :param np.ndarray angle:  Impedance angle in degrees
+    :return np.ndarray impedance:
+    """
+    return magnitude * np.exp(1j * np.deg2rad(angle))
+
+
+def from_columns(values, columns, magnitude_variable=None, angle_variable=None):
+    """
+        Returns the complex impedance of each terminal from the columns of a set of results (e.g. from
+        pf_control.results.ResultsReader.read or pf_control.grid_sweep.GridResult)
+    :param np.ndarray values:  Array of (... x frequencies x columns)
+    :param list columns:  List of (object, variable) for each column
+    :param str magnitude_variable: (optional) - Variable of the impedance magnitude, defaults to constants.Harmonics
+    :param str angle_variable: (optional) - Variable of the impedance angle, defaults to constants.Harmonics
+    :return (list, np.ndarray) (terminals, impedance):  Names of the terminals and complex impedance array of
+                                                        (... x frequencies x terminals)
+    """
+    magnitude_variable = magnitude_variable or constants.Harmonics.magnitude_variable
+    angle_variable = angle_variable or constants.Harmonics.angle_variable
+
+    magnitude_columns = {obj: i for i, (obj, var) in enumerate(columns) if var == magnitude_variable}
+    angle_columns = {obj: i for i, (obj, var) in enumerate(columns) if var == angle_variable}
+    terminals = [x for x in magnitude_columns if x in angle_columns]
+    if not terminals:
+        raise ValueError('No terminals have both <{}> and <{}> in the results'.format(
+            magnitude_variable, angle_variable))
+
+    magnitude = values[..., [magnitude_columns[x] for x in terminals]]
+    angle = values[..., [angle_columns[x] for x in terminals]]
+    return terminals, to_complex(magnitude, angle)
+
+
+def find_peaks(magnitude, threshold=None, relative=None):
+    """
+        Returns the local maxima of every column of an impedance magnitude array
+    :param np.ndarray magnitude:  Array of (frequencies x terminals)
+    :param float threshold: (optional) - Peaks with a magnitude below this are ignored
+    :param float relative: (optional) - Peaks with a magnitude below this fraction of the largest magnitude of their
+                                        terminal are ignored
+    :return (np.ndarray, np.ndarray) (frequency_index, terminal):  Index of the frequency and terminal of each peak
+                                                                    sorted by terminal and then frequency
+    """
+    middle = magnitude[1:-1]
+    # A flat topped peak is only counted once at its first point
+    peaks = (middle > magnitude[:-2]) & (middle >= magnitude[2:])
+    if threshold is not None:
+        peaks &= middle >= threshold
+    if relative is not None:
+        peaks &= middle >= relative * np.nanmax(magnitude, axis=0)
+
+    # Transposed so that the peaks are ordered by terminal
+    terminal, frequency_index = np.nonzero(peaks.T)
+    return frequency_index + 1, terminal
+
+
+def crossing_frequency(frequencies, magnitude, level, lower, terminal):
+    """
+        Returns the frequency at which the magnitude crosses a level between two adjacent points by linear
+        interpolation
+    :param np.ndarray frequencies:
+    :param np.ndarray magnitude:  Array of (frequencies x terminals)
+    :param np.ndarray level:  Level for each crossing
+    :param np.ndarray lower:  Index of the lower frequency point of each crossing
+    :param np.ndarray terminal:  Index of the terminal of each crossing
+    :return np.ndarray frequency:
+    """
+    m0 = magnitude[lower, terminal]
+    m1 = magnitude[lower + 1, terminal]
+    f0 = frequencies[lower]
+    f1 = frequencies[lower + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(m1 != m0, (level - m0) / (m1 - m0), 0.0)
+    return f0 + fraction * (f1 - f0)
+
+
+def bandwidths(frequencies, magnitude, frequency_index, terminal, half_power=None, chunk_peaks=None):
+    """
+        Returns the half power bandwidth of each peak, the peaks are processed in chunks so that the memory used is
+        limited to (frequencies x chunk_peaks) bytes
+    :param np.ndarray frequencies:  Frequency of each row
+    :param np.ndarray magnitude:  Array of (frequencies x terminals)
+    :param np.ndarray frequency_index:  Index of the frequency of each peak
+    :param np.ndarray terminal:  Index of the terminal of each peak
+    :param float half_power: (optional) - Fraction of the peak magnitude defining the bandwidth
+    :param int chunk_peaks: (optional) - Number of peaks processed together
+    :return (np.ndarray, np.ndarray) (lower, upper):  Lower and upper frequency of the bandwidth of each peak, NaN
+                                                        where the magnitude does not fall below the level
+    """
+    half_power = half_power or constants.Harmonics.half_power
+    chunk_peaks = chunk_peaks or constants.Harmonics.chunk_peaks
+    n_frequencies = frequencies.size
+    rows = np.arange(n_frequencies)[:, np.newaxis]
+
+    lower = np.full(frequency_index.size, np.nan)
+    upper = np.full(frequency_index.size, np.nan)
+    for start in range(0, frequency_index.size, chunk_peaks):
+        chunk = slice(start, start + chunk_peaks)
+        peak_row = frequency_index[chunk]
+        peak_terminal = terminal[chunk]
+        level = half_power * magnitude[peak_row, peak_terminal]
+
+        below = magnitude[:, peak_terminal] < level
+
+        # Last point below the level before the peak, found as the first point when searching backwards
+        left = below & (rows < peak_row)
+        has_left = left.any(axis=0)
+        left_row = n_frequencies - 1 - np.argmax(left[::-1], axis=0)
+
+        # First point below the level after the peak
+        right = below & (rows > peak_row)
+        has_right = right.any(axis=0)
+        right_row = np.argmax(right, axis=0)
+
+        lower[chunk] = np.where(has_left, crossing_frequency(
+            frequencies, magnitude, level, np.where(has_left, left_row, 0), peak_terminal), np.nan)
+        upper[chunk] = np.where(has_right, crossing_frequency(
+            frequencies, magnitude, level, np.where(has_right, right_row - 1, 0), peak_terminal), np.nan)
+
+    return lower, upper
+
+
+@profiling.profiled()
+def find_resonances(frequencies, impedance, threshold=None, relative=None, half_power=None):
+    """
+        Finds the resonance peaks of every terminal and their Q-factor (resonant frequency / half power bandwidth)
+    :param np.ndarray frequencies:  Frequency of each row
+    :param np.ndarray impedance:  Complex impedance or impedance magnitude array of (frequencies x terminals)
+    :param float threshold: (optional) - Peaks with a magnitude below this are ignored
+    :param float relative: (optional) - Peaks with a magnitude below this fraction of the largest magnitude of their
+                                        terminal are ignored
+    :param float half_power: (optional) - Fraction of the peak magnitude defining the bandwidth
+    :return Resonances resonances:
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    magnitude = np.abs(impedance)
+    if magnitude.ndim != 2 or magnitude.shape[0] != frequencies.size:
+        raise ValueError('Impedance must be an array of (frequencies x terminals), got shape {} for {} frequencies'
+                         .format(magnitude.shape, frequencies.size))
+
+    frequency_index, terminal = find_peaks(magnitude, threshold=threshold, relative=relative)
+    lower, upper = bandwidths(frequencies, magnitude, frequency_index, terminal, half_power=half_power)
+
+    bandwidth = upper - lower
+    peak_frequency = frequencies[frequency_index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q_factor = peak_frequency / bandwidth
+
+    return Resonances(
+        frequency_index=frequency_index, terminal=terminal, frequency=peak_frequency,
+        magnitude=magnitude[frequency_index, terminal], bandwidth=bandwidth, q_factor=q_factor
+    )
+
+
+def loci_envelope(scenarios):
+    """
+        Returns the envelope of the impedance loci across a number of scenarios, the scenarios are processed one at a
+        time so they do not all need to be held in memory at once
+    :param np.ndarray|iterable scenarios:  Complex impedance array of (scenarios x frequencies x terminals) or an
+                                            iterable of (frequencies x terminals) arrays (e.g. from a generator)
+    :return LociEnvelope envelope:
+    """
+    envelope = None
+    for impedance in scenarios:
+        parts = (impedance.real, impedance.imag, np.abs(impedance), np.angle(impedance, deg=True))
+        if envelope is None:
+            envelope = [x.copy() for part in parts for x in (part, part)]
+            continue
+        for i, part in enumerate(parts):
+            np.minimum(envelope[2 * i], part, out=envelope[2 * i])
+            np.maximum(envelope[2 * i + 1], part, out=envelope[2 * i + 1])
+
+    if envelope is None:
+        raise ValueError('No scenarios provided to calculate the loci envelope')
+    return LociEnvelope(*envelope)
@@ -0,0 +1,99 @@
+"""
+#######################################################################################################################
+###											Install Registry														###
+###		Persistent on-disk cache of the PowerFactory installations found on this machine so that repeated			###
+###		launches only need to stat the relevant directories rather than searching for the installations again		###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import os
+
+import pf_control.constants as constants
+import pf_control.json_cache as json_cache
+
+
+class InstallRegistry(json_cache.JsonCache):
+    """
+        Class to deal with reading and writing the cache of discovered PowerFactory installations.
+
+        Each entry in the cache is stored against a key describing the search that was carried out and records the
+        modification time of every directory which would change if an installation was added or removed.  If any of
+        these directories have changed then the entry is invalid and the search is repeated.
+    """
+    description = 'install registry cache'
+
+    def __init__(self, cache_file=None, format_version=None):
+        """
+            Initialise the registry
+        :param str cache_file: (optional) - Path to the cache file, if not provided the default from the constants
+                                            is used
+        :param int format_version: (optional) - Version of the cache format, a cache written with a different
+                                                version is discarded
+        """
+        json_cache.JsonCache.__init__(
+            self, cache_file=cache_file or constants.LocalCache.install_registry,
+            format_version=format_version or constants.LocalCache.install_registry_version
+        )
+
+    def lookup(self, key, roots, search):
+        """
+            Function returns the installations for a particular search, using the cached result if it is still valid
+            and otherwise running the search and updating the cache
+        :param str key:  Unique reference for the search being carried out
+        :param list roots:  Directories the search is carried out within
+        :param func search:  Function which returns a dictionary of {version: path} if a search is required
+        :return collections.OrderedDict installs:  Dictionary of {version: path}
+        """
+        entry = self.data['entries'].get(key)
+        if entry is not None and self.is_valid(entry):
+            self.logger.debug('Installed PowerFactory versions for <{}> loaded from cache'.format(key))
+            return collections.OrderedDict(entry['installs'])
+
+        self.logger.debug('Searching for installed PowerFactory versions for <{}>'.format(key))
+        installs = collections.OrderedDict(search())
+
+        # The roots and every directory between a root and an installation will change if an installation is added
+        # or removed and the installation directory itself will change if it is modified.  The parent of each root
+        # is also watched so that a root which is created (e.g. a new vendor directory) invalidates the entry.
+        watched_paths = set(roots)
+        watched_paths.update(os.path.dirname(os.path.normpath(x)) for x in roots)
+        for pth in installs.values():
+            watched_paths.update(self.ancestors(pth, roots))
+
+        self.data['entries'][key] = {
+            'installs': list(installs.items()),
+            'watch': {pth: self.get_mtime(pth) for pth in sorted(watched_paths)}
+        }
+        self.save()
+
+        return installs
+
+    @staticmethod
+    def ancestors(pth, roots):
+        """
+            Returns an installation directory and each of its parents up to the root it was found in (or just its
+            parent if it is not within any of the roots)
+        :param str pth:  Installation directory
+        :param list roots:  Directories the search is carried out within
+        :return list paths:
+        """
+        paths = [pth, os.path.dirname(pth)]
+        stops = {os.path.normcase(os.path.normpath(x)) for x in roots}
+        if not any(os.path.normcase(pth).startswith(x + os.sep) for x in stops):
+            return paths
+
+        parent = paths[-1]
+        while os.path.normcase(os.path.normpath(parent)) not in stops and os.path.dirname(parent) != parent:
+            parent = os.path.dirname(parent)
+            paths.append(parent)
+        return paths
+
+    def clear(self):
+        """
+            Function removes all entries from the cache
+        :return None:
+        """
+        self._data = self.empty()
+        self.save()
+        return None
@@ -0,0 +1,115 @@
+"""
+#######################################################################################################################
+###											Install Scanner															###
+###		Searches the file system for PowerFactory installations, limiting the depth of the search, skipping			###
+###		directories which will never contain PowerFactory and listing directories concurrently						###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import concurrent.futures
+import fnmatch
+import os
+
+import pf_control.constants as constants
+
+
+class InstallScanner:
+    """
+        Class to search a number of root directories for PowerFactory installations.
+
+        The search is carried out one depth level at a time with all of the directories at that level listed
+        concurrently.  A directory containing the PowerFactory executable is recorded as an installation and is not
+        searched any further.
+    """
+
+    def __init__(self, roots=None, max_depth=None, pruned_directories=None, max_workers=None, pf_application=None):
+        """
+            Initialise the scanner, any parameter not provided is taken from constants.InstallSearch
+        :param list roots: (optional) - Directories to search within
+        :param int max_depth: (optional) - Maximum number of directories below each root that will be searched
+        :param tuple pruned_directories: (optional) - Directory name patterns that will not be searched
+        :param int max_workers: (optional) - Number of threads to use for listing directories
+        :param str pf_application: (optional) - Pattern for the executable that identifies an installation
+        """
+        self.logger = constants.logger
+
+        if roots is None:
+            roots = constants.InstallSearch.roots + constants.InstallSearch.custom_roots
+        # Remove any duplicate roots whilst maintaining the order of priority
+        self.roots = list(collections.OrderedDict.fromkeys(roots))
+
+        self.max_depth = constants.InstallSearch.max_depth if max_depth is None else max_depth
+        self.max_workers = max_workers or constants.InstallSearch.max_workers
+        self.pf_application = (pf_application or constants.InstallSearch.pf_application).lower()
+        if pruned_directories is None:
+            pruned_directories = constants.InstallSearch.pruned_directories
+        self.pruned_directories = tuple(x.lower() for x in pruned_directories)
+
+    def is_pruned(self, name):
+        """
+            Returns True if the directory name matches any of the pruning rules
+        :param str name:  Name of the directory
+        :return bool:
+        """
+        name = name.lower()
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.pruned_directories)
+
+    def list_directory(self, pth, depth):
+        """
+            Function lists a single directory
+        :param str pth:  Directory to list
+        :param int depth:  Depth of this directory below the root
+        :return (list, bool) (sub_directories, is_install):  Sub directories to be searched and whether this
+                                                                directory contains the PowerFactory executable
+        """
+        sub_directories = list()
+        try:
+            with os.scandir(pth) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+
+                    if is_dir:
+                        if depth < self.max_depth and not self.is_pruned(entry.name):
+                            sub_directories.append(entry.path)
+                    elif fnmatch.fnmatchcase(entry.name.lower(), self.pf_application):
+                        # No need to search any further in an installation directory
+                        return list(), True
+        except OSError:
+            # Directories which cannot be accessed are skipped
+            pass
+
+        return sub_directories, False
+
+    def scan(self):
+        """
+            Function searches all of the roots for PowerFactory installations
+        :return collections.OrderedDict installs:  Ordered Dictionary of {version: path} sorted by version, if the
+                                                    same version is found in multiple roots the first root takes
+                                                    priority
+        """
+        installs = dict()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for root in self.roots:
+                if not os.path.isdir(root):
+                    self.logger.debug('Search directory <{}> does not exist and will be skipped'.format(root))
+                    continue
+
+                frontier = [root]
+                depth = 0
+                while frontier:
+                    next_frontier = list()
+                    results = executor.map(lambda x: self.list_directory(x, depth), frontier)
+                    for pth, (sub_directories, is_install) in zip(frontier, results):
+                        if is_install:
+                            version = os.path.basename(pth).replace('PowerFactory ', '')
+                            installs.setdefault(version, pth)
+                        next_frontier.extend(sub_directories)
+                    frontier = next_frontier
+                    depth += 1
+
+        return collections.OrderedDict(sorted(installs.items()))
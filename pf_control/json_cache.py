@@ -0,0 +1,113 @@
+"""
+#######################################################################################################################
+###											JSON Cache																###
+###		Base class for the small JSON files stored locally (install registry, engine capabilities and licence		###
+###		profiles) dealing with reading, versioning and safely writing the file										###
+###																													###
+#######################################################################################################################
+"""
+import json
+import os
+
+import pf_control.constants as constants
+
+
+class JsonCache:
+    """
+        Class to read and write a JSON cache file.
+
+        The contents are loaded on first access to data.  A file which cannot be read or which was written with a
+        different format version is discarded and the cache starts empty.  Entries which depend on the file system
+        record the modification time of the paths they depend on so that they can be checked with is_valid.
+    """
+    # Used to describe the cache in log messages
+    description = 'cache'
+
+    def __init__(self, cache_file, format_version):
+        """
+            Initialise the cache
+        :param str cache_file:  Path to the cache file
+        :param int format_version:  Version of the cache format, a cache written with a different version is
+                                    discarded
+        """
+        self.logger = constants.logger
+        self.cache_file = cache_file
+        self.format_version = format_version
+        self._data = None
+
+    @property
+    def data(self):
+        """
+            Contents of the cache file, loaded on first access
+        :return dict _data:
+        """
+        if self._data is None:
+            self._data = self.load()
+        return self._data
+
+    def empty(self):
+        """
+            Returns the contents of an empty cache
+        :return dict data:
+        """
+        return {'version': self.format_version, 'entries': dict()}
+
+    def load(self):
+        """
+            Function loads the cache file from disk, if the file does not exist, cannot be read or was written with a
+            different format version then an empty cache is returned
+        :return dict data:  Dictionary of {'version': int, 'entries': dict}
+        """
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self.empty()
+
+        if not isinstance(data, dict) or data.get('version') != self.format_version:
+            self.logger.debug('{} <{}> is from a different version and will be rebuilt'.format(
+                self.description.capitalize(), self.cache_file))
+            return self.empty()
+
+        data.setdefault('entries', dict())
+        return data
+
+    def save(self):
+        """
+            Function writes the cache to disk, the file is written to a temporary location first and then moved so
+            that a partially written cache is never read
+        :return None:
+        """
+        directory = os.path.dirname(self.cache_file)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_file = '{}.{}.tmp'.format(self.cache_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(self.data, f, indent=1)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            # Failure to write the cache is not fatal, the contents will just be rebuilt next time
+            self.logger.warning('Unable to write the {} to <{}>'.format(self.description, self.cache_file))
+
+        return None
+
+    @staticmethod
+    def get_mtime(pth):
+        """
+            Returns the modification time of a path or None if it does not exist
+        :param str pth:  Path to check
+        :return float|None mtime:
+        """
+        try:
+            return os.stat(pth).st_mtime
+        except OSError:
+            return None
+
+    def is_valid(self, entry):
+        """
+            Function confirms whether all of the paths watched by a cache entry are unchanged
+        :param dict entry:  Cache entry with a 'watch' dictionary of {path: modification time}
+        :return bool valid:
+        """
+        return all(self.get_mtime(pth) == mtime for pth, mtime in entry['watch'].items())
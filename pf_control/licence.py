@@ -0,0 +1,310 @@
+"""
+#######################################################################################################################
+###											Licence																	###
+###		Deals with changing the licence modules selected for the current PowerFactory user							###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import queue
+import threading
+
+import pf_control.constants as constants
+import pf_control.session as session
+
+# Types of event posted by the LicenceWorker
+EVENT_STATUS = 'status'
+EVENT_COMPLETE = 'complete'
+EVENT_FAILED = 'failed'
+EVENT_CANCELLED = 'cancelled'
+EVENT_ERROR = 'error'
+
+# Events after which the worker will not post anything further
+FINAL_EVENTS = (EVENT_COMPLETE, EVENT_FAILED, EVENT_CANCELLED, EVENT_ERROR)
+
+
+def target_attributes(licences):
+    """
+        Returns the user attributes to be written for a licence selection, including the fixed attributes
+    :param dict licences:  Dictionary of {user attribute: 0 / 1} for each of the licence modules
+    :return collections.OrderedDict attributes:  Dictionary of {user attribute: value}
+    """
+    attributes = collections.OrderedDict(constants.Licence.fixed_attributes)
+    attributes.update((attribute, int(value)) for attribute, value in licences.items())
+    return attributes
+
+
+def apply_licences(user, licences):
+    """
+        Function writes the selected licence modules to a PowerFactory user, the current values are read first and
+        only those attributes which differ are written
+    :param object user:  PowerFactory user object (i.e. app.GetCurrentUser())
+    :param dict licences:  Dictionary of {user attribute: 0 / 1} for each of the licence modules
+    :return dict changed:  Dictionary of {user attribute: value} for the attributes written
+    """
+    attributes = target_attributes(licences)
+    current = {attribute: getattr(user, attribute) for attribute in attributes}
+    changed = collections.OrderedDict((k, v) for k, v in attributes.items() if current[k] != v)
+    for attribute, value in changed.items():
+        setattr(user, attribute, value)
+    return changed
+
+
+def write_licences(app, licences):
+    """
+        Job which writes the selected licence modules to the current user of an engine session
+    :param object app:  PowerFactory application
+    :param dict licences:  Dictionary of {user attribute: 0 / 1} for each of the licence modules
+    :return dict changed:  Dictionary of {user attribute: value} for the attributes written
+    """
+    return apply_licences(user=app.GetCurrentUser(), licences=licences)
+
+
+class WarmEngine(threading.Thread):
+    """
+        Thread which speculatively starts a PowerFactory engine in a separate process when the launcher opens so
+        that it is already initialised by the time the user confirms their selection.
+
+        The engine is only started once the licence host has been found to be reachable.  If the user confirms a
+        different version the engine is discarded and the selected version is initialised as normal.
+    """
+
+    def __init__(self, pf_version, is_reachable, engine_factory=session.default_engine_factory,
+                 host=constants.PowerFactory.power_factory_host):
+        """
+            Initialise the thread, the engine is started when the thread is started
+        :param str pf_version:  PowerFactory version to start
+        :param func is_reachable:  Function which returns True if the licence host provided can be reached
+        :param func engine_factory: (optional) - Function which returns the PowerFactory application, called in the
+                                                    engine process with pf_version as a keyword
+        :param str host: (optional) - Licence host to check
+        """
+        threading.Thread.__init__(self, name='WarmEngine', daemon=True)
+        self.logger = constants.logger
+
+        self.pf_version = pf_version
+        self.is_reachable = is_reachable
+        self.engine_factory = engine_factory
+        self.host = host
+
+        self.session = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._discarded = False
+
+    def run(self):
+        """
+            Starts the engine, any failure is recorded so that the licence settings fall back to initialising the
+            engine when confirmed
+        :return None:
+        """
+        try:
+            if not self.is_reachable(self.host):
+                self.error = constants.Licence.msg_no_connection
+                return None
+
+            with self._lock:
+                if self._discarded:
+                    return None
+                self.session = session.EngineSession(
+                    engine_factory=self.engine_factory, factory_kwargs={'pf_version': self.pf_version},
+                    health_check=session.default_health_check, start_timeout=constants.EnginePool.start_timeout
+                )
+            start_time = self.session.wait_ready()
+            self.logger.debug('PowerFactory engine for <{}> started in advance in {:.2f} s'.format(
+                self.pf_version, start_time))
+        except Exception as error:
+            if not self._discarded:
+                self.logger.warning('Unable to start PowerFactory engine for <{}> in advance: {}'.format(
+                    self.pf_version, error))
+            self.error = error
+        return None
+
+    def get_session(self, pf_version):
+        """
+            Returns the engine session if it is for the version provided, waiting for it to finish starting.  If it
+            is for a different version the engine is discarded.
+        :param str pf_version:  PowerFactory version selected
+        :return pf_control.session.EngineSession|None session:  Session or None if it is not available
+        """
+        if pf_version != self.pf_version:
+            self.discard()
+            return None
+
+        if self.ident is not None:
+            self.join()
+        with self._lock:
+            if self._discarded or self.error is not None:
+                return None
+            return self.session
+
+    def discard(self):
+        """
+            Stops the engine, if it is still starting the process is terminated
+        :return None:
+        """
+        with self._lock:
+            self._discarded = True
+            warm_session, self.session = self.session, None
+        if warm_session is not None:
+            warm_session.close(force=not warm_session.ready)
+        return None
+
+
+class LicenceWorker(threading.Thread):
+    """
+        Thread which checks the licence host can be reached, initialises PowerFactory and writes the selected
+        licence modules to the current user.
+
+        Progress is reported as (event, message) tuples on the events queue so that the GUI can poll for them from
+        the Tk main thread.  The engine initialisation cannot be interrupted so a cancel request takes effect at the
+        next step of the process.
+    """
+
+    def __init__(self, licences, pf_version, initialise, is_reachable, host=constants.PowerFactory.power_factory_host,
+                 warm_engine=None, profiles=None, force=False):
+        """
+            Initialise the worker
+        :param dict licences:  Dictionary of {user attribute: 0 / 1} for each of the licence modules
+        :param str pf_version:  PowerFactory version to initialise
+        :param func initialise:  Function which takes pf_version as a keyword and returns the PowerFactory
+                                    application (i.e. pf_control.pf.PowerFactory().initialise_power_factory)
+        :param func is_reachable:  Function which returns True if the licence host provided can be reached
+        :param str host: (optional) - Licence host to check
+        :param WarmEngine warm_engine: (optional) - Engine started in advance, used if it is for pf_version
+        :param pf_control.licence_profiles.LicenceProfiles profiles: (optional) - Record of the licence settings last
+                                                                        applied, PowerFactory is not started if the
+                                                                        settings are already applied
+        :param bool force: (optional) - If True the settings are written even if they are already applied
+        """
+        threading.Thread.__init__(self, name='LicenceWorker', daemon=True)
+        self.logger = constants.logger
+
+        self.licences = licences
+        self.pf_version = pf_version
+        self.initialise = initialise
+        self.is_reachable = is_reachable
+        self.host = host
+        self.warm_engine = warm_engine
+        self.profiles = profiles
+        self.force = force
+
+        self.events = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """
+            Requests that the worker stops at the next opportunity
+        :return None:
+        """
+        self._cancel.set()
+        return None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def post(self, event, message):
+        """
+            Adds an event to the queue for the GUI
+        :param str event:  Type of event
+        :param str message:  Message to display
+        :return None:
+        """
+        self.events.put((event, message))
+        return None
+
+    def run(self):
+        """
+            Runs the licence configuration, all exceptions are caught and reported as an error event
+        :return None:
+        """
+        try:
+            if not self.force and self.profiles is not None and self.profiles.is_applied(
+                    self.pf_version, target_attributes(self.licences)):
+                self.post(EVENT_COMPLETE, constants.Licence.msg_unchanged)
+                return None
+
+            if self.write_with_warm_engine():
+                return None
+
+            self.post(EVENT_STATUS, constants.Licence.msg_check_connection)
+            if not self.is_reachable(self.host):
+                self.post(EVENT_FAILED, constants.Licence.msg_no_connection)
+                return None
+
+            if self.cancelled:
+                self.post(EVENT_CANCELLED, constants.Licence.msg_cancelled)
+                return None
+
+            # Open PF in engine mode and get current user
+            self.post(EVENT_STATUS, constants.Licence.msg_initialising)
+            app = self.initialise(pf_version=self.pf_version)
+
+            if self.cancelled:
+                self.post(EVENT_CANCELLED, constants.Licence.msg_cancelled)
+                return None
+
+            self.post(EVENT_STATUS, constants.Licence.msg_writing)
+            user = app.GetCurrentUser()
+            self.complete(apply_licences(user=user, licences=self.licences))
+        except Exception as error:
+            self.logger.exception('Error whilst changing the PowerFactory licence settings')
+            self.post(EVENT_ERROR, constants.Licence.msg_error.format(error))
+
+        return None
+
+    def write_with_warm_engine(self):
+        """
+            Writes the licences using the engine started in advance if it is available for the selected version
+        :return bool handled:  True if the licence settings have been written or cancelled, False if the engine
+                                needs to be initialised
+        """
+        if self.warm_engine is None:
+            return False
+
+        if self.warm_engine.is_alive() and self.warm_engine.pf_version == self.pf_version:
+            self.post(EVENT_STATUS, constants.Licence.msg_waiting_engine)
+        warm_session = self.warm_engine.get_session(self.pf_version)
+        if warm_session is None:
+            return False
+
+        if self.cancelled:
+            self.post(EVENT_CANCELLED, constants.Licence.msg_cancelled)
+            return True
+
+        self.post(EVENT_STATUS, constants.Licence.msg_writing)
+        try:
+            changed = warm_session.run(write_licences, self.licences)
+        except session.EngineError as error:
+            self.logger.warning('Engine started in advance failed, PowerFactory will be initialised: {}'.format(error))
+            self.warm_engine.discard()
+            return False
+
+        self.complete(changed)
+        return True
+
+    def complete(self, changed):
+        """
+            Records the licence settings applied and reports that the worker has completed
+        :param dict changed:  Dictionary of {user attribute: value} for the attributes written
+        :return None:
+        """
+        self.logger.debug('{} user attribute(s) changed for <{}>: {}'.format(
+            len(changed), self.pf_version, ', '.join('{}={}'.format(*x) for x in changed.items()) or 'none'))
+        if self.profiles is not None:
+            self.profiles.record_applied(self.pf_version, target_attributes(self.licences), licences=self.licences)
+        self.post(EVENT_COMPLETE, constants.Licence.msg_complete)
+        return None
+
+    def get_events(self):
+        """
+            Returns all of the events posted since the last call without blocking
+        :return list events:  List of (event, message) tuples
+        """
+        events = list()
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
@@ -0,0 +1,147 @@
+"""
+#######################################################################################################################
+###											Licence Host															###
+###		Checks whether the PowerFactory licence server can be reached by attempting TCP connections to the			###
+###		licence ports rather than spawning a ping process															###
+###																													###
+#######################################################################################################################
+"""
+import asyncio
+import socket
+import time
+
+import pf_control.constants as constants
+
+# Cache of DNS results shared by all probes in this process {host: (expiry time, [(family, address)])}
+_dns_cache = dict()
+
+
+class LicenceHostProbe:
+    """
+        Class to probe a list of licence hosts concurrently and return the most preferred one which accepts a
+        connection on any of the licence ports
+    """
+
+    def __init__(self, hosts=None, ports=None, timeout=None, dns_ttl=None):
+        """
+            Initialise the probe, any parameter not provided is taken from constants.LicenceHost
+        :param list hosts: (optional) - Host names in order of preference
+        :param tuple ports: (optional) - TCP ports the licence server listens on
+        :param float timeout: (optional) - Time in seconds to wait for each connection attempt
+        :param float dns_ttl: (optional) - Time in seconds that DNS results are cached for
+        """
+        self.logger = constants.logger
+        if hosts is None:
+            hosts = [constants.PowerFactory.power_factory_host] + constants.LicenceHost.fallback_hosts
+        self.hosts = list(hosts)
+        self.ports = tuple(ports or constants.LicenceHost.ports)
+        self.timeout = constants.LicenceHost.timeout if timeout is None else timeout
+        self.dns_ttl = constants.LicenceHost.dns_ttl if dns_ttl is None else dns_ttl
+
+    async def resolve(self, host):
+        """
+            Returns the addresses for a host, using the cached result if it has not expired
+        :param str host:  Host name
+        :return list addresses:  List of (family, address) tuples, empty if the host cannot be resolved
+        """
+        cached = _dns_cache.get(host)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await asyncio.wait_for(
+                loop.getaddrinfo(host, None, type=socket.SOCK_STREAM), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            self.logger.debug('Unable to resolve licence host <{}>'.format(host))
+            return list()
+
+        addresses = list()
+        for family, _, _, _, sockaddr in results:
+            if (family, sockaddr[0]) not in addresses:
+                addresses.append((family, sockaddr[0]))
+        _dns_cache[host] = (time.monotonic() + self.dns_ttl, addresses)
+
+        return addresses
+
+    async def connect(self, address, port):
+        """
+            Attempts a single TCP connection
+        :param str address:  IP address
+        :param int port:  TCP port
+        :return bool connected:
+        """
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout=self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def probe_host(self, host):
+        """
+            Attempts to connect to every address and licence port of a host concurrently
+        :param str host:  Host name
+        :return str|None host:  Host name if any connection succeeded, otherwise None
+        """
+        addresses = await self.resolve(host)
+        attempts = [
+            asyncio.ensure_future(self.connect(address, port)) for _, address in addresses for port in self.ports
+        ]
+        try:
+            for attempt in asyncio.as_completed(attempts):
+                if await attempt:
+                    return host
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+        return None
+
+    async def find_reachable_host_async(self):
+        """
+            Probes all of the hosts concurrently and returns the most preferred host which accepts a connection.  The
+            results are taken in the order of the hosts so a fallback host which answers first is only returned if
+            the hosts before it cannot be reached, but the probes of later hosts are not waited for once a host
+            before them has been found.
+        :return str|None host:  Reachable host name or None if none of the hosts can be reached
+        """
+        probes = [asyncio.ensure_future(self.probe_host(host)) for host in self.hosts]
+        try:
+            for probe in probes:
+                host = await probe
+                if host is not None:
+                    return host
+        finally:
+            for probe in probes:
+                probe.cancel()
+
+        return None
+
+    def find_reachable_host(self):
+        """
+            Probes all of the hosts and returns the most preferred host to accept a connection, this runs its own
+            event loop and so can be called from any thread
+        :return str|None host:  Reachable host name or None if none of the hosts can be reached
+        """
+        t0 = time.perf_counter()
+        host = asyncio.run(self.find_reachable_host_async())
+        self.logger.debug('Licence host probe of {} returned <{}> in {:.3f} s'.format(
+            self.hosts, host, time.perf_counter() - t0))
+        return host
+
+
+def is_reachable(host):
+    """
+        Returns True if the licence host or any of the fallback hosts accepts a connection on a licence port
+    :param str host:  Preferred licence host
+    :return bool:
+    """
+    hosts = [host] + [x for x in constants.LicenceHost.fallback_hosts if x != host]
+    return LicenceHostProbe(hosts=hosts).find_reachable_host() is not None
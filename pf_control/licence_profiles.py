@@ -0,0 +1,142 @@
+"""
+#######################################################################################################################
+###											Licence Profiles														###
+###		Named selections of licence modules stored locally together with the licence settings last applied for		###
+###		each user and PowerFactory version so that the engine does not need to be started to re-apply them			###
+###																													###
+#######################################################################################################################
+"""
+import getpass
+import threading
+
+import pf_control.constants as constants
+import pf_control.json_cache as json_cache
+
+
+def current_user():
+    """
+        Returns the name of the user the licence settings are applied for, PowerFactory logs in as the Windows user
+    :return str user:
+    """
+    try:
+        return getpass.getuser()
+    except Exception:
+        return str()
+
+
+def normalise(licences):
+    """
+        Returns a licence selection with a 0 / 1 value for every licence module
+    :param dict licences:  Dictionary of {user attribute: 0 / 1}, missing licence modules are disabled
+    :return dict licences:
+    """
+    return {attribute: int(bool(licences.get(attribute, 0))) for attribute, _ in constants.Licence.modules}
+
+
+class LicenceProfiles(json_cache.JsonCache):
+    """
+        Class to read and write the locally stored licence profiles.
+
+        The cache contains the named profiles, the selection last confirmed (used to populate the GUI) and the user
+        attributes last written for each user and PowerFactory version.  The attributes last written are only
+        updated by pf_control so if they are changed directly in PowerFactory the settings must be applied with force.
+    """
+    description = 'licence profiles cache'
+
+    def __init__(self, cache_file=None):
+        """
+            Initialise the profiles
+        :param str cache_file: (optional) - Path to the cache file, defaults to constants.LocalCache.licence_profiles
+        """
+        json_cache.JsonCache.__init__(
+            self, cache_file=cache_file or constants.LocalCache.licence_profiles,
+            format_version=constants.LocalCache.licence_profiles_version
+        )
+        # Profiles are written by the GUI whilst the licence worker records the settings applied
+        self._lock = threading.RLock()
+
+    @property
+    def profiles(self):
+        return self.data.setdefault('profiles', dict())
+
+    def names(self):
+        """
+            Returns the names of the profiles
+        :return list names:
+        """
+        return sorted(self.profiles)
+
+    def get(self, name):
+        """
+            Returns the licence selection of a profile
+        :param str name:  Name of the profile
+        :return dict|None licences:  Dictionary of {user attribute: 0 / 1} or None if the profile does not exist
+        """
+        licences = self.profiles.get(name)
+        return None if licences is None else normalise(licences)
+
+    def save_profile(self, name, licences):
+        """
+            Saves a profile, replacing any existing profile with the same name
+        :param str name:  Name of the profile
+        :param dict licences:  Dictionary of {user attribute: 0 / 1}
+        :return None:
+        """
+        with self._lock:
+            self.profiles[name] = normalise(licences)
+            self.save()
+        return None
+
+    def delete_profile(self, name):
+        """
+            Removes a profile
+        :param str name:  Name of the profile
+        :return None:
+        """
+        with self._lock:
+            if self.profiles.pop(name, None) is not None:
+                self.save()
+        return None
+
+    @property
+    def last_selection(self):
+        """
+            Licence selection last confirmed, or None if nothing has been confirmed
+        :return dict|None licences:
+        """
+        licences = self.data.get('last_selection')
+        return None if licences is None else normalise(licences)
+
+    @staticmethod
+    def applied_key(pf_version, user=None):
+        return '{}|{}'.format(current_user() if user is None else user, pf_version)
+
+    def is_applied(self, pf_version, attributes, user=None):
+        """
+            Returns True if the user attributes are the same as those last written for the user and version
+        :param str pf_version:  PowerFactory version
+        :param dict attributes:  Dictionary of {user attribute: value} to be written
+        :param str user: (optional) - Name of the user, defaults to the current user
+        :return bool applied:
+        """
+        return self.data.setdefault('applied', dict()).get(self.applied_key(pf_version, user)) == dict(attributes)
+
+    def record_applied(self, pf_version, attributes, licences=None, user=None):
+        """
+            Records the user attributes written for a user and version
+        :param str pf_version:  PowerFactory version
+        :param dict attributes:  Dictionary of {user attribute: value} written
+        :param dict licences: (optional) - Licence selection confirmed, stored as the last selection
+        :param str user: (optional) - Name of the user, defaults to the current user
+        :return None:
+        """
+        with self._lock:
+            self.data.setdefault('applied', dict())[self.applied_key(pf_version, user)] = dict(attributes)
+            if licences is not None:
+                self.data['last_selection'] = normalise(licences)
+            self.save()
+        return None
+
+    def save(self):
+        with self._lock:
+            return json_cache.JsonCache.save(self)
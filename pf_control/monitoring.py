@@ -0,0 +1,185 @@
+"""
+#######################################################################################################################
+###											Monitoring																###
+###		Registers the variables to be recorded in a results file (ElmRes) from a specification of object class /	###
+###		pattern and variables, only adding those variables which are not already monitored							###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import hashlib
+import json
+import time
+
+import pf_control.constants as constants
+import pf_control.profiling as profiling
+
+# Monitor configuration already registered in this process {(study case, results file): (spec hash, monitors)}
+_registered = dict()
+
+
+class MonitorSpec:
+    """
+        Specification of the variables to monitor, made up of a number of (filter, variables) entries where the
+        filter is passed to GetCalcRelevantObjects (e.g. '*.ElmTerm')
+    """
+
+    def __init__(self, entries=None):
+        """
+        :param dict entries: (optional) - Dictionary of {filter: [variables]}, e.g.
+                                            {'*.ElmTerm': ['m:u', 'm:phiu', 'm:fehz'], '*.ElmSym': ['s:xspeed']}
+        """
+        self.entries = collections.OrderedDict()
+        for obj_filter, variables in (entries or dict()).items():
+            self.add(obj_filter, variables)
+
+    def add(self, obj_filter, variables):
+        """
+            Adds variables to be monitored for all objects matching a filter
+        :param str obj_filter:  Filter for GetCalcRelevantObjects (e.g. '*.ElmTerm')
+        :param list variables:  Variables to monitor
+        :return MonitorSpec self:
+        """
+        if isinstance(variables, str):
+            variables = [variables]
+        existing = self.entries.setdefault(obj_filter, list())
+        existing.extend(x for x in variables if x not in existing)
+        return self
+
+    @property
+    def hash(self):
+        """
+            Hash of the specification used to detect whether it has changed
+        :return str:
+        """
+        return hashlib.sha1(json.dumps(list(self.entries.items())).encode('utf-8')).hexdigest()
+
+
+class MonitorRegistration:
+    """
+        Class to register the variables in a MonitorSpec with a results file, recording the time taken by each phase
+    """
+
+    def __init__(self, app, elmres, query=None):
+        """
+        :param object app:  PowerFactory application
+        :param object elmres:  Results file (ElmRes) to register the variables with
+        :param func query: (optional) - Function which takes a filter and returns the matching calculation relevant
+                                        objects, defaults to app.GetCalcRelevantObjects
+        """
+        self.logger = constants.logger
+        self.app = app
+        self.elmres = elmres
+        self.query = query or app.GetCalcRelevantObjects
+
+        # Dictionary of {phase: time in seconds} for the last registration
+        self.timings = collections.OrderedDict()
+        # Statistics for the last registration
+        self.objects_added = 0
+        self.objects_extended = 0
+        self.variables_added = 0
+        self.skipped = False
+
+    def _time(self, phase, t0):
+        """
+            Records the time since t0 against a phase and returns the current time
+        :param str phase:
+        :param float t0:
+        :return float t1:
+        """
+        t1 = time.perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.0) + t1 - t0
+        return t1
+
+    def existing_monitors(self):
+        """
+            Returns the monitors already in the results file
+        :return dict monitors:  Dictionary of {object: (IntMon, [variables])}
+        """
+        monitors = dict()
+        for mon in self.elmres.GetContents('*.{}'.format(constants.Monitoring.monitor_class)):
+            if mon.obj_id is not None:
+                monitors[mon.obj_id] = (mon, list(mon.vars))
+        return monitors
+
+    def cache_key(self):
+        """
+            Returns the key used to cache the registration for the active study case and results file
+        :return tuple key:
+        """
+        study_case = self.app.GetActiveStudyCase()
+        return (study_case.GetFullName() if study_case is not None else str(), self.elmres.GetFullName())
+
+    @profiling.profiled()
+    def register(self, spec, force=False):
+        """
+            Registers the variables in the specification with the results file
+        :param MonitorSpec spec:  Variables to monitor
+        :param bool force: (optional) - If True the registration is carried out even if the same specification has
+                                        already been registered for this study case
+        :return dict timings:  Dictionary of {phase: time in seconds}
+        """
+        self.timings = collections.OrderedDict()
+        self.objects_added = self.objects_extended = self.variables_added = 0
+        self.skipped = False
+        t0 = time.perf_counter()
+
+        # Skip if this specification has already been registered and the monitors have not since been changed
+        key = self.cache_key()
+        cached = _registered.get(key)
+        if not force and cached is not None and cached[0] == spec.hash:
+            n_monitors = len(self.elmres.GetContents('*.{}'.format(constants.Monitoring.monitor_class)))
+            if n_monitors == cached[1]:
+                self.skipped = True
+                self._time('check cache', t0)
+                self.logger.debug('Monitored variables already registered for {}'.format(key))
+                return self.timings
+        t0 = self._time('check cache', t0)
+
+        # Combine the variables required for each object across all of the entries
+        required = collections.OrderedDict()
+        for obj_filter, variables in spec.entries.items():
+            for obj in self.query(obj_filter):
+                obj_variables = required.setdefault(obj, list())
+                obj_variables.extend(x for x in variables if x not in obj_variables)
+        t0 = self._time('query objects', t0)
+
+        existing = self.existing_monitors()
+        t0 = self._time('read existing monitors', t0)
+
+        for obj, variables in required.items():
+            if obj in existing:
+                mon, current = existing[obj]
+                missing = [x for x in variables if x not in current]
+                if missing:
+                    # Single write of the complete variable list rather than a call per variable
+                    mon.vars = current + missing
+                    self.objects_extended += 1
+                    self.variables_added += len(missing)
+            else:
+                self.elmres.AddVars(obj, *variables)
+                self.objects_added += 1
+                self.variables_added += len(variables)
+        t0 = self._time('register', t0)
+
+        n_monitors = len(self.elmres.GetContents('*.{}'.format(constants.Monitoring.monitor_class)))
+        _registered[key] = (spec.hash, n_monitors)
+        self._time('update cache', t0)
+
+        self.logger.debug(
+            '{} variables registered ({} objects added, {} extended, {} already monitored) in {:.3f} s:\n\t{}'.format(
+                self.variables_added, self.objects_added, self.objects_extended,
+                len(required) - self.objects_added - self.objects_extended, sum(self.timings.values()),
+                '\n\t'.join('{:<25}{:.3f} s'.format(k, v) for k, v in self.timings.items())
+            )
+        )
+        return self.timings
+
+
+def clear_cache():
+    """
+        Clears the record of the monitor configurations registered in this process
+    :return None:
+    """
+    _registered.clear()
+    return None
@@ -1,6 +1,9 @@
 import os
+import subprocess
 import sys
 import pf_control.constants as constants
+import pf_control.engine_api as engine_api
+import pf_control.profiling as profiling
 
 # powerfactory will be defined after initialisation by the PowerFactory class
 powerfactory = None
@@ -18,6 +21,7 @@ class PowerFactory:
         self.c = constants.PowerFactory()
         self.logger = constants.logger
 
+    @profiling.profiled()
     def add_python_paths(self):
         """
             Function retrieves the relevant python paths, adds them and then imports the powerfactory module
@@ -59,11 +63,12 @@ class PowerFactory:
 
         return None
 
+    @profiling.profiled()
     def initialise_power_factory(self, pf_version=None):
         """
             Function initialises powerfactory and provides an object reference to it
         :param str pf_version:  Will initialise power_factory based on the version provided
-        :return None:
+        :return object app_pf:  PowerFactory application
         """
         # Check if already running from PowerFactory and if so then update to use that power factory version
 
@@ -73,9 +78,31 @@ class PowerFactory:
             self.c.select_power_factory_version(pf_version=pf_version)
             self.add_python_paths()
 
-        # Different APIs exist for different PowerFactory versions, if an old version is run then different
-        # initialisation route.  When initialising need to warn user that old version is being used
+        # Different APIs exist for different PowerFactory versions, the capabilities of the version are only
+        # detected the first time it is used and are then cached
+        api = engine_api.EngineApi(
+            powerfactory, self.c.target_power_factory, watch=[self.c.dig_path, self.c.dig_python_path]
+        )
+        engine_api.current = api
+        self.logger.debug('Initialising <{}> with {}'.format(self.c.target_power_factory, api.entry_point))
+
         global app_pf
-        app_pf = powerfactory.GetApplication()
+        with profiling.span(api.entry_point, constants.Profiling.category_engine):
+            app_pf = api.get_application()
+        # Only wrapped if profiling is enabled so that every API call is recorded
+        app_pf = profiling.instrument(app_pf)
 
         return app_pf
+
+    def launch_power_factory(self, pf_version=None):
+        """
+            Function launches the PowerFactory GUI, the installation directory is determined from the version so that
+            PowerFactory can be launched without it having been initialised (e.g. if the licences were already applied)
+        :param str pf_version: (optional) - Version to launch, defaults to the version which has been selected
+        :return subprocess.Popen process:  Reference to the PowerFactory process
+        """
+        if pf_version is None and self.c.dig_path:
+            dig_path = self.c.dig_path
+        else:
+            dig_path = os.path.join(self.c.default_install_directory, pf_version or self.c.target_power_factory)
+        return subprocess.Popen(os.path.join(dig_path, 'PowerFactory.exe'))
@@ -0,0 +1,365 @@
+"""
+#######################################################################################################################
+###											Profiling																###
+###		Records the time spent in each PowerFactory API call and in the main pf_control functions as spans which	###
+###		can be exported as a Chrome trace (chrome://tracing or https://ui.perfetto.dev) or summarised as a table,	###
+###		costing no more than a flag check when profiling is disabled												###
+###																													###
+#######################################################################################################################
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+import pf_control.constants as constants
+
+_enabled = False
+_lock = threading.Lock()
+# List of (name, category, start in ns, duration in ns, process id, thread id) for each span recorded
+_events = list()
+# Dictionary of {(category, name): [calls, total ns, maximum ns]}
+_stats = dict()
+_dropped = 0
+
+
+def enable():
+    """
+        Enables profiling, spans are only recorded while profiling is enabled
+    :return None:
+    """
+    global _enabled
+    _enabled = True
+    return None
+
+
+def disable():
+    """
+        Disables profiling, spans already recorded are kept
+    :return None:
+    """
+    global _enabled
+    _enabled = False
+    return None
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    """
+        Removes all of the spans recorded
+    :return None:
+    """
+    global _dropped
+    with _lock:
+        _events.clear()
+        _stats.clear()
+        _dropped = 0
+    return None
+
+
+def record(name, category, start, duration, pid=None, tid=None):
+    """
+        Records a span
+    :param str name:  Name of the span (e.g. 'ComSim.Execute')
+    :param str category:  Category of the span
+    :param int start:  Start time in ns (time.perf_counter_ns)
+    :param int duration:  Duration in ns
+    :param int pid: (optional) - Process the span was recorded in, defaults to this process
+    :param int tid: (optional) - Thread the span was recorded in, defaults to this thread
+    :return None:
+    """
+    global _dropped
+    event = (name, category, start, duration, pid or os.getpid(), tid or threading.get_ident())
+    with _lock:
+        if len(_events) < constants.Profiling.max_events:
+            _events.append(event)
+        else:
+            _dropped += 1
+        stats = _stats.get((category, name))
+        if stats is None:
+            _stats[(category, name)] = [1, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+    return None
+
+
+class _Span:
+    """
+        Context manager which records the time taken by the code within it
+    """
+    __slots__ = ('name', 'category', 'start')
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        record(self.name, self.category, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    """
+        Context manager returned when profiling is disabled which does nothing
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+def span(name, category=None):
+    """
+        Returns a context manager which records the time taken by the code within it, e.g.
+            with profiling.span('export results'):
+                comres.Execute()
+    :param str name:  Name of the span
+    :param str category: (optional) - Category of the span, defaults to constants.Profiling.category_python
+    :return context manager:
+    """
+    if not _enabled:
+        return _null_span
+    return _Span(name, category or constants.Profiling.category_python)
+
+
+def profiled(name=None, category=None):
+    """
+        Decorator which records the time taken by each call to a function
+    :param str name: (optional) - Name of the span, defaults to the qualified name of the function
+    :param str category: (optional) - Category of the span, defaults to constants.Profiling.category_python
+    :return func decorator:
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+        span_category = category or constants.Profiling.category_python
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, span_category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def unwrap(value):
+    """
+        Returns the PowerFactory object wrapped by a ProfiledObject, values which are not wrapped are returned as is
+    :param object value:
+    :return object value:
+    """
+    if isinstance(value, ProfiledObject):
+        return object.__getattribute__(value, '_obj')
+    if isinstance(value, (list, tuple)):
+        return type(value)(unwrap(x) for x in value)
+    return value
+
+
+def wrap(value):
+    """
+        Wraps PowerFactory objects (including those in a list) so that the calls made to them are profiled
+    :param object value:
+    :return object value:
+    """
+    if isinstance(value, (str, int, float, bytes, type(None), ProfiledObject)):
+        return value
+    if isinstance(value, list):
+        return [wrap(x) for x in value]
+    if hasattr(value, 'GetClassName'):
+        return ProfiledObject(value)
+    return value
+
+
+class ProfiledObject:
+    """
+        Proxy for a PowerFactory object which records a span for each method called on it (named after the class of
+        the object and the method, e.g. 'ComSim.Execute').  Objects returned by the calls are also wrapped and
+        any wrapped objects passed to the calls or set as attributes are unwrapped, so the proxy can be used in place
+        of the object.
+    """
+    __slots__ = ('_obj', '_class_name')
+
+    def __init__(self, obj):
+        object.__setattr__(self, '_obj', obj)
+        object.__setattr__(self, '_class_name', None)
+
+    def _name(self, method):
+        class_name = object.__getattribute__(self, '_class_name')
+        if class_name is None:
+            obj = object.__getattribute__(self, '_obj')
+            try:
+                class_name = obj.GetClassName()
+            except Exception:
+                class_name = type(obj).__name__
+            object.__setattr__(self, '_class_name', class_name)
+        return '{}.{}'.format(class_name, method)
+
+    def __getattr__(self, name):
+        value = getattr(object.__getattribute__(self, '_obj'), name)
+        if not callable(value):
+            return wrap(value)
+
+        span_name = self._name(name)
+
+        def method(*args, **kwargs):
+            args = [unwrap(x) for x in args]
+            kwargs = {k: unwrap(v) for k, v in kwargs.items()}
+            if not _enabled:
+                return wrap(value(*args, **kwargs))
+            with _Span(span_name, constants.Profiling.category_engine):
+                result = value(*args, **kwargs)
+            return wrap(result)
+        return method
+
+    def __setattr__(self, name, value):
+        setattr(object.__getattribute__(self, '_obj'), name, unwrap(value))
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, '_obj') == unwrap(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, '_obj'))
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, '_obj'))
+
+    def __repr__(self):
+        return repr(object.__getattribute__(self, '_obj'))
+
+    def __str__(self):
+        return str(object.__getattribute__(self, '_obj'))
+
+
+def instrument(app):
+    """
+        Returns the PowerFactory application wrapped so that every API call made through it is profiled, if profiling
+        is disabled (or the application is already instrumented) the application is returned unchanged
+    :param object app:  PowerFactory application
+    :return object app:
+    """
+    if not _enabled or app is None or isinstance(app, ProfiledObject):
+        return app
+    return wrap(app) if hasattr(app, 'GetClassName') else ProfiledObject(app)
+
+
+def collect():
+    """
+        Returns the spans recorded and removes them, used to pass the spans recorded by a worker process to the pool
+    :return list events:
+    """
+    with _lock:
+        events = list(_events)
+        _events.clear()
+        _stats.clear()
+    return events
+
+
+def merge(events):
+    """
+        Adds the spans recorded in another process
+    :param list events:  Spans returned by collect
+    :return None:
+    """
+    for event in events:
+        record(*event)
+    return None
+
+
+def chrome_trace():
+    """
+        Returns the spans recorded in the Chrome trace event format
+    :return dict trace:
+    """
+    with _lock:
+        events = list(_events)
+    return {
+        'traceEvents': [
+            {'name': name, 'cat': category, 'ph': 'X', 'ts': start / 1000.0, 'dur': duration / 1000.0,
+             'pid': pid, 'tid': tid}
+            for name, category, start, duration, pid, tid in events
+        ],
+        'displayTimeUnit': 'ms'
+    }
+
+
+def write_chrome_trace(pth):
+    """
+        Writes the spans recorded to a Chrome trace file
+    :param str pth:  File to write
+    :return str pth:
+    """
+    with open(pth, 'w') as f:
+        json.dump(chrome_trace(), f)
+    return pth
+
+
+def summary(top=None):
+    """
+        Returns a table of the number of calls and time spent in each span, ordered by the total time
+    :param int top: (optional) - Only include this many spans
+    :return str table:
+    """
+    with _lock:
+        stats = sorted(_stats.items(), key=lambda x: x[1][1], reverse=True)
+        dropped = _dropped
+
+    engine_time = sum(x[1] for (category, _), x in stats if category == constants.Profiling.category_engine)
+    lines = ['{:<50}{:<14}{:>10}{:>12}{:>12}{:>12}'.format(
+        'Span', 'Category', 'Calls', 'Total (s)', 'Mean (ms)', 'Max (ms)')]
+    for (category, name), (calls, total, maximum) in stats[:top]:
+        lines.append('{:<50}{:<14}{:>10}{:>12.3f}{:>12.3f}{:>12.3f}'.format(
+            name[:49], category, calls, total / 1e9, total / calls / 1e6, maximum / 1e6))
+    lines.append('Total time in PowerFactory API calls {:.3f} s'.format(engine_time / 1e9))
+    if dropped:
+        lines.append('{} spans were not kept for the trace as the limit of {} was reached'.format(
+            dropped, constants.Profiling.max_events))
+    return '\n'.join(lines)
+
+
+def _write_at_exit(pth):
+    """
+        Writes the trace and logs the summary when Python exits, only in the main process since worker processes
+        pass their spans back to the pool
+    :param str pth:  File to write the trace to
+    :return None:
+    """
+    import multiprocessing
+    if hasattr(multiprocessing, 'parent_process'):
+        is_child = multiprocessing.parent_process() is not None
+    else:
+        # Python < 3.8
+        is_child = multiprocessing.current_process().name != 'MainProcess'
+    if is_child:
+        return None
+    write_chrome_trace(pth)
+    constants.logger.info('Profile written to <{}>:\n{}'.format(pth, summary()))
+    return None
+
+
+_setting = os.getenv(constants.Profiling.env_variable)
+if _setting:
+    enable()
+    if _setting.lower() not in ('1', 'true', 'yes'):
+        atexit.register(_write_at_exit, _setting)
@@ -0,0 +1,159 @@
+"""
+#######################################################################################################################
+###											Project Index															###
+###		Resolves slash separated paths within a PowerFactory project (e.g. Library/Operational Library/...) with	###
+###		each folder only being listed once so that subsequent lookups are dictionary hits							###
+###																													###
+#######################################################################################################################
+"""
+import pf_control.constants as constants
+
+
+class ProjectIndex:
+    """
+        Index of the objects within a PowerFactory project.
+
+        The contents of each folder are only requested from PowerFactory the first time a path passing through that
+        folder is resolved, after which a dictionary of {name: object} is kept for the folder.  An object can be
+        referred to either by its name (e.g. 'L') or its name and class (e.g. 'L.ChaVec') where names are not unique.
+        The index is only valid for the session in which it was created and must be invalidated if objects are
+        added, renamed or deleted.
+    """
+
+    def __init__(self, root):
+        """
+            Initialise the index
+        :param object root:  Object that paths are relative to, normally the active project (app.GetActiveProject())
+        """
+        self.logger = constants.logger
+        self.root = root
+        # Dictionary of {path: {name: object}} and {path: [objects]} for each folder that has been listed
+        self._folders = dict()
+        self._children = dict()
+        # Dictionary of {path: object} for each path that has been resolved
+        self._objects = {'': root}
+
+        # Statistics
+        self.folders_listed = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_app(cls, app):
+        """
+            Creates an index for the active project
+        :param object app:  PowerFactory application
+        :return ProjectIndex index:
+        """
+        project = app.GetActiveProject()
+        if project is None:
+            raise EnvironmentError('No PowerFactory project is active')
+        return cls(project)
+
+    @staticmethod
+    def split(path):
+        """
+            Splits a path into its parts ignoring empty parts and leading / trailing separators
+        :param str path:
+        :return list parts:
+        """
+        return [x for x in path.replace('\\', constants.ProjectIndex.separator).split(
+            constants.ProjectIndex.separator) if x]
+
+    def _contents(self, path, obj):
+        """
+            Returns the dictionary of {name: object} for a folder, listing the folder if it has not already been listed
+        :param str path:  Normalised path to the folder
+        :param object obj:  Folder object
+        :return dict contents:
+        """
+        contents = self._folders.get(path)
+        if contents is None:
+            contents = dict()
+            children = obj.GetContents()
+            for child in children:
+                # Where names are not unique the first object is referred to by its name alone
+                contents.setdefault(child.loc_name, child)
+                contents.setdefault('{}.{}'.format(child.loc_name, child.GetClassName()), child)
+            self._folders[path] = contents
+            self._children[path] = list(children)
+            self.folders_listed += 1
+        return contents
+
+    def resolve(self, path):
+        """
+            Returns the object at a path
+        :param str path:  Slash separated path relative to the root, e.g. 'Library/Operational Library/Characteristics'
+        :return object obj:
+        """
+        parts = self.split(path)
+        key = constants.ProjectIndex.separator.join(parts)
+
+        obj = self._objects.get(key)
+        if obj is not None:
+            self.hits += 1
+            return obj
+        self.misses += 1
+
+        # Start from the deepest parent which has already been resolved
+        i = len(parts)
+        while i > 0 and constants.ProjectIndex.separator.join(parts[:i]) not in self._objects:
+            i -= 1
+        obj = self._objects[constants.ProjectIndex.separator.join(parts[:i])]
+
+        for j in range(i, len(parts)):
+            parent_key = constants.ProjectIndex.separator.join(parts[:j])
+            contents = self._contents(parent_key, obj)
+            if parts[j] not in contents:
+                raise KeyError('<{}> not found in <{}>, available objects are:\n\t{}'.format(
+                    parts[j], parent_key or self.root.loc_name, '\n\t'.join(sorted(contents))))
+            obj = contents[parts[j]]
+            self._objects[constants.ProjectIndex.separator.join(parts[:j + 1])] = obj
+
+        return obj
+
+    def get(self, path, default=None):
+        """
+            Returns the object at a path or the default if it does not exist
+        :param str path:  Slash separated path relative to the root
+        :param object default: (optional) - Value to return if the path does not exist
+        :return object obj:
+        """
+        try:
+            return self.resolve(path)
+        except KeyError:
+            return default
+
+    def children(self, path, pf_class=None):
+        """
+            Returns the objects directly within a folder
+        :param str path:  Slash separated path relative to the root
+        :param str pf_class: (optional) - Only return objects of this class (e.g. 'ChaVec')
+        :return list objects:
+        """
+        key = constants.ProjectIndex.separator.join(self.split(path))
+        self._contents(key, self.resolve(path))
+        objects = list(self._children[key])
+        if pf_class is not None:
+            objects = [x for x in objects if x.GetClassName() == pf_class]
+        return objects
+
+    def invalidate(self, path=None):
+        """
+            Clears the cache for a path and everything below it, or the whole index if no path is provided.  Must be
+            called if objects are added, renamed or deleted.
+        :param str path: (optional) - Slash separated path relative to the root
+        :return None:
+        """
+        key = constants.ProjectIndex.separator.join(self.split(path or ''))
+        if not key:
+            self._folders.clear()
+            self._children.clear()
+            self._objects = {'': self.root}
+            return None
+
+        prefix = '{}{}'.format(key, constants.ProjectIndex.separator)
+        for cache in (self._folders, self._children, self._objects):
+            for k in [x for x in cache if x == key or x.startswith(prefix)]:
+                del cache[k]
+        return None
@@ -0,0 +1,157 @@
+"""
+#######################################################################################################################
+###											Query Cache																###
+###		Caches the results of GetCalcRelevantObjects for the active study case so that repeated queries during a	###
+###		batch do not have to go back to PowerFactory, along with arrays of commonly used attributes					###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import contextlib
+
+import numpy as np
+
+import pf_control.constants as constants
+
+
+class QueryCache:
+    """
+        Cache of calculation relevant objects keyed on (study case, filter).
+
+        Results are automatically separated by study case, since the active study case forms part of the key.
+        The cache must be invalidated after any operation which changes the topology (e.g. adding or deleting
+        elements, changing the active variations), either by calling invalidate or using changing_topology.
+    """
+
+    def __init__(self, app):
+        """
+        :param object app:  PowerFactory application
+        """
+        self.logger = constants.logger
+        self.app = app
+        # Dictionary of {(study case, filter): [objects]}
+        self._objects = dict()
+        # Dictionary of {(study case, filter, attribute): np.ndarray}
+        self._attributes = dict()
+        # Last active study case and its full name, so that the name only has to be looked up when it changes
+        self._active = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def study_case(self):
+        """
+            Returns the name of the active study case used in the cache keys
+        :return str name:
+        """
+        study_case = self.app.GetActiveStudyCase()
+        if study_case is None:
+            return str()
+        if self._active is None or self._active[0] != study_case:
+            self._active = (study_case, study_case.GetFullName())
+        return self._active[1]
+
+    def get(self, obj_filter):
+        """
+            Returns the calculation relevant objects matching a filter, the list returned is a copy so may be modified
+            by the caller without affecting the cache
+        :param str obj_filter:  Filter for GetCalcRelevantObjects (e.g. '*.ElmTerm')
+        :return list objects:
+        """
+        return list(self._get(self.study_case(), obj_filter))
+
+    def _get(self, study_case, obj_filter):
+        """
+            Returns the cached list of calculation relevant objects for a study case and filter
+        :param str study_case:  Name of the active study case
+        :param str obj_filter:  Filter for GetCalcRelevantObjects
+        :return list objects:
+        """
+        key = (study_case, obj_filter)
+        objects = self._objects.get(key)
+        if objects is None:
+            self.misses += 1
+            objects = list(self.app.GetCalcRelevantObjects(obj_filter))
+            self._objects[key] = objects
+        else:
+            self.hits += 1
+        return objects
+
+    def by_class(self, obj_filter=None):
+        """
+            Returns the objects matching a filter grouped by their class
+        :param str obj_filter: (optional) - Filter for GetCalcRelevantObjects, defaults to all objects
+        :return collections.OrderedDict objects:  Dictionary of {class name: [objects]}
+        """
+        grouped = collections.OrderedDict()
+        for obj in self.get(obj_filter or constants.Query.all_objects):
+            grouped.setdefault(obj.GetClassName(), list()).append(obj)
+        return grouped
+
+    def attribute(self, obj_filter, attribute, dtype=float):
+        """
+            Returns an attribute of every object matching a filter as an array in the same order as get
+        :param str obj_filter:  Filter for GetCalcRelevantObjects
+        :param str attribute:  Name of the attribute (e.g. 'uknom')
+        :param dtype: (optional) - Data type of the array
+        :return np.ndarray values:  Read only array
+        """
+        study_case = self.study_case()
+        key = (study_case, obj_filter, attribute)
+        values = self._attributes.get(key)
+        if values is None:
+            objects = self._get(study_case, obj_filter)
+            if attribute == 'loc_name':
+                values = np.array([x.loc_name for x in objects], dtype=dtype)
+            else:
+                values = np.array([x.GetAttribute(attribute) for x in objects], dtype=dtype)
+            values.setflags(write=False)
+            self._attributes[key] = values
+        return values
+
+    def names(self, obj_filter):
+        """
+            Returns the names of every object matching a filter
+        :param str obj_filter:  Filter for GetCalcRelevantObjects
+        :return np.ndarray names:
+        """
+        return self.attribute(obj_filter, 'loc_name', dtype=object)
+
+    def nominal_voltages(self, obj_filter=None):
+        """
+            Returns the nominal voltage (kV) of every terminal matching a filter
+        :param str obj_filter: (optional) - Filter for GetCalcRelevantObjects, defaults to all terminals
+        :return np.ndarray voltages:
+        """
+        return self.attribute(obj_filter or constants.Query.terminals, constants.Query.nominal_voltage)
+
+    def invalidate(self):
+        """
+            Clears the cache, must be called after any change to the topology
+        :return None:
+        """
+        self._objects.clear()
+        self._attributes.clear()
+        self._active = None
+        return None
+
+    def activate_study_case(self, study_case):
+        """
+            Activates a study case, the cached results for other study cases are cleared since activating a study
+            case may change the network
+        :param object study_case:  Study case (IntCase) to activate
+        :return int error:  Value returned by Activate
+        """
+        self.invalidate()
+        return study_case.Activate()
+
+    @contextlib.contextmanager
+    def changing_topology(self):
+        """
+            Context manager which invalidates the cache once the operations within it have completed
+        """
+        try:
+            yield self
+        finally:
+            self.invalidate()
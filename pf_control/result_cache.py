@@ -0,0 +1,239 @@
+"""
+#######################################################################################################################
+###											Result Cache															###
+###		Content addressed on-disk cache of the results of study executions, keyed by a hash of everything which		###
+###		determines the results, with the least recently used results removed once the cache exceeds its size		###
+###																													###
+#######################################################################################################################
+"""
+import functools
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+import pf_control.constants as constants
+
+
+def _describe_value(value):
+    """
+        Returns a JSON serialisable description of a value which json cannot serialise.  The repr of a large NumPy
+        array is truncated and so arrays are described by a hash of their contents.
+    :param object value:
+    :return object description:
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return {'ndarray': value.tolist(), 'shape': list(value.shape)}
+        return {'ndarray': hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest(),
+                'dtype': value.dtype.str, 'shape': list(value.shape)}
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
+
+
+def content_hash(details):
+    """
+        Returns a hash of the details of a calculation which is the same whenever the details are the same
+    :param dict details:  Details of the calculation, values which are not JSON serialisable (e.g. NumPy arrays) are
+                            described by _describe_value
+    :return str hash:
+    """
+    return hashlib.sha1(json.dumps(details, sort_keys=True, default=_describe_value).encode('utf-8')).hexdigest()
+
+
+def describe_function(func):
+    """
+        Returns a description of a function for inclusion in a hash, so that results collected by different
+        functions are not confused
+    :param func func:
+    :return str|list description:
+    """
+    if func is None:
+        return None
+    if isinstance(func, functools.partial):
+        return [describe_function(func.func), [repr(x) for x in func.args],
+                {k: repr(v) for k, v in func.keywords.items()}]
+    return '{}.{}'.format(getattr(func, '__module__', ''), getattr(func, '__qualname__', repr(func)))
+
+
+def study_key(project, study_case, commands, settings=None, characteristics=None, monitor_spec=None, **details):
+    """
+        Returns the key for the results of executing a study case
+    :param str project:  Name of the project
+    :param str study_case:  Name of the study case
+    :param tuple commands:  Names of the commands executed in order
+    :param dict settings: (optional) - Dictionary of {command: {attribute: value}} for any command settings changed
+    :param dict characteristics: (optional) - Dictionary of {name: vector} for any characteristics modified
+    :param pf_control.monitoring.MonitorSpec monitor_spec: (optional) - Variables monitored
+    :param details: (optional) - Any other details which determine the results (e.g. the results selected)
+    :return str key:
+    """
+    return content_hash({
+        'project': project,
+        'study_case': study_case,
+        'commands': list(commands),
+        'settings': settings or dict(),
+        'characteristics': {k: list(map(float, v)) for k, v in (characteristics or dict()).items()},
+        'monitored': None if monitor_spec is None else monitor_spec.hash,
+        'details': details
+    })
+
+
+class ResultCache:
+    """
+        Class to store results on disk against a content hash.
+
+        Each result is pickled to its own file named after its key.  The time a result was last used is recorded in
+        the modification time of its file so that the least recently used results can be removed once the total size
+        of the cache exceeds max_size.  The cache can be used in place of a dictionary of {key: result}.
+    """
+
+    def __init__(self, directory=None, max_size=None):
+        """
+            Initialise the cache, the sizes and last use of the results already in the directory are read
+        :param str directory: (optional) - Directory of the cache, defaults to constants.LocalCache.result_cache
+        :param int max_size: (optional) - Maximum total size of the cache in bytes, defaults to
+                                            constants.LocalCache.result_cache_max_size
+        """
+        self.logger = constants.logger
+        self.directory = directory or constants.LocalCache.result_cache
+        self.max_size = constants.LocalCache.result_cache_max_size if max_size is None else max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Dictionary of {key: [size in bytes, time last used]}
+        self._entries = dict()
+        for entry in os.scandir(self.directory):
+            key, extension = os.path.splitext(entry.name)
+            if extension == constants.LocalCache.result_cache_extension and entry.is_file():
+                stat = entry.stat()
+                self._entries[key] = [stat.st_size, stat.st_mtime]
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, '{}{}'.format(key, constants.LocalCache.result_cache_extension))
+
+    @property
+    def size(self):
+        return sum(x[0] for x in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or os.path.isfile(self.path(key))
+
+    def get(self, key, default=None):
+        """
+            Returns the result stored against a key, marking it as the most recently used
+        :param str key:
+        :param default: (optional) - Value returned if the key is not in the cache
+        :return object result:
+        """
+        pth = self.path(key)
+        try:
+            with open(pth, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(pth)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._entries.pop(key, None)
+            self.misses += 1
+            return default
+
+        stat = os.stat(pth)
+        self._entries[key] = [stat.st_size, stat.st_mtime]
+        self.hits += 1
+        return result
+
+    def __getitem__(self, key):
+        result = self.get(key, default=self)
+        if result is self:
+            raise KeyError(key)
+        return result
+
+    def put(self, key, result):
+        """
+            Stores a result against a key and then removes the least recently used results if the cache is too large
+        :param str key:
+        :param object result:  Result to store, must be picklable
+        :return None:
+        """
+        pth = self.path(key)
+        tmp_file = '{}.{}.tmp'.format(pth, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, pth)
+
+        stat = os.stat(pth)
+        self._entries[key] = [stat.st_size, stat.st_mtime]
+        self.evict(keep=key)
+        return None
+
+    def __setitem__(self, key, result):
+        self.put(key, result)
+
+    def evict(self, keep=None):
+        """
+            Removes the least recently used results until the cache is no larger than max_size
+        :param str keep: (optional) - Key which is never removed (i.e. the result just stored)
+        :return int removed:  Number of results removed
+        """
+        size = self.size
+        removed = 0
+        for key in sorted(self._entries, key=lambda x: self._entries[x][1]):
+            if size <= self.max_size:
+                break
+            if key == keep:
+                continue
+            size -= self._entries.pop(key)[0]
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+            removed += 1
+        self.evictions += removed
+        return removed
+
+    def run(self, key, func, *args, **kwargs):
+        """
+            Returns the cached result for a key, or calls func to calculate the result and caches it
+        :param str key:  Key of the result, e.g. from study_key
+        :param func func:  Function which calculates the result
+        :param args: (optional) - Arguments passed to func
+        :param kwargs: (optional) - Keyword arguments passed to func
+        :return object result:
+        """
+        result = self.get(key, default=self)
+        if result is self:
+            result = func(*args, **kwargs)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        """
+            Removes every result from the cache
+        :return None:
+        """
+        for key in list(self._entries):
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+        self._entries.clear()
+        return None
+
+    def report(self):
+        """
+            Returns a summary of the cache statistics
+        :return str summary:
+        """
+        requests = self.hits + self.misses
+        return '{} hits and {} misses ({:.0%} hit rate), {} results evicted, {} results using {:.1f} MB'.format(
+            self.hits, self.misses, self.hits / requests if requests else 0.0, self.evictions, len(self),
+            self.size / 1024 ** 2)
@@ -0,0 +1,280 @@
+"""
+#######################################################################################################################
+###											Result Store															###
+###		Stores the results of a run as one binary array per variable with a JSON schema describing the objects and	###
+###		units, so that a single variable or object can be memory mapped without reading the rest of the results		###
+###																													###
+#######################################################################################################################
+"""
+import collections
+import json
+import os
+
+import numpy as np
+
+import pf_control.constants as constants
+import pf_control.profiling as profiling
+
+
+class ResultStoreWriter:
+    """
+        Class to write a run to a result store directory.
+
+        Each variable is stored in its own .npy file as a (rows x objects) array in column major (Fortran) order so
+        that the values of a single object are contiguous on disk.  The schema is written when the writer is closed
+        and so a run which was not completed cannot be opened.
+    """
+
+    def __init__(self, pth, n_rows, columns, units=None, index_name=None, dtype=None, metadata=None):
+        """
+            Initialise the writer, creating the array files
+        :param str pth:  Directory to store the run in, must not already contain a run
+        :param int n_rows:  Number of rows (time steps / frequencies) in the run
+        :param list columns:  List of (object, variable) for each column of the values that will be written
+        :param dict units: (optional) - Dictionary of {variable: unit}
+        :param str index_name: (optional) - Name of the time / frequency index
+        :param dtype: (optional) - Data type used to store the values (e.g. np.float32)
+        :param dict metadata: (optional) - Additional details stored in the schema, must be JSON serialisable
+        """
+        self.logger = constants.logger
+        self.pth = pth
+        self.n_rows = int(n_rows)
+        self.dtype = np.dtype(dtype or constants.ResultStore.dtype)
+        self.units = units or dict()
+        self.index_name = index_name or constants.Results.index_name
+        self.metadata = metadata or dict()
+
+        if os.path.exists(os.path.join(self.pth, constants.ResultStore.schema_file)):
+            raise FileExistsError('A run has already been stored in <{}>'.format(self.pth))
+        os.makedirs(self.pth, exist_ok=True)
+
+        # Group the columns by variable, recording where each column of the values will be stored
+        self.variables = collections.OrderedDict()
+        self._column_map = collections.OrderedDict()
+        for i, (obj, var) in enumerate(columns):
+            objects = self.variables.setdefault(var, list())
+            self._column_map.setdefault(var, ([], []))
+            self._column_map[var][0].append(i)
+            self._column_map[var][1].append(len(objects))
+            objects.append(obj)
+        self._column_map = {
+            var: (np.array(src), np.array(dst)) for var, (src, dst) in self._column_map.items()
+        }
+
+        self._index = np.lib.format.open_memmap(
+            os.path.join(self.pth, constants.ResultStore.index_file), mode='w+', dtype=np.float64,
+            shape=(self.n_rows,)
+        )
+        self._arrays = collections.OrderedDict()
+        self.files = dict()
+        for j, (var, objects) in enumerate(self.variables.items()):
+            self.files[var] = constants.ResultStore.variable_file.format(j)
+            self._arrays[var] = np.lib.format.open_memmap(
+                os.path.join(self.pth, self.files[var]), mode='w+', dtype=self.dtype,
+                shape=(self.n_rows, len(objects)), fortran_order=True
+            )
+        self.rows_written = 0
+
+    def write(self, index, values):
+        """
+            Writes the next block of rows
+        :param np.ndarray index:  Time / frequency of each row
+        :param np.ndarray values:  2D array of (rows x columns) in the same column order as provided on creation
+        :return int rows_written:  Total number of rows written
+        """
+        start = self.rows_written
+        stop = start + len(index)
+        if stop > self.n_rows:
+            raise ValueError('Writing rows {} to {} exceeds the {} rows of the run'.format(start, stop, self.n_rows))
+
+        self._index[start:stop] = index
+        for var, (src, dst) in self._column_map.items():
+            self._arrays[var][start:stop, dst] = values[:, src]
+        self.rows_written = stop
+        return self.rows_written
+
+    def close(self):
+        """
+            Flushes the arrays to disk and writes the schema
+        :return str pth:  Directory of the run
+        """
+        if self.rows_written != self.n_rows:
+            self.logger.warning('Only {} of {} rows were written to <{}>'.format(
+                self.rows_written, self.n_rows, self.pth))
+
+        for array in [self._index] + list(self._arrays.values()):
+            array.flush()
+
+        schema = {
+            'version': constants.ResultStore.version,
+            'n_rows': self.rows_written,
+            'index': {'name': self.index_name, 'file': constants.ResultStore.index_file},
+            'variables': collections.OrderedDict(
+                (var, {
+                    'file': self.files[var], 'dtype': self.dtype.str, 'unit': self.units.get(var, str()),
+                    'objects': objects
+                }) for var, objects in self.variables.items()
+            ),
+            'metadata': self.metadata
+        }
+        tmp_file = os.path.join(self.pth, '{}.tmp'.format(constants.ResultStore.schema_file))
+        with open(tmp_file, 'w') as f:
+            json.dump(schema, f, indent=1)
+        os.replace(tmp_file, os.path.join(self.pth, constants.ResultStore.schema_file))
+
+        self._index = None
+        self._arrays = None
+        return self.pth
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+
+
+class ResultStore:
+    """
+        Class to read a run from a result store directory.  Arrays are memory mapped when first accessed and so only
+        the parts of the files that are actually used are read from disk.
+    """
+
+    def __init__(self, pth):
+        """
+            Opens a run, only the schema is read
+        :param str pth:  Directory of the run
+        """
+        self.pth = pth
+        with open(os.path.join(self.pth, constants.ResultStore.schema_file), 'r') as f:
+            self.schema = json.load(f)
+        if self.schema.get('version') != constants.ResultStore.version:
+            raise ValueError('Result store <{}> has version {} but version {} is required'.format(
+                self.pth, self.schema.get('version'), constants.ResultStore.version))
+
+        self.n_rows = self.schema['n_rows']
+        self.metadata = self.schema['metadata']
+        # Dictionary of {variable: {object: [columns]}}, objects in different grids may have the same name
+        self._object_columns = dict()
+        for var, details in self.schema['variables'].items():
+            columns = self._object_columns[var] = dict()
+            for i, obj in enumerate(details['objects']):
+                columns.setdefault(obj, list()).append(i)
+        self._arrays = dict()
+
+    @property
+    def variables(self):
+        return list(self.schema['variables'])
+
+    def objects(self, variable):
+        """
+            Returns the objects stored for a variable
+        :param str variable:
+        :return list objects:
+        """
+        return list(self.schema['variables'][variable]['objects'])
+
+    def unit(self, variable):
+        return self.schema['variables'][variable]['unit']
+
+    @property
+    def index(self):
+        """
+            Time / frequency of each row
+        :return np.memmap index:
+        """
+        return self._load(None)
+
+    @property
+    def index_name(self):
+        return self.schema['index']['name']
+
+    def _load(self, variable):
+        """
+            Returns the memory mapped array for a variable (or the index if variable is None)
+        :param str|None variable:
+        :return np.memmap array:
+        """
+        if variable not in self._arrays:
+            if variable is None:
+                file_name = self.schema['index']['file']
+            elif variable in self.schema['variables']:
+                file_name = self.schema['variables'][variable]['file']
+            else:
+                raise KeyError('Variable <{}> not in result store, available variables are:\n\t{}'.format(
+                    variable, '\n\t'.join(self.variables)))
+            array = np.load(os.path.join(self.pth, file_name), mmap_mode='r')
+            self._arrays[variable] = array[:self.n_rows]
+        return self._arrays[variable]
+
+    def variable(self, variable):
+        """
+            Returns the values of a variable for all objects without reading them into memory
+        :param str variable:
+        :return np.memmap values:  Read only array of (rows x objects)
+        """
+        return self._load(variable)
+
+    def series(self, variable, obj):
+        """
+            Returns the values of a variable for a single object, the values are contiguous on disk so this only
+            reads the parts of the file for that object.  If more than one object has the name the values of all of
+            them are returned.
+        :param str variable:
+        :param str obj:  Name of the object
+        :return np.memmap|np.ndarray values:  Read only array of the value for each row, or an array of
+                                                (rows x objects) if more than one object has the name
+        """
+        columns = self._object_columns[variable].get(obj)
+        if columns is None:
+            raise KeyError('Object <{}> does not have variable <{}> in the result store'.format(obj, variable))
+        if len(columns) == 1:
+            return self._load(variable)[:, columns[0]]
+        return self._load(variable)[:, columns]
+
+
+@profiling.profiled()
+def store_results(pth, index, values, columns, units=None, index_name=None, dtype=None, metadata=None):
+    """
+        Stores a complete set of results (e.g. from pf_control.results.ResultsReader.read) as a run
+    :param str pth:  Directory to store the run in
+    :param np.ndarray index:  Time / frequency of each row
+    :param np.ndarray values:  2D array of (rows x columns)
+    :param list columns:  List of (object, variable) for each column
+    :param dict units: (optional) - Dictionary of {variable: unit}
+    :param str index_name: (optional) - Name of the time / frequency index
+    :param dtype: (optional) - Data type used to store the values
+    :param dict metadata: (optional) - Additional details stored in the schema
+    :return str pth:  Directory of the run
+    """
+    with ResultStoreWriter(pth=pth, n_rows=len(index), columns=columns, units=units, index_name=index_name,
+                           dtype=dtype, metadata=metadata) as writer:
+        writer.write(index, values)
+    return pth
+
+
+def store_export(pth, reader, objects=None, variables=None, dtype=None, metadata=None):
+    """
+        Stores the selected columns of a ComRes export as a run, reading the export one chunk at a time
+    :param str pth:  Directory to store the run in
+    :param pf_control.export_reader.ExportReader reader:  Reader for the export
+    :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+    :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+    :param dtype: (optional) - Data type used to store the values
+    :param dict metadata: (optional) - Additional details stored in the schema
+    :return str pth:  Directory of the run
+    """
+    indices = reader.select(objects=objects, variables=variables)
+    reader_columns = reader.columns
+    columns = [reader_columns[i] for i in indices]
+    units = {reader.variables[i]: reader.units[i] for i in indices}
+
+    # Count the rows first so that the arrays can be created at their final size
+    with open(reader.pth, 'r', encoding=reader.encoding) as f:
+        n_rows = sum(1 for line in f if line.strip()) - constants.ExportReader.header_rows
+
+    with ResultStoreWriter(pth=pth, n_rows=n_rows, columns=columns, units=units, index_name=reader.index_name,
+                           dtype=dtype, metadata=metadata) as writer:
+        for index, values in reader.iter_chunks(objects=objects, variables=variables):
+            writer.write(index, values)
+    return pth
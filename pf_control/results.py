@@ -0,0 +1,166 @@
+"""
+#######################################################################################################################
+###											Results																	###
+###		Reads the results stored in a PowerFactory results file (ElmRes) directly into NumPy arrays through the		###
+###		results API rather than exporting them to a file with ComRes and parsing the file							###
+###																													###
+#######################################################################################################################
+"""
+import fnmatch
+
+import numpy as np
+
+import pf_control.constants as constants
+import pf_control.engine_api as engine_api
+import pf_control.profiling as profiling
+
+
+class ResultsReader:
+    """
+        Class to read the columns of an ElmRes into NumPy arrays.
+
+        The object and variable of every column are read once, after which any selection of columns can be read.
+        Where the engine supports it a whole column is read with a single call (GetColumnValues), otherwise each
+        value is read with GetValue.
+    """
+
+    def __init__(self, elmres):
+        """
+            Initialise the reader, loading the results into memory
+        :param object elmres:  PowerFactory results object (ElmRes)
+        """
+        self.logger = constants.logger
+        self.elmres = elmres
+        self.elmres.Load()
+
+        self.n_rows = self.elmres.GetNumberOfRows()
+        self.n_columns = self.elmres.GetNumberOfColumns()
+        self.fast_columns = engine_api.has_column_values(self.elmres)
+
+        # List of (object name, variable) for each column
+        self._columns = None
+        self._objects = None
+
+    @property
+    def columns(self):
+        """
+            Object name and variable of each column, read on first access
+        :return list columns:  List of (object name, variable) tuples
+        """
+        if self._columns is None:
+            self._objects = [self.elmres.GetObject(i) for i in range(self.n_columns)]
+            self._columns = [
+                (self.object_name(obj), self.elmres.GetVariable(i)) for i, obj in enumerate(self._objects)
+            ]
+        return self._columns
+
+    @staticmethod
+    def object_name(obj):
+        """
+            Returns the name used to refer to the object of a column
+        :param object obj:  PowerFactory object
+        :return str name:
+        """
+        if obj is None:
+            return str()
+        return obj.loc_name
+
+    def select(self, objects=None, variables=None):
+        """
+            Returns the indices of the columns matching the objects and variables
+        :param list objects: (optional) - Object names or wildcard patterns (e.g. 'Bus*'), if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns (e.g. 'm:u*'), if None all variables
+        :return list indices:
+        """
+        def matches(value, patterns):
+            return patterns is None or any(fnmatch.fnmatchcase(value, x) for x in patterns)
+
+        if isinstance(objects, str):
+            objects = [objects]
+        if isinstance(variables, str):
+            variables = [variables]
+
+        return [
+            i for i, (obj, var) in enumerate(self.columns) if matches(obj, objects) and matches(var, variables)
+        ]
+
+    def read_column(self, column):
+        """
+            Reads a single column
+        :param int column:  Index of the column, -1 for the time / frequency column
+        :return np.ndarray values:
+        """
+        if self.fast_columns:
+            error, values = self.elmres.GetColumnValues(column)
+            if not error:
+                return np.asarray(values, dtype=float)
+
+        values = np.empty(self.n_rows, dtype=float)
+        for row in range(self.n_rows):
+            error, values[row] = self.elmres.GetValue(row, column)
+            if error:
+                values[row] = np.nan
+        return values
+
+    @profiling.profiled()
+    def read(self, objects=None, variables=None, dtype=float):
+        """
+            Reads the selected columns
+        :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+        :param dtype: (optional) - Data type of the returned array
+        :return (np.ndarray, np.ndarray, list) (index, values, columns):  Time / frequency values, 2D array of
+                                                                            (rows x selected columns) and the
+                                                                            (object, variable) of each column
+        """
+        indices = self.select(objects=objects, variables=variables)
+
+        index = self.read_column(-1)
+        values = np.empty((self.n_rows, len(indices)), dtype=dtype)
+        for j, i in enumerate(indices):
+            values[:, j] = self.read_column(i)
+
+        return index, values, [self.columns[i] for i in indices]
+
+    def to_dataframe(self, objects=None, variables=None):
+        """
+            Reads the selected columns into a pandas DataFrame with (object, variable) columns
+        :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+        :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+        :return pandas.DataFrame df:
+        """
+        import pandas as pd
+
+        index, values, columns = self.read(objects=objects, variables=variables)
+        return pd.DataFrame(
+            values, index=pd.Index(index, name=constants.Results.index_name),
+            columns=pd.MultiIndex.from_tuples(columns, names=('object', 'variable'))
+        )
+
+    def release(self):
+        """
+            Releases the results from memory
+        :return None:
+        """
+        self.elmres.Release()
+        return None
+
+
+def collect_results(app, result_name, objects=None, variables=None):
+    """
+        Job which reads the selected columns of a results file in the active study case, can be used as the collect
+        function of a batch (with functools.partial to provide the result_name)
+    :param object app:  PowerFactory application
+    :param str result_name:  Name of the results file in the study case, e.g. 'Freq.Sweep.ElmRes'
+    :param list objects: (optional) - Object names or wildcard patterns, if None all objects
+    :param list variables: (optional) - Variable names or wildcard patterns, if None all variables
+    :return (np.ndarray, np.ndarray, list) (index, values, columns):
+    """
+    elmres = app.GetFromStudyCase(result_name)
+    if elmres is None:
+        raise ValueError('Results file <{}> not found in the active study case'.format(result_name))
+    reader = ResultsReader(elmres)
+    try:
+        return reader.read(objects=objects, variables=variables)
+    finally:
+        reader.release()
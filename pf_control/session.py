@@ -0,0 +1,487 @@
+"""
+#######################################################################################################################
+###											Engine Sessions															###
+###		Keeps a pool of worker processes, each with PowerFactory already initialised in engine mode, so that jobs	###
+###		do not have to pay the cost of starting the engine.  The PowerFactory API can only be used by the process	###
+###		which initialised it and so each engine lives in its own process.											###
+###																													###
+#######################################################################################################################
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+
+import pf_control.constants as constants
+import pf_control.profiling as profiling
+
+# Messages sent between the pool and the worker processes
+MSG_READY = 'ready'
+MSG_JOB = 'job'
+MSG_HEALTH = 'health'
+MSG_STOP = 'stop'
+MSG_OK = 'ok'
+MSG_ERROR = 'error'
+
+
+def default_engine_factory(pf_version=None):
+    """
+        Function initialises PowerFactory in the worker process
+    :param str pf_version: (optional) - PowerFactory version to initialise, if None the default version is used
+    :return object app:  PowerFactory application
+    """
+    import pf_control.pf as pf
+    return pf.PowerFactory().initialise_power_factory(pf_version=pf_version)
+
+
+def default_health_check(app):
+    """
+        Function confirms the engine is still responding by making a cheap API call
+    :param object app:  PowerFactory application
+    :return bool healthy:
+    """
+    return app.GetCurrentUser() is not None
+
+
+def get_memory_usage():
+    """
+        Returns the memory usage of this process in bytes (resident set size) or None if it cannot be determined
+    :return int|None rss:
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _engine_worker(conn, engine_factory, factory_kwargs, health_check, profile=False):
+    """
+        Main loop of the worker process, initialises the engine and then runs jobs until asked to stop.  Each reply
+        is (status, value, memory usage, profiling spans recorded since the last reply).
+    :param multiprocessing.connection.Connection conn:  Connection to the pool
+    :param func engine_factory:  Function which returns the PowerFactory application
+    :param dict factory_kwargs:  Keyword arguments for the engine_factory
+    :param func health_check:  Function which takes the application and returns True if it is healthy
+    :param bool profile: (optional) - If True the time spent starting the engine, running each job and in each
+                                        PowerFactory API call is recorded and passed back to the pool
+    :return None:
+    """
+    if profile:
+        profiling.enable()
+
+    try:
+        with profiling.span('Engine start', constants.Profiling.category_job):
+            # API calls are profiled if the factory instruments the application, as initialise_power_factory does
+            app = engine_factory(**factory_kwargs)
+    except Exception:
+        conn.send((MSG_ERROR, traceback.format_exc(), get_memory_usage(), profiling.collect()))
+        conn.close()
+        return None
+    conn.send((MSG_READY, os.getpid(), get_memory_usage(), profiling.collect()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            # Pool has gone away
+            break
+
+        if message[0] == MSG_STOP:
+            break
+
+        try:
+            if message[0] == MSG_JOB:
+                _, func, args, kwargs = message
+                with profiling.span(getattr(func, '__qualname__', repr(func)), constants.Profiling.category_job):
+                    result = func(app, *args, **kwargs)
+            else:
+                result = bool(health_check(app))
+            reply = (MSG_OK, result, get_memory_usage(), profiling.collect())
+        except Exception:
+            reply = (MSG_ERROR, traceback.format_exc(), get_memory_usage(), profiling.collect())
+
+        try:
+            conn.send(reply)
+        except Exception:
+            # Result could not be pickled
+            conn.send((MSG_ERROR, traceback.format_exc(), get_memory_usage(), reply[3]))
+
+    conn.close()
+    return None
+
+
+class EngineError(RuntimeError):
+    """ Raised when a job or the engine in a worker process fails """
+    pass
+
+
+class EngineSession:
+    """
+        Class representing a single worker process with an initialised engine
+    """
+
+    def __init__(self, engine_factory, factory_kwargs, health_check, start_timeout):
+        """
+            Starts the worker process, use wait_ready to wait for the engine to be initialised
+        :param func engine_factory:  Function which returns the PowerFactory application, must be importable by the
+                                        worker process
+        :param dict factory_kwargs:  Keyword arguments for the engine_factory
+        :param func health_check:  Function which takes the application and returns True if it is healthy
+        :param float start_timeout:  Time in seconds to wait for the engine to start
+        """
+        self.logger = constants.logger
+        self.start_timeout = start_timeout
+
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_engine_worker,
+            args=(child_conn, engine_factory, factory_kwargs, health_check, profiling.is_enabled()), daemon=True
+        )
+        self.started = time.perf_counter()
+        self.process.start()
+        child_conn.close()
+
+        self.pid = None
+        self.ready = False
+        self.start_time = None
+        self.start_memory = None
+        self.memory = None
+        self.jobs_run = 0
+        self.last_used = time.monotonic()
+
+    def wait_ready(self):
+        """
+            Waits for the engine in the worker process to finish initialising
+        :return float start_time:  Time in seconds taken to start the engine
+        """
+        if self.ready:
+            return self.start_time
+
+        if not self.conn.poll(self.start_timeout):
+            self.close(force=True)
+            raise EngineError('PowerFactory engine did not start within {} seconds'.format(self.start_timeout))
+
+        try:
+            status, value, memory, events = self.conn.recv()
+        except EOFError:
+            status, value, memory, events = (
+                MSG_ERROR, 'Worker process exited with code {}'.format(self.process.exitcode), None, list())
+        profiling.merge(events)
+        if status != MSG_READY:
+            self.close(force=True)
+            raise EngineError('PowerFactory engine failed to start:\n{}'.format(value))
+
+        self.pid = value
+        self.start_memory = self.memory = memory
+        self.start_time = time.perf_counter() - self.started
+        self.ready = True
+        self.logger.debug('PowerFactory engine started in process {} in {:.2f} s'.format(self.pid, self.start_time))
+        return self.start_time
+
+    def _request(self, message, timeout=None):
+        """
+            Sends a request to the worker process and waits for the reply
+        :param tuple message:  Message to send
+        :param float timeout: (optional) - Time in seconds to wait for a reply
+        :return object result:
+        """
+        self.wait_ready()
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            self.close(force=True)
+            raise EngineError('No reply from PowerFactory engine in process {} within {} s'.format(self.pid, timeout))
+
+        try:
+            status, result, memory, events = self.conn.recv()
+        except EOFError:
+            self.close(force=True)
+            raise EngineError('PowerFactory engine in process {} has exited'.format(self.pid))
+        profiling.merge(events)
+
+        self.memory = memory
+        self.last_used = time.monotonic()
+        if status == MSG_ERROR:
+            raise EngineError(result)
+        return result
+
+    def run(self, func, *args, **kwargs):
+        """
+            Runs a job in the worker process
+        :param func func:  Function to run, called as func(app, *args, **kwargs), must be importable by the worker
+        :return object result:  Value returned by the function
+        """
+        self.jobs_run += 1
+        return self._request((MSG_JOB, func, args, kwargs))
+
+    def is_healthy(self, timeout=None):
+        """
+            Returns True if the worker process is alive and the engine responds to the health check
+        :param float timeout: (optional) - Time in seconds to wait for a reply
+        :return bool healthy:
+        """
+        if not self.process.is_alive():
+            return False
+        try:
+            return self._request((MSG_HEALTH,), timeout=timeout)
+        except (EngineError, OSError):
+            return False
+
+    @property
+    def memory_growth(self):
+        """
+            Memory growth in bytes since the engine was started or None if the memory usage is not known
+        :return int|None:
+        """
+        if self.memory is None or self.start_memory is None:
+            return None
+        return self.memory - self.start_memory
+
+    def close(self, force=False):
+        """
+            Stops the worker process
+        :param bool force: (optional) - If True the process is terminated rather than asked to stop
+        :return None:
+        """
+        if not force and self.process.is_alive():
+            try:
+                self.conn.send((MSG_STOP,))
+                self.process.join(constants.EnginePool.stop_timeout)
+            except OSError:
+                pass
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        return None
+
+
+class EnginePool:
+    """
+        Pool of warm engine sessions.  Sessions are handed out to jobs one at a time and are recycled (the worker
+        process is stopped and a new one started) after a number of jobs, when the memory of the worker has grown
+        too much or when the engine fails a health check.
+    """
+
+    def __init__(self, size=None, engine_factory=default_engine_factory, factory_kwargs=None,
+                 health_check=default_health_check, max_jobs=None, max_memory_growth=None, start_timeout=None,
+                 health_check_interval=None):
+        """
+            Initialise the pool, any parameter not provided is taken from constants.EnginePool
+        :param int size: (optional) - Number of engine sessions
+        :param func engine_factory: (optional) - Function which returns the PowerFactory application
+        :param dict factory_kwargs: (optional) - Keyword arguments for the engine_factory (e.g. pf_version)
+        :param func health_check: (optional) - Function which takes the application and returns True if healthy
+        :param int max_jobs: (optional) - Number of jobs after which a session is recycled, None for no limit
+        :param int max_memory_growth: (optional) - Memory growth in bytes after which a session is recycled
+        :param float start_timeout: (optional) - Time in seconds to wait for an engine to start
+        :param float health_check_interval: (optional) - Sessions idle for longer than this (seconds) are health
+                                                            checked before being handed out
+        """
+        self.logger = constants.logger
+        self.size = size or constants.EnginePool.size
+        self.engine_factory = engine_factory
+        self.factory_kwargs = factory_kwargs or dict()
+        self.health_check = health_check
+        self.max_jobs = constants.EnginePool.max_jobs if max_jobs is None else max_jobs
+        self.max_memory_growth = (
+            constants.EnginePool.max_memory_growth if max_memory_growth is None else max_memory_growth
+        )
+        self.start_timeout = start_timeout or constants.EnginePool.start_timeout
+        self.health_check_interval = (
+            constants.EnginePool.health_check_interval if health_check_interval is None else health_check_interval
+        )
+
+        self._idle = queue.Queue()
+        self._sessions = list()
+        self._lock = threading.RLock()
+        self._executor = None
+        self.closed = False
+
+        # Statistics
+        self.sessions_started = 0
+        self.sessions_recycled = 0
+
+    def _new_session(self):
+        """
+            Starts a new engine session
+        :return EngineSession session:
+        """
+        session = EngineSession(
+            engine_factory=self.engine_factory, factory_kwargs=self.factory_kwargs, health_check=self.health_check,
+            start_timeout=self.start_timeout
+        )
+        with self._lock:
+            self._sessions.append(session)
+            self.sessions_started += 1
+        return session
+
+    def _discard(self, session):
+        """
+            Stops a session and removes it from the pool
+        :param EngineSession session:
+        :return None:
+        """
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.close()
+        return None
+
+    def start(self):
+        """
+            Starts all of the engine sessions concurrently and waits for them to be ready
+        :return EnginePool self:
+        """
+        sessions = [self._new_session() for _ in range(self.size - len(self._sessions))]
+        error = None
+        for session in sessions:
+            try:
+                session.wait_ready()
+            except Exception as session_error:
+                # A session which failed to start is removed so that it does not count towards the size of the pool
+                self._discard(session)
+                error = error or session_error
+                continue
+            self._idle.put(session)
+        if error is not None:
+            raise error
+        return self
+
+    def needs_recycling(self, session):
+        """
+            Returns the reason a session should be recycled or an empty string if it can be reused
+        :param EngineSession session:
+        :return str reason:
+        """
+        if not session.process.is_alive():
+            return 'process has exited'
+        if self.max_jobs and session.jobs_run >= self.max_jobs:
+            return 'completed {} jobs'.format(session.jobs_run)
+        growth = session.memory_growth
+        if self.max_memory_growth and growth is not None and growth > self.max_memory_growth:
+            return 'memory grown by {:.0f} MB'.format(growth / 1e6)
+        return str()
+
+    def recycle(self, session, reason):
+        """
+            Replaces a session with a newly started one
+        :param EngineSession session:  Session to replace
+        :param str reason:  Reason for recycling
+        :return EngineSession new_session:
+        """
+        self.logger.debug('Recycling PowerFactory engine in process {} ({})'.format(session.pid, reason))
+        self._discard(session)
+        self.sessions_recycled += 1
+        return self._new_session()
+
+    def acquire(self, timeout=None):
+        """
+            Returns a healthy session from the pool, blocking until one is available
+        :param float timeout: (optional) - Time in seconds to wait for a session
+        :return EngineSession session:
+        """
+        if self.closed:
+            raise EngineError('Engine pool has been closed')
+
+        # Start a new session if the pool is not yet full
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            session = None
+            with self._lock:
+                if len(self._sessions) < self.size:
+                    session = self._new_session()
+            if session is None:
+                session = self._idle.get(timeout=timeout)
+
+        try:
+            idle_time = time.monotonic() - session.last_used
+            if session.ready and idle_time > self.health_check_interval and not session.is_healthy(
+                    self.start_timeout):
+                session = self.recycle(session, 'failed health check')
+            session.wait_ready()
+        except Exception:
+            # A session which failed to start (including one started when recycling) is removed from the pool so
+            # that the next acquire starts a new session rather than waiting for this one to be released
+            self._discard(session)
+            raise
+        return session
+
+    def release(self, session, failed=False):
+        """
+            Returns a session to the pool, recycling it if required
+        :param EngineSession session:
+        :param bool failed: (optional) - If True the session is health checked before being reused
+        :return None:
+        """
+        if self.closed:
+            self._discard(session)
+            return None
+
+        reason = self.needs_recycling(session)
+        if not reason and failed and not session.is_healthy(self.start_timeout):
+            reason = 'failed health check'
+        if reason:
+            session = self.recycle(session, reason)
+        self._idle.put(session)
+        return None
+
+    def run(self, func, *args, **kwargs):
+        """
+            Runs a job on the next available session
+        :param func func:  Function to run, called as func(app, *args, **kwargs), must be importable by the worker
+        :return object result:  Value returned by the function
+        """
+        session = self.acquire()
+        failed = False
+        try:
+            return session.run(func, *args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(session, failed=failed)
+
+    def submit(self, func, *args, **kwargs):
+        """
+            Runs a job asynchronously on the next available session
+        :param func func:  Function to run, called as func(app, *args, **kwargs), must be importable by the worker
+        :return concurrent.futures.Future future:  Future for the value returned by the function
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix='EnginePool'
+                )
+        return self._executor.submit(self.run, func, *args, **kwargs)
+
+    def close(self):
+        """
+            Stops all of the sessions in the pool
+        :return None:
+        """
+        self.closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            self._discard(session)
+        return None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,145 @@
+"""
+#######################################################################################################################
+###											Snapshot																###
+###		Calculates the load flow and initial conditions of a simulation once and then restores them from a			###
+###		snapshot for each subsequent run, recalculating them automatically if the network has changed				###
+###																													###
+#######################################################################################################################
+"""
+import pf_control.batch as batch
+import pf_control.constants as constants
+import pf_control.profiling as profiling
+
+
+def network_fingerprint(app):
+    """
+        Returns a value which changes whenever the active study case, operation scenario or network variations
+        change.  Only the active objects are compared so that calculating the fingerprint is cheap, any other change
+        to the network (e.g. adding an element or changing a load) must be followed by InitialConditions.invalidate
+    :param object app:  PowerFactory application
+    :return tuple fingerprint:
+    """
+    def full_name(obj):
+        return obj.GetFullName() if obj is not None else str()
+
+    variations = app.GetActiveNetworkVariations() if hasattr(app, 'GetActiveNetworkVariations') else list()
+    return (
+        full_name(app.GetActiveStudyCase()),
+        full_name(app.GetActiveScenario()) if hasattr(app, 'GetActiveScenario') else str(),
+        tuple(sorted(full_name(x) for x in variations))
+    )
+
+
+class InitialConditions:
+    """
+        Class to provide the initial conditions for a simulation of the active study case.
+
+        The first call to ensure runs the load flow and initial conditions and saves a snapshot, subsequent calls
+        load the snapshot instead for as long as the network fingerprint is unchanged.  If the snapshot command is
+        not available (or fails) the initial conditions are recalculated each time, but the load flow is still only
+        run again if the network has changed.
+    """
+
+    def __init__(self, app, fingerprint=None, use_snapshot=True):
+        """
+        :param object app:  PowerFactory application
+        :param func fingerprint: (optional) - Function called as fingerprint(app) which returns a value that
+                                                changes whenever the network changes, defaults to network_fingerprint
+        :param bool use_snapshot: (optional) - If False the initial conditions are always recalculated
+        """
+        self.logger = constants.logger
+        self.app = app
+        self.fingerprint = fingerprint or network_fingerprint
+        self.use_snapshot = use_snapshot
+
+        # Fingerprint of the network when the load flow was run and the snapshot saved (None if not yet available)
+        self._load_flow_fingerprint = None
+        self._snapshot_fingerprint = None
+
+        # Statistics
+        self.load_flows = 0
+        self.load_flows_avoided = 0
+        self.initialisations = 0
+        self.initialisations_avoided = 0
+
+    def execute(self, name, **attributes):
+        """
+            Executes a command from the active study case
+        :param str name:  Name of the command
+        :param attributes: (optional) - Attributes set on the command before it is executed
+        :return None:
+        """
+        cmd = self.app.GetFromStudyCase(name)
+        if cmd is None:
+            raise batch.StudyCaseError('Command <{}> not found in the active study case'.format(name))
+        for attribute, value in attributes.items():
+            cmd.SetAttribute(attribute, value)
+        error = cmd.Execute()
+        if error:
+            raise batch.StudyCaseError('Command <{}> failed with error code {}'.format(name, error))
+        return None
+
+    def snapshot(self, action):
+        """
+            Saves or loads the snapshot
+        :param int action:  constants.Snapshot.action_save or constants.Snapshot.action_load
+        :return bool success:  False if the snapshot command could not be used, in which case snapshots are no
+                                longer used
+        """
+        try:
+            self.execute(constants.Snapshot.command, **{constants.Snapshot.action_attribute: action})
+        except batch.StudyCaseError as error:
+            self.logger.warning('Snapshots disabled, initial conditions will be recalculated each time: {}'.format(
+                error))
+            self.use_snapshot = False
+            self._snapshot_fingerprint = None
+            return False
+        return True
+
+    @profiling.profiled()
+    def ensure(self):
+        """
+            Provides the initial conditions, loading them from the snapshot where possible
+        :return bool initialised:  True if the initial conditions were recalculated
+        """
+        fingerprint = self.fingerprint(self.app)
+
+        if self.use_snapshot and fingerprint == self._snapshot_fingerprint:
+            if self.snapshot(constants.Snapshot.action_load):
+                self.initialisations_avoided += 1
+                self.load_flows_avoided += 1
+                return False
+
+        if fingerprint == self._load_flow_fingerprint:
+            self.load_flows_avoided += 1
+        else:
+            self.execute(constants.Snapshot.load_flow)
+            self.load_flows += 1
+            self._load_flow_fingerprint = fingerprint
+
+        self.execute(constants.Snapshot.initial_conditions)
+        self.initialisations += 1
+
+        if self.use_snapshot and self.snapshot(constants.Snapshot.action_save):
+            self._snapshot_fingerprint = fingerprint
+        return True
+
+    def invalidate(self):
+        """
+            Forces the load flow and initial conditions to be recalculated on the next call to ensure, must be called
+            after any change to the network which is not detected by the fingerprint (e.g. adding an element or
+            changing a load)
+        :return None:
+        """
+        self._load_flow_fingerprint = None
+        self._snapshot_fingerprint = None
+        return None
+
+    def report(self):
+        """
+            Returns a summary of the initialisations avoided
+        :return str summary:
+        """
+        return '{} of {} initialisations and {} of {} load flows avoided'.format(
+            self.initialisations_avoided, self.initialisations + self.initialisations_avoided,
+            self.load_flows_avoided, self.load_flows + self.load_flows_avoided)
@@ -46,6 +46,13 @@ os.environ['PATH'] = os.environ['PATH'] + ';' + DIG_PATH
 # noqa
 import powerfactory
 
+import pf_control.characteristics as characteristics
+import pf_control.monitoring as monitoring
+import pf_control.project as project_index
+import pf_control.query as query
+import pf_control.results as results
+import pf_control.snapshot as snapshot
+
 # Load application as Administrator
 # #app = powerfactory.GetApplication(username='Administrator', password='Administrator')
 # No need to load as Administrator when controlling through Python
@@ -72,34 +79,14 @@ folders = prj.GetContents('*.IntPrjfolder')
 temp_filtered = filter(lambda folders: folders.loc_name=='Study Cases', folders)
 studyCases_folder=list(temp_filtered)
 studyCases = studyCases_folder[0].GetContents('*.IntCase')
-temp_filtered = filter(lambda folders: folders.loc_name=='Library', folders)
-Library=list(temp_filtered)
-Library_temp=Library[0]
-Library_subfolders=Library_temp.GetContents('*.')
-temp_filtered = filter(lambda Library_subfolders: Library_subfolders.loc_name=='Operational Library', Library_subfolders)
-oper_folder=list(temp_filtered)
-oper_temp=oper_folder[0]
-oper_subfolders=oper_temp.GetContents('*.')
-temp_filtered = filter(lambda oper_subfolders: oper_subfolders.loc_name=='Characteristics', oper_subfolders)
-char_folder=list(temp_filtered)
-char_temp=char_folder[0]
-char_subfolders=char_temp.GetContents('*.')
-temp_filtered = filter(lambda char_subfolders: char_subfolders.loc_name=='Oyster Creek 800MW', char_subfolders)
-scen_folder=list(temp_filtered)
-scen_temp=scen_folder[0]
-scen_subfolders=scen_temp.GetContents('*.')
-temp_filtered = filter(lambda scen_subfolders: scen_subfolders.loc_name=='OC_Intact_V', scen_subfolders)
-scen_param_folder=list(temp_filtered)
-scen_param_temp=scen_param_folder[0]
-scen_param_subvalues=scen_param_temp.GetContents('*.')
-#studyCases = folders[4].GetContents('*.IntCase')
-temp_filtered_L = filter(lambda scen_param_subvalues: scen_param_subvalues.loc_name=='L', scen_param_subvalues)
-temp_filtered_R = filter(lambda scen_param_subvalues: scen_param_subvalues.loc_name=='R', scen_param_subvalues)
-L=list(temp_filtered_L)
-R=list(temp_filtered_R)
-i=L[0].vector
-i[0]=1.2
-L[0].vector=i
+# Resolve the characteristics through the project index so each folder is only listed once
+prj_index = project_index.ProjectIndex(prj)
+scen_param_path = 'Library/Operational Library/Characteristics/Oyster Creek 800MW/OC_Intact_V'
+L = [prj_index.resolve('{}/L'.format(scen_param_path))]
+R = [prj_index.resolve('{}/R'.format(scen_param_path))]
+# Edits are applied in a single batch and only the characteristics that change are written back
+char_editor = characteristics.CharacteristicEditor(characteristics=[L[0], R[0]])
+char_editor.apply(updates={'L': {0: 1.2}})
 Lib_folders = folders[1].GetContents('*.IntPrjfolder')
 Charc_scen_folders=Lib_folders[1].GetContents('*.IntPrjfolder')
 scn_folders=Charc_scen_folders[10].GetContents('*.')
@@ -114,7 +101,9 @@ ldf = app.GetFromStudyCase("ComLdf")
 Hldf = app.GetFromStudyCase("ComHLdf")
 Fsweep = app.GetFromStudyCase("ComFsweep")
 ini = app.GetFromStudyCase('ComInc')
-terminals = app.GetCalcRelevantObjects("*.ElmTerm")
+# Calculation relevant objects are cached for the active study case
+query_cache = query.QueryCache(app)
+terminals = query_cache.get("*.ElmTerm")
 elmres = app.GetFromStudyCase('Freq.Sweep.ElmRes')
 
 # for terminal in terminals:
@@ -125,17 +114,10 @@ Hldf.Execute()
 Fsweep.Execute()
 
 
-#comres = app.GetFromStudyCase('new.ComRes');
-comres = app.GetFromStudyCase('FTest1.ComRes');
-
-comres.iopt_csel = 0
-comres.iopt_tsel = 0
-comres.iopt_locn = 2
-comres.ciopt_head = 1
-comres.pResult = elmres
-comres.f_name = r'C:\Negar\Test1\hola.csv'
-comres.iopt_exp = 6
-comres.Execute()
+# Read the frequency sweep results directly rather than exporting them with ComRes and re-parsing the file
+sweep_reader = results.ResultsReader(elmres)
+sweep_freq, sweep_values, sweep_columns = sweep_reader.read()
+sweep_reader.release()
 
 
 n1=studyCases[4].loc_name
@@ -161,9 +143,9 @@ ini = app.GetFromStudyCase('ComInc')
 sim = app.GetFromStudyCase('ComSim')
 Shc_folder = app.GetFromStudyCase('IntEvt');
 
-terminals = app.GetCalcRelevantObjects("*.ElmTerm")
-lines = app.GetCalcRelevantObjects("*.ElmTerm")
-syms = app.GetCalcRelevantObjects("*.ElmSym")
+terminals = query_cache.get("*.ElmTerm")
+lines = query_cache.get("*.ElmLne")
+syms = query_cache.get("*.ElmSym")
 
 Shc_folder.CreateObject('EvtSwitch', 'evento de generacion');
 EventSet = Shc_folder.GetContents();
@@ -175,17 +157,15 @@ evt.p_target = syms[1]
 
 ldf.iopt_net = 0
 
-ldf.Execute()
-
 elmres = app.GetFromStudyCase('Results.ElmRes')
 
-for terminal in terminals:
-    elmres.AddVars(terminal, 'm:u', 'm:phiu', 'm:fehz')
-
-for sym in syms:
-    elmres.AddVars(sym, 's:xspeed')
+# Register all of the monitored variables at once, skipping those already registered
+monitor_spec = monitoring.MonitorSpec({'*.ElmTerm': ['m:u', 'm:phiu', 'm:fehz'], '*.ElmSym': ['s:xspeed']})
+monitoring.MonitorRegistration(app=app, elmres=elmres, query=query_cache.get).register(monitor_spec)
 
-ini.Execute()
+# Only one simulation is run so the initial conditions are calculated without saving a snapshot that is never loaded
+initial_conditions = snapshot.InitialConditions(app, use_snapshot=False)
+initial_conditions.ensure()
 sim.Execute()
 
 evt.Delete()
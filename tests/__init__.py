@@ -0,0 +1,4 @@
+"""
+    Tests for pf_control, run with python -m pytest from the root of the repository.  PowerFactory is replaced by
+    the pure Python fake in benchmarks.fake_powerfactory.
+"""
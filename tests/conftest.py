@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks.fake_powerfactory import powerfactory
+
+
+@pytest.fixture
+def app():
+    """ Fake PowerFactory application with a small project active and no API latency """
+    powerfactory.configure(terminals=20, lines=20, generators=4, study_cases=3, scenarios=2, library_depth=1,
+                           monitored_terminals=5, result_rows=10,
+                           latency={name: 0.0 for name in powerfactory.config.latency})
+    application = powerfactory.GetApplication()
+    application.ActivateProject('Benchmark')
+    yield application
+    powerfactory.reset()
+
+
+@pytest.fixture
+def local_cache(tmp_path, monkeypatch):
+    """ Local cache files written to a temporary directory rather than the user's cache """
+    import pf_control.constants as constants
+    directory = tmp_path / 'cache'
+    for name in ('install_registry', 'licence_profiles', 'capabilities'):
+        monkeypatch.setattr(constants.LocalCache, name, str(directory / '{}.json'.format(name)))
+    monkeypatch.setattr(constants.LocalCache, 'result_cache', str(directory / 'results'))
+    return directory
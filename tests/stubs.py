@@ -0,0 +1,33 @@
+"""
+    Engine factories and jobs used by the tests, these must be importable functions so they can be passed to the
+    worker processes of an EnginePool
+"""
+from benchmarks.fake_powerfactory import powerfactory
+
+
+class FactoryError(RuntimeError):
+    pass
+
+
+def failing_engine_factory(**kwargs):
+    """ Engine factory which always fails to start """
+    raise FactoryError('Engine failed to start')
+
+
+def fake_engine_factory(**kwargs):
+    """ Engine factory returning the fake PowerFactory application """
+    return powerfactory.engine_factory(**kwargs)
+
+
+def healthy(app):
+    return True
+
+
+def user_name(app):
+    """ Job returning the name of the current user """
+    return app.GetCurrentUser().loc_name
+
+
+def study_case_name(app):
+    """ Collect function returning the name of the active study case """
+    return app.GetActiveStudyCase().loc_name
@@ -0,0 +1,32 @@
+import pf_control.batch as batch
+import pf_control.result_cache as result_cache
+import pf_control.session as session
+from benchmarks.fake_powerfactory import powerfactory
+from tests import stubs
+
+# Small fake project without any latency, configured in each worker process
+FACTORY_KWARGS = {'study_cases': 3, 'terminals': 10, 'lines': 10, 'generators': 2, 'library_depth': 1,
+                  'monitored_terminals': 2, 'result_rows': 10,
+                  'latency': {name: 0.0 for name in powerfactory.Config().latency}}
+
+
+def test_study_case_names_matched_exactly(app):
+    folder = batch.get_study_case_folder(app)
+    wildcard = folder.CreateObject('IntCase', 'Study Case ?')
+    assert batch.activate_study_case(app, 'Benchmark', 'Study Case ?') is wildcard
+    assert batch.activate_study_case(app, 'Benchmark', 'Study Case 1').loc_name == 'Study Case 1'
+
+
+def test_batch_runner(tmp_path):
+    cache = result_cache.ResultCache(directory=str(tmp_path))
+    with session.EnginePool(size=2, engine_factory=stubs.fake_engine_factory, factory_kwargs=FACTORY_KWARGS,
+                            health_check=stubs.healthy, start_timeout=30) as pool:
+        runner = batch.StudyCaseBatchRunner(pool, 'Benchmark', ('ComLdf',), collect=stubs.study_case_name,
+                                            cache=cache, key_details=dict())
+        results = runner.run()
+        assert list(results) == ['Study Case 0', 'Study Case 1', 'Study Case 2']
+        assert all(x.succeeded and not x.cached and x.result == name for name, x in results.items())
+
+        # Results of the second run are all returned from the cache
+        results = runner.run()
+        assert all(x.succeeded and x.cached and x.attempts == 0 for x in results.values())
@@ -0,0 +1,36 @@
+import numpy as np
+
+import pf_control.characteristics as characteristics
+
+
+def vectors(app):
+    folder = app.GetProjectFolder('chars')
+    return {x.loc_name: x.GetContents('R.ChaVec')[0] for x in folder.GetContents('*.IntPrjfolder')}
+
+
+def test_only_changed_vectors_written(app):
+    chavecs = vectors(app)
+    editor = characteristics.CharacteristicEditor(chavecs)
+    changes = editor.apply({'Folder 0': {2: 0.5}, 'Folder 1': [0.1] * 10, 'Folder 2': [np.nan] * 9 + [0.3]})
+    assert [x.name for x in changes] == ['Folder 0', 'Folder 2']
+    assert editor.vectors_written == 2
+    assert chavecs['Folder 0'].vector[2] == 0.5
+    assert chavecs['Folder 2'].vector == [0.1] * 9 + [0.3]
+
+
+def test_array_of_updates(app):
+    chavecs = vectors(app)
+    editor = characteristics.CharacteristicEditor(chavecs)
+    names = ['Folder 0', 'Folder 1']
+    editor.apply(np.full((2, 10), 0.2), names=names)
+    assert editor.as_array(names).tolist() == [[0.2] * 10] * 2
+    assert chavecs['Folder 1'].vector == [0.2] * 10
+
+
+def test_dry_run_does_not_write(app):
+    chavecs = vectors(app)
+    editor = characteristics.CharacteristicEditor(chavecs)
+    changes = editor.apply({'Folder 0': {0: 1.0}}, dry_run=True)
+    assert len(changes) == 1 and changes[0].indices.tolist() == [0]
+    assert chavecs['Folder 0'].vector == [0.1] * 10
+    assert editor.vectors_written == 0
@@ -0,0 +1,43 @@
+import pytest
+
+import pf_control.cli as cli
+import pf_control.constants as constants
+import pf_control.licence as licence
+import pf_control.licence_profiles as licence_profiles
+import pf_control.pf as pf
+
+
+def test_pf_version_argument():
+    args = cli.build_parser().parse_args(['--pf-version', '2020', '--licences', 'harm'])
+    assert args.pf_version == '2020'
+    assert args.licences == ['harm']
+
+
+def test_version_short_option_removed():
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(['-v', '2020'])
+
+
+def test_resolve_version():
+    available = ['PowerFactory 2019', 'PowerFactory 2020']
+    assert cli.resolve_version(None, available) == 'PowerFactory 2020'
+    assert cli.resolve_version('2019', available) == 'PowerFactory 2019'
+    assert cli.resolve_version('2021', available) is None
+
+
+def test_launch_when_profile_already_applied(tmp_path, local_cache, monkeypatch):
+    install_directory = tmp_path / 'DIgSILENT'
+    (install_directory / 'PowerFactory 2020').mkdir(parents=True)
+    monkeypatch.setattr(constants.PowerFactory, 'default_install_directory', str(install_directory))
+
+    profiles = licence_profiles.LicenceProfiles()
+    profiles.save_profile('harmonics', {'harm': 1})
+    profiles.record_applied('PowerFactory 2020', licence.target_attributes(profiles.get('harmonics')))
+
+    launched = list()
+    monkeypatch.setattr(pf.subprocess, 'Popen', launched.append)
+    monkeypatch.setattr(pf.PowerFactory, 'initialise_power_factory', lambda *args, **kwargs: pytest.fail(
+        'PowerFactory should not be initialised when the profile is already applied'))
+
+    assert cli.main(['--profile', 'harmonics', '--launch']) == cli.EXIT_SUCCESS
+    assert launched == [str(install_directory / 'PowerFactory 2020' / 'PowerFactory.exe')]
@@ -0,0 +1,138 @@
+import os
+import types
+
+import pytest
+
+import pf_control.constants as constants
+import pf_control.engine_api as engine_api
+from benchmarks.fake_powerfactory import powerfactory
+
+
+class ExitError(Exception):
+    """ Stand in for the exception raised by GetApplicationExt """
+
+    def __init__(self, code):
+        Exception.__init__(self, code)
+        self.code = code
+
+
+def make_module(ext=True, exit_error=True, code=None, returns_none=False):
+    """
+        Returns a stand in for the powerfactory module built on the fake backend, recording the entry point used
+    :param bool ext: (optional) - Whether the module provides GetApplicationExt
+    :param bool exit_error: (optional) - Whether the module provides ExitError
+    :param int code: (optional) - If provided GetApplicationExt raises ExitError with this code
+    :param bool returns_none: (optional) - If True GetApplication returns None
+    """
+    module = types.SimpleNamespace(calls=list())
+
+    def get_application():
+        module.calls.append(constants.EngineApi.entry_point)
+        return None if returns_none else powerfactory.GetApplication()
+
+    def get_application_ext(**kwargs):
+        module.calls.append(constants.EngineApi.entry_point_ext)
+        if code is not None:
+            raise ExitError(code)
+        return powerfactory.GetApplicationExt(**kwargs)
+
+    module.GetApplication = get_application
+    if ext:
+        module.GetApplicationExt = get_application_ext
+    if exit_error:
+        module.ExitError = ExitError
+    return module
+
+
+def test_detect():
+    capabilities = engine_api.detect(powerfactory, 'PowerFactory 2020 SP2')
+    assert capabilities == {'year': 2020, 'entry_point': 'GetApplicationExt', 'exit_error': False,
+                            'column_values': None}
+    assert engine_api.detect(make_module(), 'PowerFactory 2020')['exit_error']
+    # Older versions and modules without GetApplicationExt use GetApplication
+    assert engine_api.detect(make_module(), 'PowerFactory 2018')['entry_point'] == 'GetApplication'
+    assert engine_api.detect(make_module(ext=False), 'PowerFactory 2020')['entry_point'] == 'GetApplication'
+    # Where the year is unknown the entry point provided by the module is used
+    assert engine_api.detect(make_module(), 'PowerFactory')['entry_point'] == 'GetApplicationExt'
+
+
+def test_registry_cache_hit_and_invalidation(tmp_path):
+    watched = tmp_path / 'Python'
+    watched.mkdir()
+    cache_file = str(tmp_path / 'cache' / 'capabilities.json')
+    detected = list()
+
+    def detect():
+        detected.append(1)
+        return engine_api.detect(make_module(), 'PowerFactory 2020')
+
+    def get():
+        return engine_api.CapabilityRegistry(cache_file=cache_file).get('PowerFactory 2020', [str(watched)], detect)
+
+    assert get()['entry_point'] == 'GetApplicationExt'
+    # Loaded from the cache file by a new registry without being detected again
+    assert get()['entry_point'] == 'GetApplicationExt'
+    assert len(detected) == 1
+
+    mtime = os.stat(str(watched)).st_mtime
+    os.utime(str(watched), (mtime + 10, mtime + 10))
+    get()
+    assert len(detected) == 2
+
+
+def test_registry_update(tmp_path):
+    cache_file = str(tmp_path / 'capabilities.json')
+    registry = engine_api.CapabilityRegistry(cache_file=cache_file)
+    # Versions which have not been detected are ignored
+    registry.update('PowerFactory 2020', column_values=True)
+    assert registry.data['entries'] == dict()
+
+    registry.get('PowerFactory 2020', list(), lambda: engine_api.detect(make_module(), 'PowerFactory 2020'))
+    registry.update('PowerFactory 2020', column_values=True)
+    capabilities = engine_api.CapabilityRegistry(cache_file=cache_file).get(
+        'PowerFactory 2020', list(), lambda: pytest.fail('Capabilities should be loaded from the cache'))
+    assert capabilities['column_values'] is True
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return engine_api.CapabilityRegistry(cache_file=str(tmp_path / 'capabilities.json'))
+
+
+def test_get_application_ext(registry):
+    module = make_module()
+    api = engine_api.EngineApi(module, 'PowerFactory 2020', registry=registry)
+    assert isinstance(api.get_application(username='benchmark'), powerfactory.Application)
+    assert module.calls == ['GetApplicationExt']
+
+
+def test_get_application_exit_error(registry):
+    api = engine_api.EngineApi(make_module(code=4000), 'PowerFactory 2020', registry=registry)
+    with pytest.raises(engine_api.EngineStartError) as error:
+        api.get_application()
+    assert error.value.code == 4000
+
+
+def test_get_application(registry):
+    module = make_module()
+    api = engine_api.EngineApi(module, 'PowerFactory 2018', registry=registry)
+    assert isinstance(api.get_application(), powerfactory.Application)
+    assert module.calls == ['GetApplication']
+
+
+def test_get_application_none(registry):
+    api = engine_api.EngineApi(make_module(returns_none=True), 'PowerFactory 2018', registry=registry)
+    with pytest.raises(engine_api.EngineStartError) as error:
+        api.get_application()
+    assert error.value.code == constants.EngineApi.error_no_application
+
+
+def test_supports_recorded(app, registry):
+    api = engine_api.EngineApi(make_module(), 'PowerFactory 2020', registry=registry)
+    elmres = app.GetProjectFolder('study').GetContents('*.IntCase')[0].GetContents('Results.ElmRes')[0]
+    assert api.supports('column_values', elmres, 'GetColumnValues')
+    assert registry.data['entries']['PowerFactory 2020']['capabilities']['column_values'] is True
+
+    # Once recorded the feature is not detected again
+    powerfactory.configure(column_values=False)
+    assert api.supports('column_values', elmres, 'GetColumnValues')
@@ -0,0 +1,68 @@
+import concurrent.futures
+
+import numpy as np
+
+import pf_control.events as events
+import pf_control.result_store as result_store
+
+
+class StubPool:
+    """ Pool which records the jobs submitted rather than running them """
+
+    def __init__(self):
+        self.submitted = list()
+
+    def submit(self, func, *args):
+        self.submitted.append(args)
+        return concurrent.futures.Future()
+
+
+def completed(result=None, error=None):
+    future = concurrent.futures.Future()
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+    return future
+
+
+SCENARIO = events.Scenario(0, 'Line 1', 'trip', 1.0)
+MATRIX = events.EventMatrix('*.ElmLne', ('trip',), (1.0,), elements=['Line 1'])
+RESULT = (0.5, (np.arange(3, dtype=float), np.ones((3, 1)), [('Gen 1', 's:speed')], True))
+
+
+def make_sweep(tmp_path, retries=1):
+    return events.EventSweep(StubPool(), 'Project', 'Study Case', MATRIX, str(tmp_path), retries=retries)
+
+
+def test_failed_simulation_retried(tmp_path):
+    sweep = make_sweep(tmp_path)
+    scenario_result, pending = events.ScenarioResult(SCENARIO), dict()
+    scenario_result.attempts = 1
+    sweep.collect(completed(error=RuntimeError('ComSim failed')), scenario_result, pending)
+    assert len(pending) == 1 and len(sweep.pool.submitted) == 1
+
+
+def test_failed_store_not_retried(tmp_path, monkeypatch):
+    sweep = make_sweep(tmp_path)
+
+    def store(*args):
+        raise OSError('Disk full')
+    monkeypatch.setattr(sweep, 'store', store)
+
+    scenario_result, pending = events.ScenarioResult(SCENARIO), dict()
+    scenario_result.attempts = 1
+    sweep.collect(completed(RESULT), scenario_result, pending)
+    assert not pending and not sweep.pool.submitted
+    assert isinstance(scenario_result.error, OSError) and not scenario_result.succeeded
+
+
+def test_store_replaces_previous_results(tmp_path):
+    sweep = make_sweep(tmp_path)
+    for value in (1.0, 2.0):
+        scenario_result = events.ScenarioResult(SCENARIO)
+        scenario_result.attempts = 1
+        index, values, columns, initialised = RESULT[1]
+        sweep.collect(completed((0.5, (index, values * value, columns, initialised))), scenario_result, dict())
+        assert scenario_result.succeeded
+        assert list(result_store.ResultStore(scenario_result.pth).series('s:speed', 'Gen 1')) == [value] * 3
@@ -0,0 +1,25 @@
+import pf_control.export_reader as export_reader
+
+
+def write_export(pth):
+    with open(str(pth), 'w') as f:
+        f.write('All calculations,Bus 1,,Bus 2\n')
+        f.write('Frequency in Hz,m:u in p.u.,m:phiu in deg,m:u in p.u.\n')
+        for i in range(5):
+            f.write('{},{},{},{}\n'.format(50.0 * (i + 1), i, 2 * i, 3 * i))
+    return str(pth)
+
+
+def test_columns(tmp_path):
+    reader = export_reader.ExportReader(write_export(tmp_path / 'export.csv'))
+    assert reader.columns == [('Bus 1', 'm:u'), ('Bus 1', 'm:phiu'), ('Bus 2', 'm:u')]
+    # Built once rather than on each access
+    assert reader.columns is reader.columns
+
+
+def test_read_selection(tmp_path):
+    reader = export_reader.ExportReader(write_export(tmp_path / 'export.csv'))
+    index, values, columns = reader.read(variables='m:u')
+    assert columns == [('Bus 1', 'm:u'), ('Bus 2', 'm:u')]
+    assert list(index) == [50.0, 100.0, 150.0, 200.0, 250.0]
+    assert list(values[:, 1]) == [0.0, 3.0, 6.0, 9.0, 12.0]
@@ -0,0 +1,81 @@
+import pytest
+
+import pf_control.batch as batch
+import pf_control.constants as constants
+import pf_control.grid_sweep as grid_sweep
+import pf_control.result_cache as result_cache
+import pf_control.session as session
+
+PATH = 'Library/Operational Library/Characteristics/Folder 0/R'
+
+
+def targets():
+    grid = grid_sweep.ParameterGrid()
+    grid.add('R', [0.5], path=PATH, index=2)
+    grid.add(constants.GridSweep.scenario_axis, ['Scenario 1'])
+    return grid.targets()
+
+
+def characteristic(app):
+    return app.GetProjectFolder('chars').GetContents('Folder 0.IntPrjfolder')[0].GetContents('R.ChaVec')[0]
+
+
+def test_settings_restored_after_point(app):
+    settings = {'R': 0.5, constants.GridSweep.scenario_axis: 'Scenario 1'}
+    grid_sweep._editors.clear()
+    wall_time, (index, values, columns) = grid_sweep.run_grid_point(
+        app, 'Benchmark', 'Study Case 0', settings, targets(), constants.GridSweep.commands,
+        constants.GridSweep.result_name)
+    assert len(index) and columns
+    assert characteristic(app).vector == [0.1] * 10
+    assert app.GetActiveScenario() is None
+
+
+def test_settings_restored_after_failed_point(app, monkeypatch):
+    def run_study_case(*args, **kwargs):
+        raise batch.StudyCaseError('ComFsweep failed')
+    monkeypatch.setattr(batch, 'run_study_case', run_study_case)
+
+    scenario = app.GetProjectFolder('scen').GetContents('Scenario 0.IntScenario')[0]
+    scenario.Activate()
+    settings = {'R': 0.5, constants.GridSweep.scenario_axis: 'Scenario 1'}
+    grid_sweep._editors.clear()
+    with pytest.raises(batch.StudyCaseError):
+        grid_sweep.run_grid_point(app, 'Benchmark', 'Study Case 0', settings, targets(),
+                                  constants.GridSweep.commands, constants.GridSweep.result_name)
+    assert characteristic(app).vector == [0.1] * 10
+    assert app.GetActiveScenario() is scenario
+
+
+def test_axes_setting_the_same_values_rejected():
+    grid = grid_sweep.ParameterGrid().add('R2', [0.5], path=PATH, index=2)
+    # Different indices of the same characteristic can be swept together
+    grid.add('R3', [0.5], path=PATH, index=3)
+    with pytest.raises(ValueError):
+        grid.add('R', [[0.1] * 10], path=PATH, index=None)
+    with pytest.raises(ValueError):
+        grid.add('R2 again', [0.6], path=PATH, index=2)
+
+
+def test_indices_of_the_same_characteristic_applied_together(app):
+    grid = grid_sweep.ParameterGrid().add('R2', [0.5], path=PATH, index=2).add('R3', [0.7], path=PATH, index=3)
+    app.GetProjectFolder('study').GetContents('Study Case 0.IntCase')[0].Activate()
+    grid_sweep._editors.clear()
+    grid_sweep.apply_settings(app, {'R2': 0.5, 'R3': 0.7}, grid.targets())
+    assert characteristic(app).vector[1:5] == [0.1, 0.5, 0.7, 0.1]
+
+
+def test_cache_requires_key_details(tmp_path):
+    pool = session.EnginePool(size=1)
+    grid = grid_sweep.ParameterGrid().add('R2', [0.5], path=PATH, index=2)
+    cache = result_cache.ResultCache(directory=str(tmp_path))
+    with pytest.raises(ValueError):
+        grid_sweep.GridSweep(pool, 'Benchmark', 'Study Case 0', grid, cache=cache)
+
+    # Results of a different PowerFactory version are not reused
+    sweep = grid_sweep.GridSweep(pool, 'Benchmark', 'Study Case 0', grid, cache=cache, key_details=dict())
+    other = grid_sweep.GridSweep(
+        session.EnginePool(size=1, factory_kwargs={'pf_version': 'PowerFactory 2021'}), 'Benchmark', 'Study Case 0',
+        grid, cache=cache, key_details=dict()
+    )
+    assert sweep.point_hash({'R2': 0.5}) != other.point_hash({'R2': 0.5})
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+import pf_control.harmonics as harmonics
+from benchmarks.bench_harmonics import synthetic_sweep
+
+
+@pytest.fixture(scope='module')
+def sweep():
+    return synthetic_sweep(n_frequencies=20000, n_terminals=50)
+
+
+def test_resonances_match_analytical(sweep):
+    frequencies, impedance, f0, q = sweep
+    resonances = harmonics.find_resonances(frequencies, impedance)
+
+    # A single resonance at each terminal
+    np.testing.assert_array_equal(resonances.terminal, np.arange(50))
+    step = frequencies[1] - frequencies[0]
+    np.testing.assert_allclose(resonances.frequency, f0, atol=step)
+    # Half power bandwidth of a parallel RLC circuit is f0 / Q, the resistance is the impedance at resonance
+    np.testing.assert_allclose(resonances.bandwidth, f0 / q, rtol=1e-3)
+    np.testing.assert_allclose(resonances.q_factor, q, rtol=1e-3)
+    np.testing.assert_allclose(resonances.damping, 1.0 / (2.0 * q), rtol=1e-3)
+    np.testing.assert_allclose(resonances.magnitude, np.abs(impedance).max(axis=0))
+
+
+def test_bandwidths_chunked(sweep):
+    frequencies, impedance, _, _ = sweep
+    magnitude = np.abs(impedance)
+    frequency_index, terminal = harmonics.find_peaks(magnitude)
+    expected = harmonics.bandwidths(frequencies, magnitude, frequency_index, terminal)
+    chunked = harmonics.bandwidths(frequencies, magnitude, frequency_index, terminal, chunk_peaks=7)
+    np.testing.assert_array_equal(chunked, expected)
+
+
+def test_bandwidth_outside_sweep(sweep):
+    frequencies, impedance, f0, q = sweep
+    # Truncated just above the resonance of the first terminal so the upper half power point is not in the sweep
+    stop = np.searchsorted(frequencies, f0[0]) + 2
+    resonances = harmonics.find_resonances(frequencies[:stop], impedance[:stop, :1])
+    assert resonances.frequency.size == 1
+    assert np.isnan(resonances.bandwidth[0]) and np.isnan(resonances.q_factor[0])
+
+
+def test_peak_filters_and_for_terminal(sweep):
+    frequencies, impedance, _, _ = sweep
+    # Two terminals combined so that the second has two peaks, the smaller of which is filtered out by relative
+    combined = np.column_stack([impedance[:, 0], impedance[:, 1] + impedance[:, 2]])
+    resonances = harmonics.find_resonances(frequencies, combined)
+    assert list(resonances.terminal) == [0, 1, 1]
+    assert resonances.for_terminal(1).frequency.size == 2
+
+    smaller = resonances.for_terminal(1).magnitude.min()
+    largest = resonances.for_terminal(1).magnitude.max()
+    filtered = harmonics.find_resonances(frequencies, combined, relative=(smaller / largest + 1.0) / 2.0)
+    assert list(filtered.terminal) == [0, 1]
+    assert not harmonics.find_resonances(frequencies, combined, threshold=largest * 2).terminal.size
+
+
+def test_invalid_shape(sweep):
+    frequencies, impedance, _, _ = sweep
+    with pytest.raises(ValueError):
+        harmonics.find_resonances(frequencies[:-1], impedance)
+
+
+def test_loci_envelope():
+    scenarios = [synthetic_sweep(100, 5, scale=scale)[1] for scale in (0.9, 1.0, 1.1)]
+    envelope = harmonics.loci_envelope(iter(scenarios))
+    stacked = np.stack(scenarios)
+    np.testing.assert_allclose(envelope.r_min, stacked.real.min(axis=0))
+    np.testing.assert_allclose(envelope.x_max, stacked.imag.max(axis=0))
+    np.testing.assert_allclose(envelope.z_max, np.abs(stacked).max(axis=0))
+    with pytest.raises(ValueError):
+        harmonics.loci_envelope(list())
+
+
+def test_from_columns():
+    values = np.array([[1.0, 10.0, 90.0, 0.0], [2.0, 20.0, 0.0, 5.0]])
+    columns = [('Bus 1', 'm:Z'), ('Bus 2', 'm:Z'), ('Bus 1', 'm:phiz'), ('Bus 2', 'm:u')]
+    terminals, impedance = harmonics.from_columns(values, columns)
+    assert terminals == ['Bus 1']
+    np.testing.assert_allclose(impedance[:, 0], [1j, 2.0], atol=1e-12)
+    with pytest.raises(ValueError):
+        harmonics.from_columns(values, columns[1:])
@@ -0,0 +1,74 @@
+import os
+
+import pf_control.install_registry as install_registry
+import pf_control.install_scanner as install_scanner
+
+
+def make_install(pth):
+    os.makedirs(pth)
+    open(os.path.join(pth, 'PowerFactory.exe'), 'w').close()
+    return pth
+
+
+class CountingScanner(install_scanner.InstallScanner):
+    """ Scanner recording the number of searches carried out """
+    searches = 0
+
+    def scan(self):
+        self.searches += 1
+        return install_scanner.InstallScanner.scan(self)
+
+
+def lookup(cache_file, scanner):
+    registry = install_registry.InstallRegistry(cache_file=cache_file)
+    return registry.lookup(key='test', roots=scanner.roots, search=scanner.scan)
+
+
+# The cache file is kept outside the directories being searched (and their parents) since writing it changes the
+# modification time of its directory
+
+
+def test_cache_hit_and_invalidation(tmp_path):
+    root = str(tmp_path / 'drive' / 'Program Files')
+    install = make_install(os.path.join(root, 'DIgSILENT', 'PowerFactory 2020'))
+    cache_file = str(tmp_path / 'cache' / 'registry.json')
+    scanner = CountingScanner(roots=[root])
+
+    assert dict(lookup(cache_file, scanner)) == {'2020': install}
+    # Read from the cache file by a new registry without searching again
+    assert dict(lookup(cache_file, scanner)) == {'2020': install}
+    assert scanner.searches == 1
+
+    # Installation modified
+    os.utime(install, (0, 0))
+    lookup(cache_file, scanner)
+    assert scanner.searches == 2
+
+
+def test_new_install_under_new_vendor_directory(tmp_path):
+    root = str(tmp_path / 'drive' / 'Program Files')
+    install = make_install(os.path.join(root, 'DIgSILENT', 'PowerFactory 2020'))
+    cache_file = str(tmp_path / 'cache' / 'registry.json')
+    scanner = CountingScanner(roots=[root])
+    lookup(cache_file, scanner)
+
+    new_install = make_install(os.path.join(root, 'DIgSILENT GmbH', 'PowerFactory 2021'))
+    assert dict(lookup(cache_file, scanner)) == {'2020': install, '2021': new_install}
+    assert scanner.searches == 2
+
+
+def test_root_created_after_search(tmp_path):
+    root = str(tmp_path / 'drive' / 'Program Files (x86)')
+    cache_file = str(tmp_path / 'cache' / 'registry.json')
+    scanner = CountingScanner(roots=[root])
+    assert not lookup(cache_file, scanner)
+
+    install = make_install(os.path.join(root, 'DIgSILENT', 'PowerFactory 2019'))
+    assert dict(lookup(cache_file, scanner)) == {'2019': install}
+
+
+def test_ancestors_stop_at_root(tmp_path):
+    root = str(tmp_path / 'root')
+    install = os.path.join(root, 'A', 'B', 'PowerFactory 2020')
+    assert install_registry.InstallRegistry.ancestors(install, [root]) == [
+        install, os.path.join(root, 'A', 'B'), os.path.join(root, 'A'), root]
@@ -0,0 +1,40 @@
+import os
+
+import pf_control.install_scanner as install_scanner
+from tests.test_install_registry import make_install
+
+
+def test_depth_limit(tmp_path):
+    root = str(tmp_path)
+    default = make_install(os.path.join(root, 'DIgSILENT', 'PowerFactory 2020'))
+    deepest = make_install(os.path.join(root, 'Vendor', 'Apps', 'PowerFactory 2021'))
+    make_install(os.path.join(root, 'Vendor', 'Apps', 'Old', 'PowerFactory 2019'))
+
+    scanner = install_scanner.InstallScanner(roots=[root], max_depth=3, pruned_directories=())
+    assert dict(scanner.scan()) == {'2020': default, '2021': deepest}
+
+    scanner = install_scanner.InstallScanner(roots=[root], max_depth=2, pruned_directories=())
+    assert dict(scanner.scan()) == {'2020': default}
+
+
+def test_pruned_directories(tmp_path):
+    root = str(tmp_path)
+    expected = make_install(os.path.join(root, 'DIgSILENT', 'PowerFactory 2020'))
+    make_install(os.path.join(root, 'Microsoft Office', 'PowerFactory 2021'))
+    make_install(os.path.join(root, 'common files', 'PowerFactory 2022'))
+
+    scanner = install_scanner.InstallScanner(roots=[root], max_depth=3,
+                                             pruned_directories=('Microsoft*', 'Common Files'))
+    assert dict(scanner.scan()) == {'2020': expected}
+
+
+def test_installs_not_searched_and_first_root_preferred(tmp_path):
+    first = str(tmp_path / 'first')
+    second = str(tmp_path / 'second')
+    preferred = make_install(os.path.join(first, 'DIgSILENT', 'PowerFactory 2020'))
+    make_install(os.path.join(preferred, 'PowerFactory 2018'))
+    make_install(os.path.join(second, 'DIgSILENT', 'PowerFactory 2020'))
+    other = make_install(os.path.join(second, 'DIgSILENT', 'PowerFactory 2021'))
+
+    scanner = install_scanner.InstallScanner(roots=[first, second, str(tmp_path / 'missing')], max_depth=3)
+    assert list(scanner.scan().items()) == [('2020', preferred), ('2021', other)]
@@ -0,0 +1,61 @@
+import pf_control.licence as licence
+import pf_control.licence_profiles as licence_profiles
+from benchmarks.fake_powerfactory import powerfactory
+
+LICENCES = {'harm': 1, 'stab': 1}
+
+
+def run_worker(initialise, is_reachable=lambda host: True, **kwargs):
+    worker = licence.LicenceWorker(LICENCES, 'PowerFactory 2020', initialise=initialise, is_reachable=is_reachable,
+                                   **kwargs)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive()
+    return worker, [event for event, _ in worker.get_events()]
+
+
+def test_licences_written():
+    app = powerfactory.GetApplication()
+    worker, events = run_worker(lambda pf_version: app)
+    assert events[-1] == licence.EVENT_COMPLETE
+    assert events.count(licence.EVENT_COMPLETE) == 1
+    user = app.GetCurrentUser()
+    assert (user.harm, user.stab, user.prot) == (1, 1, 0)
+
+
+def test_techno_economical_written():
+    app = powerfactory.GetApplication()
+    app.GetCurrentUser().tececo = 1
+    changed = licence.apply_licences(app.GetCurrentUser(), licence_profiles.normalise(LICENCES))
+    assert changed['tececo'] == 0 and app.GetCurrentUser().tececo == 0
+
+
+def test_host_unreachable():
+    worker, events = run_worker(lambda pf_version: powerfactory.GetApplication(), is_reachable=lambda host: False)
+    assert events == [licence.EVENT_STATUS, licence.EVENT_FAILED]
+
+
+def test_cancelled_whilst_initialising():
+    app = powerfactory.GetApplication()
+
+    def initialise(pf_version):
+        # Cancel is clicked whilst the engine is starting
+        worker.cancel()
+        return app
+
+    worker = licence.LicenceWorker(LICENCES, 'PowerFactory 2020', initialise=initialise,
+                                   is_reachable=lambda host: True)
+    worker.run()
+    events = [event for event, _ in worker.get_events()]
+    assert events[-1] == licence.EVENT_CANCELLED
+    assert app.GetCurrentUser().harm == 0
+
+
+def test_error_reported():
+    def initialise(pf_version):
+        raise RuntimeError('Engine failed')
+
+    worker, events = run_worker(initialise)
+    assert events[-1] == licence.EVENT_ERROR
+    assert all(event not in licence.FINAL_EVENTS for event in events[:-1])
+
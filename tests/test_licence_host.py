@@ -0,0 +1,95 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+import pf_control.licence_host as licence_host
+
+
+class StubProbe(licence_host.LicenceHostProbe):
+    """ Probe where each host answers after a delay rather than attempting a connection """
+
+    def __init__(self, answers, **kwargs):
+        """
+        :param dict answers:  Dictionary of {host: (delay, reachable)} in order of preference
+        """
+        licence_host.LicenceHostProbe.__init__(self, hosts=list(answers), **kwargs)
+        self.answers = answers
+
+    async def probe_host(self, host):
+        delay, reachable = self.answers[host]
+        await asyncio.sleep(delay)
+        return host if reachable else None
+
+
+def test_preferred_host_returned_when_fallback_answers_first():
+    probe = StubProbe({'primary': (0.2, True), 'fallback': (0.0, True)})
+    assert probe.find_reachable_host() == 'primary'
+
+
+def test_fallback_returned_when_preferred_host_unreachable():
+    probe = StubProbe({'primary': (0.1, False), 'secondary': (0.0, False), 'fallback': (0.05, True)})
+    assert probe.find_reachable_host() == 'fallback'
+
+
+def test_no_host_reachable():
+    assert StubProbe({'primary': (0.0, False), 'fallback': (0.0, False)}).find_reachable_host() is None
+
+
+def test_later_hosts_not_waited_for():
+    probe = StubProbe({'primary': (0.0, True), 'fallback': (5.0, True)})
+    t0 = time.perf_counter()
+    assert probe.find_reachable_host() == 'primary'
+    assert time.perf_counter() - t0 < 2.0
+
+
+@pytest.fixture
+def licence_server():
+    """ Listening socket on 127.0.0.1 standing in for the licence server, returns (listening port, closed port) """
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    yield server.getsockname()[1], closed_port
+    server.close()
+
+
+def test_connect_to_listening_socket(licence_server):
+    port, closed_port = licence_server
+    probe = licence_host.LicenceHostProbe(hosts=['127.0.0.1'], ports=(closed_port, port), timeout=2.0)
+    assert probe.find_reachable_host() == '127.0.0.1'
+    assert asyncio.run(probe.connect('127.0.0.1', port))
+    assert not asyncio.run(probe.connect('127.0.0.1', closed_port))
+
+
+def test_closed_port_unreachable(licence_server):
+    _, closed_port = licence_server
+    probe = licence_host.LicenceHostProbe(hosts=['127.0.0.1', 'localhost'], ports=(closed_port,), timeout=2.0)
+    assert probe.find_reachable_host() is None
+
+
+def test_most_preferred_reachable_host(licence_server):
+    port, _ = licence_server
+    # The server only listens on 127.0.0.1 so 127.0.0.2 refuses the connection
+    probe = licence_host.LicenceHostProbe(hosts=['127.0.0.2', '127.0.0.1', 'localhost'], ports=(port,), timeout=2.0)
+    assert probe.find_reachable_host() == '127.0.0.1'
+
+    # localhost has to be resolved so answers after 127.0.0.1, but is preferred
+    probe = licence_host.LicenceHostProbe(hosts=['localhost', '127.0.0.1'], ports=(port,), timeout=2.0)
+    assert probe.find_reachable_host() == 'localhost'
+
+
+def test_dns_results_cached(monkeypatch):
+    monkeypatch.setattr(licence_host, '_dns_cache', dict())
+    probe = licence_host.LicenceHostProbe(hosts=['localhost'], timeout=2.0)
+    addresses = asyncio.run(probe.resolve('localhost'))
+    assert addresses and 'localhost' in licence_host._dns_cache
+
+    # A cached result is returned without resolving the host again
+    licence_host._dns_cache['localhost'] = (time.monotonic() + 60.0, [(socket.AF_INET, '127.0.0.9')])
+    assert asyncio.run(probe.resolve('localhost')) == [(socket.AF_INET, '127.0.0.9')]
@@ -0,0 +1,42 @@
+import pf_control.engine_api as engine_api
+import pf_control.install_registry as install_registry
+import pf_control.json_cache as json_cache
+import pf_control.licence as licence
+import pf_control.licence_profiles as licence_profiles
+from benchmarks.fake_powerfactory import powerfactory
+
+LICENCES = {'harm': 1}
+
+
+def run_worker(profiles, force=False):
+    app = powerfactory.GetApplication()
+    initialised = list()
+
+    def initialise(pf_version):
+        initialised.append(pf_version)
+        return app
+
+    worker = licence.LicenceWorker(LICENCES, 'PowerFactory 2020', initialise=initialise,
+                                   is_reachable=lambda host: True, profiles=profiles, force=force)
+    worker.run()
+    return worker.get_events()[-1], initialised
+
+
+def test_applied_settings_skipped_unless_forced(tmp_path):
+    profiles = licence_profiles.LicenceProfiles(cache_file=str(tmp_path / 'profiles.json'))
+    assert run_worker(profiles)[1] == ['PowerFactory 2020']
+
+    # Reloaded from disk the settings are already applied so PowerFactory is not started
+    profiles = licence_profiles.LicenceProfiles(cache_file=str(tmp_path / 'profiles.json'))
+    event, initialised = run_worker(profiles)
+    assert event[0] == licence.EVENT_COMPLETE and not initialised
+
+    event, initialised = run_worker(profiles, force=True)
+    assert event[0] == licence.EVENT_COMPLETE and initialised
+
+
+def test_caches_only_share_the_json_cache():
+    for cls in (licence_profiles.LicenceProfiles, engine_api.CapabilityRegistry):
+        assert issubclass(cls, json_cache.JsonCache)
+        assert not issubclass(cls, install_registry.InstallRegistry)
+        assert not hasattr(cls, 'lookup')
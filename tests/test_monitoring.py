@@ -0,0 +1,73 @@
+import pytest
+
+import pf_control.monitoring as monitoring
+import pf_control.query as query
+
+SPEC = {'*.ElmTerm': ['m:u', 'm:phiu'], '*.ElmSym': ['s:speed', 's:xspeed']}
+
+
+@pytest.fixture
+def elmres(app):
+    """ Results file of the first study case which already monitors 3 variables of each of the 4 generators """
+    monitoring.clear_cache()
+    app.GetProjectFolder('study').GetContents('*.IntCase')[0].Activate()
+    yield app.GetFromStudyCase('Results.ElmRes')
+    monitoring.clear_cache()
+
+
+def monitored(elmres):
+    return {mon.obj_id.loc_name: list(mon.vars) for mon in elmres.GetContents('*.IntMon')}
+
+
+def test_spec():
+    spec = monitoring.MonitorSpec({'*.ElmTerm': 'm:u'}).add('*.ElmTerm', ['m:u', 'm:phiu'])
+    assert dict(spec.entries) == {'*.ElmTerm': ['m:u', 'm:phiu']}
+    assert spec.hash == monitoring.MonitorSpec({'*.ElmTerm': ['m:u', 'm:phiu']}).hash
+    assert spec.hash != monitoring.MonitorSpec({'*.ElmTerm': ['m:u']}).hash
+
+
+def test_register(app, elmres):
+    registration = monitoring.MonitorRegistration(app, elmres)
+    registration.register(monitoring.MonitorSpec(SPEC))
+
+    assert (registration.objects_added, registration.objects_extended, registration.variables_added) == (20, 4, 44)
+    variables = monitored(elmres)
+    assert len(variables) == 24
+    assert variables['Terminal 0'] == ['m:u', 'm:phiu']
+    # Variables already monitored are kept and only the missing ones added
+    assert variables['Gen 0'] == ['m:P:bus1', 'm:Q:bus1', 's:speed', 's:xspeed']
+
+
+def test_registered_once(app, elmres):
+    cache = query.QueryCache(app)
+    monitoring.MonitorRegistration(app, elmres, query=cache.get).register(monitoring.MonitorSpec(SPEC))
+    assert cache.misses == 2
+
+    registration = monitoring.MonitorRegistration(app, elmres, query=cache.get)
+    registration.register(monitoring.MonitorSpec(SPEC))
+    assert registration.skipped and cache.misses == 2 and cache.hits == 0
+
+    registration.register(monitoring.MonitorSpec(SPEC), force=True)
+    assert not registration.skipped
+    assert (registration.objects_added, registration.objects_extended, registration.variables_added) == (0, 0, 0)
+
+
+def test_registered_again_when_changed(app, elmres):
+    registration = monitoring.MonitorRegistration(app, elmres)
+    registration.register(monitoring.MonitorSpec(SPEC))
+
+    # Monitors removed outside of the registration
+    elmres.GetContents('Terminal 0.IntMon')[0].Delete()
+    registration.register(monitoring.MonitorSpec(SPEC))
+    assert not registration.skipped and registration.objects_added == 1
+
+    # A different specification
+    registration.register(monitoring.MonitorSpec(SPEC).add('*.ElmTerm', 'm:fehz'))
+    assert not registration.skipped
+    assert (registration.objects_extended, registration.variables_added) == (20, 20)
+
+    # A different study case
+    app.GetProjectFolder('study').GetContents('*.IntCase')[1].Activate()
+    registration = monitoring.MonitorRegistration(app, app.GetFromStudyCase('Results.ElmRes'))
+    registration.register(monitoring.MonitorSpec(SPEC))
+    assert not registration.skipped and registration.objects_added == 20
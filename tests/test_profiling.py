@@ -0,0 +1,26 @@
+import pytest
+
+import pf_control.profiling as profiling
+from benchmarks.fake_powerfactory import powerfactory
+
+
+@pytest.fixture
+def enabled():
+    profiling.enable()
+    profiling.clear()
+    yield
+    profiling.clear()
+    profiling.disable()
+
+
+def test_instrument_is_idempotent(enabled):
+    app = profiling.instrument(powerfactory.GetApplication())
+    assert profiling.instrument(app) is app
+    assert profiling.unwrap(app).__class__ is powerfactory.Application
+
+
+def test_api_calls_recorded_once(enabled):
+    app = profiling.instrument(profiling.instrument(powerfactory.GetApplication()))
+    app.GetCurrentUser()
+    names = [event[0] for event in profiling.collect()]
+    assert len([x for x in names if x.endswith('.GetCurrentUser')]) == 1
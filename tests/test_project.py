@@ -0,0 +1,62 @@
+import pytest
+
+import pf_control.project as project
+from benchmarks.fake_powerfactory import powerfactory
+
+CHARACTERISTICS = 'Library/Operational Library/Characteristics'
+
+
+@pytest.fixture
+def index(app):
+    return project.ProjectIndex.from_app(app)
+
+
+def test_resolve(app, index):
+    obj = index.resolve(CHARACTERISTICS + '/Folder 0/R')
+    assert obj is app.GetProjectFolder('chars').GetContents('Folder 0.IntPrjfolder')[0].GetContents('R.ChaVec')[0]
+    # Name and class, backslashes and extra separators refer to the same object
+    assert index.resolve('\\Library\\Operational Library\\Characteristics\\Folder 0\\R.ChaVec/') is obj
+    assert index.resolve('') is app.GetActiveProject()
+
+
+def test_folders_listed_once(index):
+    index.resolve(CHARACTERISTICS + '/Folder 0/R')
+    assert (index.folders_listed, index.misses) == (5, 1)
+
+    index.resolve(CHARACTERISTICS + '/Folder 0/R')
+    index.resolve(CHARACTERISTICS + '/Folder 0/L')
+    index.resolve(CHARACTERISTICS + '/Folder 1/L')
+    assert index.folders_listed == 6
+    assert (index.hits, index.misses) == (1, 3)
+
+
+def test_missing_path(index):
+    with pytest.raises(KeyError) as error:
+        index.resolve(CHARACTERISTICS + '/Missing')
+    assert 'Folder 0' in str(error.value)
+    assert index.get(CHARACTERISTICS + '/Missing') is None
+
+
+def test_children(index):
+    assert [x.loc_name for x in index.children(CHARACTERISTICS + '/Folder 0')] == ['R', 'L']
+    assert [x.loc_name for x in index.children(CHARACTERISTICS + '/Folder 0', pf_class='ChaVec')] == ['R', 'L']
+    assert index.children(CHARACTERISTICS + '/Folder 0', pf_class='ElmTerm') == list()
+
+
+def test_invalidate(index):
+    index.resolve(CHARACTERISTICS + '/Folder 0/R').GetParent().CreateObject('ChaVec', 'X')
+    assert index.get(CHARACTERISTICS + '/Folder 0/X') is None
+
+    index.invalidate(CHARACTERISTICS + '/Folder 0')
+    assert index.resolve(CHARACTERISTICS + '/Folder 0/X').loc_name == 'X'
+    # Parents of the path invalidated are still cached
+    assert index.folders_listed == 6
+
+    index.invalidate()
+    index.resolve(CHARACTERISTICS + '/Folder 0/X')
+    assert index.folders_listed == 11
+
+
+def test_no_active_project():
+    with pytest.raises(EnvironmentError):
+        project.ProjectIndex.from_app(powerfactory.GetApplication())
@@ -0,0 +1,72 @@
+import pytest
+
+from benchmarks.fake_powerfactory import powerfactory
+from pf_control import query
+
+
+@pytest.fixture
+def study_cases(app):
+    return app.GetProjectFolder('study').GetContents('*.IntCase')
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """ Counts the calls made to the fake API by the cache """
+    calls = list()
+    for cls, name in ((powerfactory.Application, 'GetCalcRelevantObjects'),
+                      (powerfactory.Application, 'GetActiveStudyCase'),
+                      (powerfactory.DataObject, 'GetFullName')):
+        original = getattr(cls, name)
+
+        def wrapper(self, *args, _name=name, _original=original):
+            calls.append(_name)
+            return _original(self, *args)
+        monkeypatch.setattr(cls, name, wrapper)
+    return calls
+
+
+def test_hit_returns_copy(app, study_cases):
+    study_cases[0].Activate()
+    cache = query.QueryCache(app)
+    terminals = cache.get('*.ElmTerm')
+    assert len(terminals) == 20
+    terminals.clear()
+
+    assert len(cache.get('*.ElmTerm')) == 20
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_hit_looks_up_study_case_once(app, study_cases, counted):
+    study_cases[0].Activate()
+    cache = query.QueryCache(app)
+    cache.get('*.ElmTerm')
+    del counted[:]
+
+    cache.get('*.ElmTerm')
+    assert counted == ['GetActiveStudyCase']
+
+
+def test_separated_by_study_case(app, study_cases, counted):
+    study_cases[0].Activate()
+    cache = query.QueryCache(app)
+    cache.get('*.ElmTerm')
+    study_cases[1].Activate()
+    cache.get('*.ElmTerm')
+    study_cases[0].Activate()
+    cache.get('*.ElmTerm')
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert counted.count('GetCalcRelevantObjects') == 2
+
+
+def test_attribute_and_invalidate(app, study_cases):
+    study_cases[0].Activate()
+    cache = query.QueryCache(app)
+    names = cache.names('*.ElmTerm')
+    assert list(names) == [x.loc_name for x in app.GetCalcRelevantObjects('*.ElmTerm')]
+    assert not names.flags.writeable
+    assert cache.names('*.ElmTerm') is names
+
+    with cache.changing_topology():
+        app.GetCalcRelevantObjects('*.ElmTerm')[0].Delete()
+    assert len(cache.names('*.ElmTerm')) == 19
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import pf_control.batch as batch
+import pf_control.result_cache as result_cache
+import pf_control.session as session
+
+
+def test_large_arrays_hashed_by_content():
+    values = np.zeros(5000)
+    changed = values.copy()
+    changed[2500] = 1.0
+    assert result_cache.content_hash({'v': values}) == result_cache.content_hash({'v': values.copy()})
+    assert result_cache.content_hash({'v': values}) != result_cache.content_hash({'v': changed})
+    assert result_cache.content_hash({'v': values}) != result_cache.content_hash({'v': values.astype(np.float32)})
+    assert result_cache.content_hash({'v': values}) != result_cache.content_hash({'v': values.reshape(50, 100)})
+
+
+def test_cache_requires_key_details(tmp_path):
+    pool = session.EnginePool(size=1)
+    cache = result_cache.ResultCache(directory=str(tmp_path))
+    with pytest.raises(ValueError):
+        batch.StudyCaseBatchRunner(pool, 'Project', ('ComLdf',), cache=cache)
+    runner = batch.StudyCaseBatchRunner(pool, 'Project', ('ComLdf',), cache=cache, key_details=dict())
+
+    # Results of a different PowerFactory version are not reused
+    other = batch.StudyCaseBatchRunner(
+        session.EnginePool(size=1, factory_kwargs={'pf_version': 'PowerFactory 2021'}), 'Project', ('ComLdf',),
+        cache=cache, key_details=dict()
+    )
+    assert runner.key('Case') != other.key('Case')
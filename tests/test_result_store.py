@@ -0,0 +1,14 @@
+import numpy as np
+
+import pf_control.result_store as result_store
+
+
+def test_series_of_duplicate_object_names(tmp_path):
+    # Objects in different grids may have the same name
+    columns = [('Load', 'm:P:bus1'), ('Line', 'm:P:bus1'), ('Load', 'm:P:bus1')]
+    values = np.arange(12, dtype=float).reshape(4, 3)
+    pth = result_store.store_results(str(tmp_path / 'run'), np.arange(4, dtype=float), values, columns)
+
+    store = result_store.ResultStore(pth)
+    assert list(store.series('m:P:bus1', 'Line')) == list(values[:, 1])
+    assert store.series('m:P:bus1', 'Load').tolist() == values[:, [0, 2]].tolist()
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+import pf_control.engine_api as engine_api
+import pf_control.results as results
+from benchmarks.fake_powerfactory import powerfactory
+
+
+@pytest.fixture
+def elmres(app, monkeypatch):
+    """ Results of a simulation of the first study case, 4 generators with 3 variables each """
+    monkeypatch.setattr(engine_api, 'current', None)
+    app.GetProjectFolder('study').GetContents('*.IntCase')[0].Activate()
+    app.GetFromStudyCase('ComSim').Execute()
+    return app.GetFromStudyCase('Results.ElmRes')
+
+
+@pytest.fixture
+def get_value_calls(monkeypatch):
+    calls = list()
+    original = powerfactory.ElmRes.GetValue
+
+    def get_value(self, row, column):
+        calls.append((row, column))
+        return original(self, row, column)
+    monkeypatch.setattr(powerfactory.ElmRes, 'GetValue', get_value)
+    return calls
+
+
+def expected(columns):
+    rows = np.arange(10)[:, np.newaxis]
+    return np.sin(0.01 * rows + np.array(columns))
+
+
+def test_select(elmres):
+    reader = results.ResultsReader(elmres)
+    assert len(reader.columns) == 12
+    assert reader.select() == list(range(12))
+    assert reader.select(objects='Gen 1') == [3, 4, 5]
+    assert reader.select(variables=['m:P*', 's:*']) == [0, 2, 3, 5, 6, 8, 9, 11]
+    assert reader.select(objects=['Gen 0', 'Gen 3'], variables='m:Q:bus1') == [1, 10]
+    assert reader.select(objects='Missing') == list()
+
+
+def test_read_column_values(elmres, get_value_calls):
+    reader = results.ResultsReader(elmres)
+    assert reader.fast_columns
+    index, values, columns = reader.read(objects='Gen 1', variables='m:P:bus1')
+
+    assert not get_value_calls
+    assert columns == [('Gen 1', 'm:P:bus1')]
+    np.testing.assert_allclose(index, np.arange(10) * 0.01)
+    np.testing.assert_allclose(values, expected([3]))
+
+
+def test_read_get_value(elmres, get_value_calls):
+    powerfactory.configure(column_values=False)
+    reader = results.ResultsReader(elmres)
+    assert not reader.fast_columns
+    index, values, columns = reader.read(objects='Gen 1', variables=['m:P:bus1', 's:speed'])
+
+    # Each value of the index and both columns read individually
+    assert len(get_value_calls) == 30
+    assert columns == [('Gen 1', 'm:P:bus1'), ('Gen 1', 's:speed')]
+    np.testing.assert_allclose(values, expected([3, 5]))
+
+
+def test_column_values_error_falls_back(elmres, get_value_calls):
+    elmres.GetColumnValues = lambda column: [1, None]
+    index, values, columns = results.ResultsReader(elmres).read(objects='Gen 0', variables='s:speed')
+    assert len(get_value_calls) == 20
+    np.testing.assert_allclose(values, expected([2]))
+
+
+def test_collect_results(app, elmres):
+    index, values, columns = results.collect_results(app, 'Results.ElmRes', variables='m:P:bus1')
+    assert [x for x, _ in columns] == ['Gen 0', 'Gen 1', 'Gen 2', 'Gen 3']
+    np.testing.assert_allclose(values, expected([0, 3, 6, 9]))
+
+    app.GetActiveStudyCase().Deactivate()
+    with pytest.raises(ValueError):
+        results.collect_results(app, 'Results.ElmRes')
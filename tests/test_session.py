@@ -0,0 +1,35 @@
+import pytest
+
+import pf_control.session as session
+from tests import stubs
+
+
+def test_pool_runs_job():
+    with session.EnginePool(size=1, engine_factory=stubs.fake_engine_factory, health_check=stubs.healthy,
+                            start_timeout=30) as pool:
+        assert pool.run(stubs.user_name)
+
+
+def test_failed_start_is_removed_from_pool():
+    pool = session.EnginePool(size=1, engine_factory=stubs.failing_engine_factory, health_check=stubs.healthy,
+                              start_timeout=30)
+    try:
+        # A second job must start a new session rather than wait for the one which failed
+        for _ in range(2):
+            with pytest.raises(session.EngineError):
+                pool.run(stubs.user_name)
+            assert len(pool._sessions) == 0
+        assert pool.sessions_started == 2
+    finally:
+        pool.close()
+
+
+def test_failed_start_of_pool():
+    pool = session.EnginePool(size=2, engine_factory=stubs.failing_engine_factory, health_check=stubs.healthy,
+                              start_timeout=30)
+    try:
+        with pytest.raises(session.EngineError):
+            pool.start()
+        assert len(pool._sessions) == 0
+    finally:
+        pool.close()
@@ -0,0 +1,28 @@
+import pf_control.snapshot as snapshot
+
+
+def test_snapshot_loaded_until_invalidated(app, monkeypatch):
+    app.GetProjectFolder('study').GetContents('Study Case 0.IntCase')[0].Activate()
+
+    def count_objects(obj_filter='*.*'):
+        raise AssertionError('The fingerprint must not count the calculation relevant objects')
+    monkeypatch.setattr(app, 'GetCalcRelevantObjects', count_objects)
+
+    initial_conditions = snapshot.InitialConditions(app)
+    assert initial_conditions.ensure()
+    assert not initial_conditions.ensure()
+    assert (initial_conditions.initialisations, initial_conditions.initialisations_avoided) == (1, 1)
+
+    initial_conditions.invalidate()
+    assert initial_conditions.ensure()
+    assert initial_conditions.load_flows == 2
+
+
+def test_change_of_study_case_detected(app):
+    cases = app.GetProjectFolder('study').GetContents('*.IntCase')
+    cases[0].Activate()
+    initial_conditions = snapshot.InitialConditions(app)
+    initial_conditions.ensure()
+    cases[1].Activate()
+    assert initial_conditions.ensure()
+    assert initial_conditions.load_flows == 2
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import pytest
+
+import pf_control.constants as constants
+import pf_control.gui as gui
+import pf_control.licence as licence
+import pf_control.session as session
+from benchmarks.fake_powerfactory import powerfactory
+
+
+class StubSession:
+    """ Stand in for session.EngineSession recording how it is used, the engine starts once started is set """
+    instances = list()
+
+    def __init__(self, engine_factory, factory_kwargs, health_check, start_timeout):
+        self.factory_kwargs = factory_kwargs
+        self.ready = False
+        self.closed = list()
+        self.started = threading.Event()
+        self.start_error = None
+        self.job_error = None
+        StubSession.instances.append(self)
+
+    def wait_ready(self):
+        self.started.wait(timeout=10)
+        if self.closed:
+            raise OSError('Session closed whilst starting')
+        if self.start_error is not None:
+            raise self.start_error
+        self.ready = True
+        return 0.0
+
+    def run(self, func, *args, **kwargs):
+        if self.job_error is not None:
+            raise self.job_error
+        return func(powerfactory.GetApplication(), *args, **kwargs)
+
+    def close(self, force=False):
+        self.closed.append(force)
+
+
+@pytest.fixture
+def stub_session(monkeypatch):
+    StubSession.instances = list()
+    monkeypatch.setattr(licence.session, 'EngineSession', StubSession)
+    return StubSession.instances
+
+
+def start_engine(pf_version='PowerFactory 2020', reachable=True, start_error=None, wait=True):
+    """ Starts a WarmEngine, if wait is True the stub engine is allowed to finish starting """
+    engine = licence.WarmEngine(pf_version, is_reachable=lambda host: reachable)
+    engine.start()
+    if reachable:
+        # Wait for the thread to create the session
+        for _ in range(1000):
+            if StubSession.instances:
+                break
+            time.sleep(0.01)
+        StubSession.instances[-1].start_error = start_error
+        if wait:
+            StubSession.instances[-1].started.set()
+            engine.join(timeout=10)
+    return engine
+
+
+def test_started_session_closed_when_discarded(stub_session):
+    engine = start_engine()
+    assert engine.get_session('PowerFactory 2020') is stub_session[0]
+    assert stub_session[0].factory_kwargs == {'pf_version': 'PowerFactory 2020'}
+
+    engine.discard()
+    assert stub_session[0].closed == [False]
+    assert engine.get_session('PowerFactory 2020') is None
+
+
+def test_different_version_discards(stub_session):
+    engine = start_engine()
+    assert engine.get_session('PowerFactory 2021') is None
+    assert stub_session[0].closed == [False]
+
+
+def test_discarded_whilst_starting(stub_session):
+    engine = start_engine(wait=False)
+    engine.discard()
+    # The engine process is terminated rather than asked to stop
+    assert stub_session[0].closed == [True]
+
+    stub_session[0].started.set()
+    engine.join(timeout=10)
+    assert not engine.is_alive()
+    assert engine.get_session('PowerFactory 2020') is None
+
+
+def test_failure_to_start(stub_session):
+    engine = start_engine(start_error=session.EngineError('Licence not available'))
+    assert isinstance(engine.error, session.EngineError)
+    assert engine.get_session('PowerFactory 2020') is None
+
+    engine.discard()
+    assert stub_session[0].closed == [True]
+
+
+def test_host_unreachable(stub_session):
+    engine = start_engine(reachable=False)
+    engine.join(timeout=10)
+    assert engine.error == constants.Licence.msg_no_connection
+    assert engine.get_session('PowerFactory 2020') is None
+    engine.discard()
+    assert not stub_session
+
+
+def run_worker(engine, initialise):
+    worker = licence.LicenceWorker({'harm': 1}, 'PowerFactory 2020', initialise=initialise,
+                                   is_reachable=lambda host: True, warm_engine=engine)
+    worker.run()
+    return worker.get_events()[-1][0]
+
+
+def test_worker_uses_warm_engine(stub_session):
+    engine = start_engine()
+    assert run_worker(engine, initialise=lambda pf_version: pytest.fail('Warm engine should be used')) == \
+        licence.EVENT_COMPLETE
+    # The session is kept until the launcher is closed
+    assert stub_session[0].closed == list()
+
+
+def test_worker_falls_back_when_warm_engine_fails(stub_session):
+    engine = start_engine()
+    stub_session[0].job_error = session.EngineError('Engine exited')
+    assert run_worker(engine, initialise=lambda pf_version: powerfactory.GetApplication()) == licence.EVENT_COMPLETE
+    assert stub_session[0].closed == [False]
+
+
+def make_gui(engine):
+    """ Returns a MainGui with only the attributes used when launching or closing """
+    main_gui = gui.MainGui.__new__(gui.MainGui)
+    main_gui.warm_engine = engine
+    main_gui.master = type('Master', (), {'destroy': lambda self: None})()
+    return main_gui
+
+
+def test_discarded_on_launch(stub_session):
+    main_gui = make_gui(start_engine())
+    main_gui.launch_powerfactory()
+    assert main_gui.warm_engine is None
+    assert stub_session[0].closed == [False]
+
+
+def test_discarded_on_close(stub_session, monkeypatch):
+    monkeypatch.setattr(gui.messagebox, 'askquestion', lambda **kwargs: 'yes')
+    main_gui = make_gui(start_engine())
+    main_gui.on_closing()
+    assert main_gui.warm_engine is None
+    assert stub_session[0].closed == [False]